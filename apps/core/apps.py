@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+class CoreConfig(AppConfig):
+  default_auto_field = 'django.db.models.BigAutoField'
+  name = 'apps.core'
+  label = 'apps_core'  # Avoid clashing with the project-level core package
+  verbose_name = 'Core'
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+Bring Elasticsearch indices up to their current versions.
+
+Run at deploy time, before the new code serves requests: indices whose
+VERSION changed are rebuilt next to the live ones and swapped in through
+their aliases. Processes only swap in finished versions on startup, they
+never rebuild.
+"""
+import asyncio
+from typing import Dict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.elasticsearch.client import ESClient
+
+class Command(BaseCommand):
+  help = 'Rebuild Elasticsearch indices whose version changed and swap them in'
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      '--index',
+      action='append',
+      help='Index to migrate (repeatable, defaults to all)'
+    )
+    parser.add_argument(
+      '--keep-old',
+      action='store_true',
+      help='Keep the replaced versioned indices instead of deleting them'
+    )
+
+  def handle(self, *args, **options):
+    client = ESClient()
+    index_classes = client.indices
+    if options['index']:
+      by_name = {index.INDEX_NAME: index for index in client.indices}
+      unknown = set(options['index']) - set(by_name)
+      if unknown:
+        raise CommandError(f"Unknown index: {', '.join(sorted(unknown))}")
+      index_classes = [by_name[name] for name in options['index']]
+
+    migrated = asyncio.run(self._migrate(client, index_classes, options['keep_old']))
+
+    for alias, current in migrated.items():
+      if current:
+        self.stdout.write(f"{alias}: up to date")
+      else:
+        self.stderr.write(f"{alias}: not migrated, see the log")
+    if not all(migrated.values()):
+      raise CommandError("Some indices are not at their current version")
+    self.stdout.write(self.style.SUCCESS("Indices migrated"))
+
+  async def _migrate(self, client: ESClient, index_classes, keep_old: bool) -> Dict[str, bool]:
+    try:
+      return await client.migrate_indices(index_classes, keep_old=keep_old)
+    finally:
+      await client.close()
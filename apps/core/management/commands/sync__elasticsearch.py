@@ -0,0 +1,244 @@
+"""
+Rebuild Elasticsearch indices from Postgres.
+
+Rows are streamed with keyset pagination on the primary key, converted to
+documents in chunks and pushed through concurrent bulk workers. A bounded
+queue between the reader and the workers keeps memory flat, and the last
+fully indexed key is checkpointed so an interrupted run can be resumed.
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from core.elasticsearch.client import ESClient
+from core.elasticsearch.constants import (
+  BULK_SIZE,
+  SYNC_WORKERS,
+  SYNC_CHUNK_RETRIES,
+  SYNC_PROGRESS_INTERVAL
+)
+from core.elasticsearch.indices import CustomerIndex, TransactionIndex
+from models.deals import Deal
+
+# Index name -> (index definition, model loader)
+INDICES = {
+  CustomerIndex.INDEX_NAME: (CustomerIndex, get_user_model),
+  TransactionIndex.INDEX_NAME: (TransactionIndex, lambda: Deal),
+}
+
+class SyncProgress:
+  """Tracks completed chunks and checkpoints the contiguous low watermark."""
+
+  def __init__(self, command: BaseCommand, total: int, checkpoint: Optional[str]):
+    self.command = command
+    self.total = total
+    self.checkpoint = checkpoint
+    self.indexed = 0
+    self.failed = 0
+    self.started = time.monotonic()
+    self._last_report = self.started
+    self._completed: Dict[int, str] = {}
+    self._next_seq = 0
+    self.last_id: Optional[str] = None
+
+  def done(self, seq: int, last_id: str, count: int, success: bool) -> None:
+    if not success:
+      # Leave a gap so the checkpoint never moves past this chunk
+      self.failed += count
+      return
+
+    self.indexed += count
+    self._completed[seq] = last_id
+    advanced = False
+    while self._next_seq in self._completed:
+      self.last_id = self._completed.pop(self._next_seq)
+      self._next_seq += 1
+      advanced = True
+
+    if advanced:
+      self.save()
+    self.report()
+
+  def save(self) -> None:
+    if not self.checkpoint or self.last_id is None:
+      return
+    tmp_path = f"{self.checkpoint}.tmp"
+    with open(tmp_path, 'w') as f:
+      json.dump({'last_id': self.last_id, 'indexed': self.indexed}, f)
+    os.replace(tmp_path, self.checkpoint)
+
+  def report(self, force: bool = False) -> None:
+    now = time.monotonic()
+    if not force and now - self._last_report < SYNC_PROGRESS_INTERVAL:
+      return
+    self._last_report = now
+    elapsed = max(now - self.started, 1e-6)
+    percent = (self.indexed / self.total * 100) if self.total else 100.0
+    self.command.stdout.write(
+      f"Indexed {self.indexed}/{self.total} ({percent:.1f}%), "
+      f"failed {self.failed}, {self.indexed / elapsed:.0f} docs/s"
+    )
+
+class Command(BaseCommand):
+  help = 'Rebuild Elasticsearch indices from the database'
+
+  def add_arguments(self, parser):
+    parser.add_argument(
+      '--index',
+      choices=sorted(INDICES),
+      default=CustomerIndex.INDEX_NAME,
+      help='Index to rebuild'
+    )
+    parser.add_argument(
+      '--workers',
+      type=int,
+      default=SYNC_WORKERS,
+      help='Number of concurrent bulk workers'
+    )
+    parser.add_argument(
+      '--chunk-size',
+      type=int,
+      default=BULK_SIZE,
+      help='Documents per bulk request'
+    )
+    parser.add_argument(
+      '--checkpoint',
+      help='Checkpoint file (defaults to .<index>.checkpoint in BASE_DIR)'
+    )
+    parser.add_argument(
+      '--resume',
+      action='store_true',
+      help='Continue after the key stored in the checkpoint file'
+    )
+    parser.add_argument(
+      '--bulk-load',
+      action='store_true',
+      help='Disable refreshes and replicas on the index while loading'
+    )
+
+  def handle(self, *args, **options):
+    index_class, get_model = INDICES[options['index']]
+    index_name = index_class.get_index_name()
+    checkpoint = options['checkpoint'] or os.path.join(
+      settings.BASE_DIR, f".{index_name}.checkpoint"
+    )
+
+    after = None
+    if options['resume']:
+      after = self._read_checkpoint(checkpoint)
+      self.stdout.write(f"Resuming {index_name} after {after}")
+
+    progress = asyncio.run(self._sync(
+      index_class,
+      get_model(),
+      after,
+      checkpoint,
+      options
+    ))
+
+    progress.report(force=True)
+    if progress.failed:
+      raise CommandError(
+        f"{progress.failed} documents failed to index. "
+        f"Re-run with --resume to continue from {progress.last_id}."
+      )
+
+    if os.path.exists(checkpoint):
+      os.remove(checkpoint)
+    self.stdout.write(self.style.SUCCESS(f"Rebuilt {index_name}"))
+
+  def _read_checkpoint(self, checkpoint: str) -> Optional[str]:
+    if not os.path.exists(checkpoint):
+      raise CommandError(f"No checkpoint found at {checkpoint}")
+    with open(checkpoint) as f:
+      return json.load(f).get('last_id')
+
+  async def _sync(self, index_class, model, after, checkpoint, options) -> SyncProgress:
+    workers = max(1, options['workers'])
+    chunk_size = max(1, options['chunk_size'])
+    index_name = index_class.get_index_name()
+
+    total = await sync_to_async(self._count)(model, after)
+    progress = SyncProgress(self, total, checkpoint)
+    # Bounded so the reader can only run a few chunks ahead of the workers
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+
+    client = ESClient()
+    try:
+      await client.ensure_connection()
+      pipeline = [
+        self._produce(index_class, model, after, chunk_size, queue, workers),
+        *(self._work(client, index_name, queue, progress) for _ in range(workers))
+      ]
+      if options['bulk_load']:
+        async with client.bulk_load(index_name):
+          await asyncio.gather(*pipeline)
+      else:
+        await asyncio.gather(*pipeline)
+    finally:
+      await client.close()
+      await sync_to_async(close_old_connections)()
+
+    return progress
+
+  def _count(self, model, after: Optional[str]) -> int:
+    queryset = model.objects.all()
+    if after:
+      queryset = queryset.filter(pk__gt=after)
+    return queryset.count()
+
+  def _fetch_chunk(
+    self,
+    index_class,
+    model,
+    after: Optional[str],
+    chunk_size: int
+  ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Read the next page after the given key and convert it to documents."""
+    queryset = model.objects.order_by('pk')
+    if after:
+      queryset = queryset.filter(pk__gt=after)
+    documents = list(index_class.get_documents(queryset[:chunk_size], chunk_size))
+    if not documents:
+      return [], None
+    return documents, documents[-1]['id']
+
+  async def _produce(self, index_class, model, after, chunk_size, queue, workers) -> None:
+    fetch_chunk = sync_to_async(self._fetch_chunk)
+    seq = 0
+    try:
+      while True:
+        documents, last_id = await fetch_chunk(index_class, model, after, chunk_size)
+        if not documents:
+          break
+        await queue.put((seq, last_id, documents))
+        after = last_id
+        seq += 1
+    finally:
+      for _ in range(workers):
+        await queue.put(None)
+
+  async def _work(self, client: ESClient, index: str, queue: asyncio.Queue, progress: SyncProgress) -> None:
+    while True:
+      item = await queue.get()
+      if item is None:
+        return
+
+      seq, last_id, documents = item
+      success = False
+      for attempt in range(SYNC_CHUNK_RETRIES):
+        if await client.bulk_update(index, documents):
+          success = True
+          break
+        if attempt + 1 < SYNC_CHUNK_RETRIES:
+          await asyncio.sleep(2 ** attempt)
+
+      progress.done(seq, last_id, len(documents), success)
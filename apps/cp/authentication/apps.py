@@ -4,4 +4,7 @@ class AuthConfig(AppConfig):
   default_auto_field = 'django.db.models.BigAutoField'
   name = 'apps.cp.authentication'
   label = 'cp_auth'  # This ensures a unique app label
-  verbose_name = 'CP Authentication'
\ No newline at end of file
+  verbose_name = 'CP Authentication'
+
+  def ready(self):
+    import apps.cp.authentication.signals
@@ -0,0 +1,44 @@
+"""Per-email failed login counter, checked before any password is hashed."""
+from django.core.cache import cache
+from core.redis.constants import (
+  LOGIN_ATTEMPT_PREFIX,
+  MAX_LOGIN_ATTEMPTS,
+  LOGIN_ATTEMPT_EXPIRE
+)
+from shared.utils.logger import logger
+
+class LoginAttempts:
+  def __init__(self, limit: int = MAX_LOGIN_ATTEMPTS, expire: int = LOGIN_ATTEMPT_EXPIRE):
+    self.limit = limit
+    self.expire = expire
+
+  @staticmethod
+  def _key(email: str) -> str:
+    # Case variants of an address must share one counter
+    return f"{LOGIN_ATTEMPT_PREFIX}{email.strip().lower()}"
+
+  def is_blocked(self, email: str) -> bool:
+    try:
+      return (cache.get(self._key(email)) or 0) >= self.limit
+    except Exception as e:
+      logger.warning(f"Failed to read login attempts: {str(e)}")
+      return False
+
+  def fail(self, email: str) -> None:
+    key = self._key(email)
+    try:
+      # The window starts at the first failure and isn't extended by later ones
+      cache.add(key, 0, self.expire)
+      cache.incr(key)
+    except ValueError:
+      cache.set(key, 1, self.expire)
+    except Exception as e:
+      logger.warning(f"Failed to record login attempt: {str(e)}")
+
+  def reset(self, email: str) -> None:
+    try:
+      cache.delete(self._key(email))
+    except Exception as e:
+      logger.warning(f"Failed to reset login attempts: {str(e)}")
+
+login_attempts = LoginAttempts()
@@ -0,0 +1,46 @@
+from django.contrib.auth.models import AnonymousUser
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .principal import CustomerPrincipal, principal_cache
+from .tokens import token_service
+
+def get_principal(request):
+  """Principal of a request's token, or AnonymousUser if it has none."""
+  try:
+    resolved = CPJWTAuthentication().authenticate(request)
+  except AuthenticationFailed:
+    resolved = None
+  return resolved[0] if resolved else AnonymousUser()
+
+class CPJWTAuthentication(JWTAuthentication):
+  """JWT authentication resolving tokens to cached customer principals."""
+
+  def authenticate(self, request):
+    # Memoized on the HttpRequest so the middleware and DRF validate once
+    http_request = getattr(request, '_request', request)
+    if not hasattr(http_request, '_cp_auth'):
+      try:
+        http_request._cp_auth = super().authenticate(http_request)
+      except AuthenticationFailed as e:
+        http_request._cp_auth = e
+    if isinstance(http_request._cp_auth, AuthenticationFailed):
+      raise http_request._cp_auth
+    return http_request._cp_auth
+
+  def get_validated_token(self, raw_token):
+    return token_service.validate(raw_token)
+
+  def get_user(self, validated_token) -> CustomerPrincipal:
+    try:
+      user_id = validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError as e:
+      raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    principal = principal_cache.get(user_id, validated_token.get(api_settings.JTI_CLAIM))
+    if principal is None:
+      raise AuthenticationFailed(_("User not found"), code="user_not_found")
+    if api_settings.CHECK_USER_IS_ACTIVE and not principal.is_active:
+      raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+    return principal
@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from .hashing import password_pool
+
+Customer = get_user_model()
+
+class PooledPasswordBackend(ModelBackend):
+  """Model backend verifying passwords in the hash pool instead of the request thread."""
+
+  def authenticate(self, request, username=None, password=None, **kwargs):
+    if username is None:
+      username = kwargs.get(Customer.USERNAME_FIELD)
+    if username is None or password is None:
+      return None
+
+    try:
+      user = Customer._default_manager.get_by_natural_key(username)
+    except Customer.DoesNotExist:
+      user = None
+
+    if user is None or not user.has_usable_password():
+      # Unknown emails take as long as known ones
+      password_pool.verify_dummy(password)
+      return None
+
+    valid, must_update = password_pool.verify(password, user.password)
+    if not valid or not self.user_can_authenticate(user):
+      return None
+
+    if must_update:
+      user.password = password_pool.hash(password)
+      user.save(update_fields=['password'])
+    return user
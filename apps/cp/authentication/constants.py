@@ -0,0 +1,8 @@
+"""CP authentication constants."""
+
+# Validated access tokens kept per process
+TOKEN_CACHE_SIZE = 10000
+
+# Password hashing pool
+HASH_QUEUE_FACTOR = 4  # pending hashes per worker before throttling
+HASH_SLOT_TIMEOUT = 0.5  # seconds to wait for a free slot
@@ -0,0 +1,145 @@
+"""
+Password hashing in a bounded process pool.
+
+PBKDF2 is deliberately slow, tens of milliseconds of CPU per call, so
+login storms used to saturate every CPU the request workers run on. Hashes
+are computed in a fixed number of processes instead, which caps the CPU
+logins can take. The calling request thread still waits for its result;
+when too many hashes are pending, callers are throttled after a short wait
+rather than queued without limit.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+  PBKDF2PasswordHasher,
+  get_hasher,
+  identify_hasher,
+  make_password
+)
+from django.utils.crypto import constant_time_compare
+from rest_framework.exceptions import Throttled
+
+from .constants import HASH_QUEUE_FACTOR, HASH_SLOT_TIMEOUT
+from .pbkdf2 import pbkdf2_hash
+
+class PasswordHashPool:
+  def __init__(
+    self,
+    workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    timeout: float = HASH_SLOT_TIMEOUT
+  ):
+    """
+    Initialize hash pool
+
+    Args:
+      workers: Hashing processes, defaults to PASSWORD_HASH_WORKERS or the CPU count
+      max_pending: Hashes running or queued before callers are throttled
+      timeout: Seconds to wait for a free slot before throttling
+    """
+    self.workers = workers or getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1
+    self.max_pending = max_pending or self.workers * HASH_QUEUE_FACTOR
+    self.timeout = timeout
+    self._slots = threading.BoundedSemaphore(self.max_pending)
+    self._executor: Optional[ProcessPoolExecutor] = None
+    self._lock = threading.Lock()
+    self.in_flight = 0
+    self.peak_in_flight = 0
+    self.completed = 0
+    self.rejected = 0
+
+  def _get_executor(self) -> ProcessPoolExecutor:
+    with self._lock:
+      if self._executor is None:
+        # Forking a threaded server process is unsafe
+        self._executor = ProcessPoolExecutor(
+          max_workers=self.workers,
+          mp_context=multiprocessing.get_context('spawn')
+        )
+        atexit.register(self.shutdown)
+      return self._executor
+
+  def _run(self, password: str, salt: str, iterations: int, digest: str) -> str:
+    if not self._slots.acquire(timeout=self.timeout):
+      with self._lock:
+        self.rejected += 1
+      raise Throttled(detail='Too many authentication requests, please retry')
+
+    with self._lock:
+      self.in_flight += 1
+      self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+    try:
+      future = self._get_executor().submit(pbkdf2_hash, password, salt, iterations, digest)
+      return future.result()
+    finally:
+      with self._lock:
+        self.in_flight -= 1
+        self.completed += 1
+      self._slots.release()
+
+  @staticmethod
+  def _digest(hasher: PBKDF2PasswordHasher) -> str:
+    return hasher.digest().name
+
+  def hash(self, password: str) -> str:
+    """Encode a password with the preferred hasher."""
+    hasher = get_hasher()
+    if not isinstance(hasher, PBKDF2PasswordHasher):
+      return make_password(password, hasher=hasher)
+    salt = hasher.salt()
+    hash = self._run(password, salt, hasher.iterations, self._digest(hasher))
+    return "%s$%d$%s$%s" % (hasher.algorithm, hasher.iterations, salt, hash)
+
+  def verify(self, password: str, encoded: str) -> Tuple[bool, bool]:
+    """Check a password, returning whether it matched and needs rehashing."""
+    try:
+      hasher = identify_hasher(encoded)
+    except ValueError:
+      return False, False
+
+    if isinstance(hasher, PBKDF2PasswordHasher):
+      decoded = hasher.decode(encoded)
+      hash = self._run(password, decoded['salt'], decoded['iterations'], self._digest(hasher))
+      valid = constant_time_compare(decoded['hash'], hash)
+    else:
+      valid = hasher.verify(password, encoded)
+
+    preferred = get_hasher()
+    must_update = valid and (
+      hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+    )
+    return valid, must_update
+
+  def verify_dummy(self, password: str) -> None:
+    """Spend as long as a real check, so unknown emails can't be told apart."""
+    hasher = get_hasher()
+    if isinstance(hasher, PBKDF2PasswordHasher):
+      self._run(password, hasher.salt(), hasher.iterations, self._digest(hasher))
+    else:
+      make_password(password, hasher=hasher)
+
+  def stats(self) -> dict:
+    with self._lock:
+      return {
+        'workers': self.workers,
+        'max_pending': self.max_pending,
+        'in_flight': self.in_flight,
+        'queued': max(0, self.in_flight - self.workers),
+        'peak_in_flight': self.peak_in_flight,
+        'completed': self.completed,
+        'rejected': self.rejected
+      }
+
+  def shutdown(self) -> None:
+    with self._lock:
+      executor, self._executor = self._executor, None
+    if executor is not None:
+      executor.shutdown(wait=True, cancel_futures=True)
+
+password_pool = PasswordHashPool()
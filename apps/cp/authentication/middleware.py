@@ -1,7 +1,14 @@
+import math
+from typing import NamedTuple, Optional
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.utils.functional import SimpleLazyObject
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from django.http import HttpResponseForbidden
-from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+from django.http import HttpResponse
+from core.redis.ratelimit import RateLimit, RateLimiter
+from .authentication import get_principal
+from .tokens import token_service
 
 class CPAuthenticationMiddleware:
   def __init__(self, get_response):
@@ -9,30 +16,84 @@ class CPAuthenticationMiddleware:
 
   def __call__(self, request):
     if not request.path.startswith('/api/v1/cp/auth/'):
-      auth = JWTAuthentication()
-      try:
-        validated_token = auth.get_validated_token(
-            auth.get_raw_token(request)
-        )
-        request.user = auth.get_user(validated_token)
-      except:
-        return HttpResponseForbidden('Invalid token')
+      # Validated on first access, requests that never read the user pay nothing
+      request.user = SimpleLazyObject(lambda: get_principal(request))
 
     return self.get_response(request)
 
+class RateLimitPolicy(NamedTuple):
+  path: str
+  limit: int
+  period: int
+  key: str
+
+  @classmethod
+  def from_setting(cls, policy: dict) -> 'RateLimitPolicy':
+    key = policy.get('KEY', 'ip')
+    if key not in ('ip', 'user'):
+      raise ImproperlyConfigured(f"Unknown rate limit key: {key}")
+    return cls(policy['PATH'], int(policy['LIMIT']), int(policy['PERIOD']), key)
+
 class RateLimitMiddleware:
+  """Applies the first CP_RATE_LIMITS policy whose path prefix matches."""
+  sync_capable = True
+  async_capable = True
+
   def __init__(self, get_response):
     self.get_response = get_response
+    self.policies = [
+      RateLimitPolicy.from_setting(policy)
+      for policy in getattr(settings, 'CP_RATE_LIMITS', ())
+    ]
+    self.limiter = RateLimiter()
+    if iscoroutinefunction(get_response):
+      markcoroutinefunction(self)
 
   def __call__(self, request):
-    if request.path.startswith('/api/v1/cp/'):
-      ip = request.META.get('REMOTE_ADDR')
-      key = f'ratelimit:{ip}'
-      
-      if cache.get(key, 0) >= 100:  # 100 requests per minute
-        return HttpResponse('Too many requests', status=429)
-          
-      cache.get_or_set(key, 0, 60)
-      cache.incr(key)
-    
-    return self.get_response(request)
\ No newline at end of file
+    if iscoroutinefunction(self):
+      return self.__acall__(request)
+    policy = self._match(request)
+    if policy is None:
+      return self.get_response(request)
+
+    # Blocking client: under WSGI there is no event loop to keep an async one on
+    result = self.limiter.hit_sync(self._key(request, policy), policy.limit, policy.period)
+    response = self.get_response(request) if result.allowed else self._reject(result)
+    return self._annotate(response, result)
+
+  async def __acall__(self, request):
+    policy = self._match(request)
+    if policy is None:
+      return await self.get_response(request)
+
+    result = await self.limiter.hit(self._key(request, policy), policy.limit, policy.period)
+    response = await self.get_response(request) if result.allowed else self._reject(result)
+    return self._annotate(response, result)
+
+  def _match(self, request) -> Optional[RateLimitPolicy]:
+    return next((p for p in self.policies if request.path.startswith(p.path)), None)
+
+  def _key(self, request, policy: RateLimitPolicy) -> str:
+    return f"{policy.path}:{self._identify(request, policy)}"
+
+  @staticmethod
+  def _reject(result: RateLimit) -> HttpResponse:
+    response = HttpResponse('Too many requests', status=429)
+    response['Retry-After'] = str(math.ceil(result.retry_after))
+    return response
+
+  @staticmethod
+  def _annotate(response, result: RateLimit):
+    response['X-RateLimit-Limit'] = str(result.limit)
+    response['X-RateLimit-Remaining'] = str(result.remaining)
+    response['X-RateLimit-Reset'] = str(math.ceil(result.reset))
+    return response
+
+  @staticmethod
+  def _identify(request, policy: RateLimitPolicy) -> str:
+    if policy.key == 'user':
+      # Token claims only, loading the principal would query the database
+      token = token_service.get_request_token(request)
+      if token is not None and api_settings.USER_ID_CLAIM in token:
+        return f"user:{token[api_settings.USER_ID_CLAIM]}"
+    return f"ip:{request.META.get('REMOTE_ADDR')}"
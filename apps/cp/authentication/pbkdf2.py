@@ -0,0 +1,13 @@
+"""
+PBKDF2 for the hashing pool processes.
+
+Pool processes are spawned and import this module on their own, so it must
+not import Django or anything that reads settings.
+"""
+import base64
+import hashlib
+
+def pbkdf2_hash(password: str, salt: str, iterations: int, digest: str) -> str:
+  """Base64 PBKDF2-HMAC hash, as Django's PBKDF2 hashers encode it."""
+  hash = hashlib.pbkdf2_hmac(digest, password.encode(), salt.encode(), iterations)
+  return base64.b64encode(hash).decode('ascii').strip()
@@ -0,0 +1,111 @@
+"""
+Authenticated customer snapshots for CP requests.
+
+Resolving the user of a token used to load the full Customer on every
+request. Principals are slim, immutable snapshots cached per process for a
+few seconds and in Redis until the customer changes.
+"""
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from core.redis.constants import (
+  PRINCIPAL_PREFIX,
+  PRINCIPAL_CACHE_TTL,
+  PRINCIPAL_LOCAL_SIZE,
+  PRINCIPAL_LOCAL_TTL
+)
+from core.redis.local_cache import LocalCache
+from shared.utils.logger import logger
+
+@dataclass(frozen=True)
+class CustomerPrincipal:
+  id: str
+  email: str
+  status: str
+  is_active: bool
+
+  is_authenticated = True
+  is_anonymous = False
+
+  @property
+  def pk(self) -> str:
+    return self.id
+
+  @classmethod
+  def from_customer(cls, customer) -> 'CustomerPrincipal':
+    return cls(
+      id=str(customer.pk),
+      email=customer.email,
+      status=customer.status,
+      is_active=customer.is_active
+    )
+
+class PrincipalCache:
+  def __init__(
+    self,
+    max_size: int = PRINCIPAL_LOCAL_SIZE,
+    local_ttl: float = PRINCIPAL_LOCAL_TTL,
+    ttl: int = PRINCIPAL_CACHE_TTL
+  ):
+    """
+    Initialize principal cache
+
+    Args:
+      max_size: Maximum number of principals kept in process
+      local_ttl: Seconds a principal is reused in process without asking Redis
+      ttl: Seconds a principal is kept in Redis
+    """
+    # Keyed by token, so a fresh login never reuses another process's copy
+    self._local = LocalCache(max_size=max_size, ttl=local_ttl)
+    self.ttl = ttl
+
+  @staticmethod
+  def _key(user_id: Any) -> str:
+    return f"{PRINCIPAL_PREFIX}{user_id}"
+
+  def get(self, user_id: Any, jti: Optional[str] = None) -> Optional[CustomerPrincipal]:
+    """Principal for a token's user, or None if the customer doesn't exist."""
+    local_key = (str(user_id), jti)
+    principal = self._local.get(local_key, None)
+    if principal is not None:
+      return principal
+
+    generation = self._local.generation
+    principal = self._load(user_id)
+    if principal is not None:
+      self._local.set_if_generation(local_key, principal, generation)
+    return principal
+
+  def _load(self, user_id: Any) -> Optional[CustomerPrincipal]:
+    try:
+      data = cache.get(self._key(user_id))
+      if data is not None:
+        return CustomerPrincipal(**data)
+    except Exception as e:
+      logger.warning(f"Failed to read principal {user_id} from cache: {str(e)}")
+
+    customer = get_user_model().objects.filter(pk=user_id).only(
+      'id', 'email', 'status', 'is_active'
+    ).first()
+    if customer is None:
+      return None
+
+    principal = CustomerPrincipal.from_customer(customer)
+    try:
+      cache.set(self._key(user_id), asdict(principal), self.ttl)
+    except Exception as e:
+      logger.warning(f"Failed to cache principal {user_id}: {str(e)}")
+    return principal
+
+  def invalidate(self, user_id: Any) -> None:
+    user_id = str(user_id)
+    self._local.delete_matching(lambda key: key[0] == user_id)
+    try:
+      cache.delete(self._key(user_id))
+    except Exception as e:
+      logger.warning(f"Failed to invalidate principal {user_id}: {str(e)}")
+
+principal_cache = PrincipalCache()
@@ -1,6 +1,9 @@
 from rest_framework import serializers
-from django.contrib.auth import get_user_model, authenticate
+from django.contrib.auth import authenticate, get_user_model
 from django.core.exceptions import ValidationError
+from rest_framework.exceptions import Throttled
+from .attempts import login_attempts
+from .hashing import password_pool
 
 Customer = get_user_model()
 
@@ -14,7 +17,7 @@ class RegisterSerializer(serializers.ModelSerializer):
   def create(self, validated_data):
     password = validated_data.pop('password')
     user = Customer(**validated_data)
-    user.set_password(password)
+    user.password = password_pool.hash(password)
     user.save()
     return user
 
@@ -23,17 +26,19 @@ class LoginSerializer(serializers.Serializer):
   password = serializers.CharField()
 
   def validate(self, attrs):
-    user = authenticate(
-        email=attrs.get('email'),
-        password=attrs.get('password')
-    )
-    
-    if not user:
-        raise ValidationError('Invalid credentials')
-    
-    if not user.is_active:
-        raise ValidationError('Account is disabled')
-        
+    email = Customer.objects.normalize_email(attrs.get('email'))
+    password = attrs.get('password')
+
+    # Brute-force traffic stops here, before it costs a hash
+    if login_attempts.is_blocked(email):
+      raise Throttled(detail='Too many failed login attempts')
+
+    user = authenticate(self.context.get('request'), email=email, password=password)
+    if user is None:
+      login_attempts.fail(email)
+      raise ValidationError('Invalid credentials')
+    login_attempts.reset(email)
+
     attrs['user'] = user
     return attrs
 
@@ -0,0 +1,11 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .principal import principal_cache
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_principal(sender, instance, **kwargs):
+  customer_id = str(instance.pk)
+  transaction.on_commit(lambda: principal_cache.invalidate(customer_id))
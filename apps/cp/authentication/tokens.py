@@ -0,0 +1,148 @@
+"""
+Token issuing and validation shared by the CP middleware and DRF.
+
+Signing keys are parsed once per process, and validated access tokens are
+cached by their raw value until they expire, so a token is decoded and its
+signature checked once rather than on every request.
+"""
+import time
+from functools import cached_property
+from typing import Dict, Optional, Union
+
+import jwt
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from core.redis.local_cache import LocalCache
+from .constants import TOKEN_CACHE_SIZE
+
+AUTH_HEADER_TYPES = {
+  header_type.encode() for header_type in (
+    api_settings.AUTH_HEADER_TYPES
+    if isinstance(api_settings.AUTH_HEADER_TYPES, (list, tuple))
+    else (api_settings.AUTH_HEADER_TYPES,)
+  )
+}
+
+class CachedKeyTokenBackend(TokenBackend):
+  """TokenBackend that parses the signing and verifying keys once."""
+
+  def _prepare(self, key):
+    if not key:
+      return key
+    return jwt.PyJWS().get_algorithm_by_name(self.algorithm).prepare_key(key)
+
+  @cached_property
+  def prepared_signing_key(self):
+    return self._prepare(self.signing_key)
+
+  @cached_property
+  def prepared_verifying_key(self):
+    return self._prepare(self.verifying_key)
+
+  def get_verifying_key(self, token):
+    if self.algorithm.startswith("HS"):
+      return self.prepared_signing_key
+    if self.jwks_client:
+      return super().get_verifying_key(token)
+    return self.prepared_verifying_key
+
+  def encode(self, payload: dict) -> str:
+    jwt_payload = payload.copy()
+    if self.audience is not None:
+      jwt_payload["aud"] = self.audience
+    if self.issuer is not None:
+      jwt_payload["iss"] = self.issuer
+    return jwt.encode(
+      jwt_payload,
+      self.prepared_signing_key,
+      algorithm=self.algorithm,
+      json_encoder=self.json_encoder
+    )
+
+class ServiceTokenMixin:
+  def get_token_backend(self) -> TokenBackend:
+    return token_service.backend
+
+class CPAccessToken(ServiceTokenMixin, AccessToken):
+  pass
+
+class CPRefreshToken(ServiceTokenMixin, RefreshToken):
+  access_token_class = CPAccessToken
+
+class TokenService:
+  def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+    """
+    Initialize token service
+
+    Args:
+      max_size: Maximum number of validated tokens kept
+    """
+    self._validated = LocalCache(max_size=max_size)
+
+  @cached_property
+  def backend(self) -> TokenBackend:
+    return CachedKeyTokenBackend(
+      api_settings.ALGORITHM,
+      api_settings.SIGNING_KEY,
+      api_settings.VERIFYING_KEY,
+      api_settings.AUDIENCE,
+      api_settings.ISSUER,
+      api_settings.JWK_URL,
+      api_settings.LEEWAY,
+      api_settings.JSON_ENCODER
+    )
+
+  def validate(self, raw_token: Union[str, bytes]) -> CPAccessToken:
+    """Validate an access token, raising InvalidToken if it isn't valid."""
+    key = raw_token.encode() if isinstance(raw_token, str) else raw_token
+    token = self._validated.get(key, None)
+    if token is not None:
+      return token
+
+    try:
+      token = CPAccessToken(key)
+    except TokenError as e:
+      raise InvalidToken({
+        "detail": _("Given token not valid for any token type"),
+        "messages": [{
+          "token_class": CPAccessToken.__name__,
+          "token_type": CPAccessToken.token_type,
+          "message": e.args[0]
+        }]
+      }) from e
+
+    self._remember(key, token)
+    return token
+
+  def _remember(self, key: bytes, token: CPAccessToken) -> None:
+    # Entries expire with the token, so a cached token is always still valid
+    ttl = token['exp'] - time.time()
+    if ttl > 0:
+      self._validated.set(key, token, ttl=ttl)
+
+  def get_request_token(self, request) -> Optional[CPAccessToken]:
+    """Validated access token of a request, or None if absent or invalid."""
+    header = request.META.get(api_settings.AUTH_HEADER_NAME)
+    if not header:
+      return None
+    parts = (header.encode() if isinstance(header, str) else header).split()
+    if len(parts) != 2 or parts[0] not in AUTH_HEADER_TYPES:
+      return None
+    try:
+      return self.validate(parts[1])
+    except InvalidToken:
+      return None
+
+  def issue(self, user) -> Dict[str, str]:
+    """Mint a token pair, keeping the access token as already validated."""
+    refresh = CPRefreshToken.for_user(user)
+    access = refresh.access_token
+    encoded = str(access)
+    self._remember(encoded.encode(), access)
+    return {'access': encoded, 'refresh': str(refresh)}
+
+token_service = TokenService()
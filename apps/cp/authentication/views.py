@@ -2,9 +2,9 @@ from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from .serializers import RegisterSerializer, LoginSerializer, CustomerSerializer
+from .tokens import token_service
 from core.elasticsearch.client import es_client
 from core.elasticsearch.indices import CustomerIndex
 from asgiref.sync import async_to_sync
@@ -30,14 +30,14 @@ class AuthViewSet(viewsets.GenericViewSet):
 
   @action(detail=False, methods=['post'])
   def login(self, request):
-    serializer = LoginSerializer(data=request.data)
+    serializer = LoginSerializer(data=request.data, context={'request': request})
     serializer.is_valid(raise_exception=True)
     
     user = serializer.validated_data['user']
-    refresh = RefreshToken.for_user(user)
+    tokens = token_service.issue(user)
     
     return Response({
-      'access': str(refresh.access_token),
-      'refresh': str(refresh),
+      'access': tokens['access'],
+      'refresh': tokens['refresh'],
       'user': CustomerSerializer(user).data
     })
\ No newline at end of file
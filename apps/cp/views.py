@@ -11,12 +11,14 @@ class CustomerViewSet(GenericViewSet):
   
   @action(detail=False, methods=['get'])
   def profile(self, request):
+    # request.user is a cached principal, load the fields it doesn't carry
+    customer = Customer.objects.get(pk=request.user.pk)
     return Response({
-      'id': str(request.user.id),
-      'email': request.user.email,
-      'first_name': request.user.first_name,
-      'last_name': request.user.last_name,
-      'phone': request.user.phone,
-      'country': request.user.country,
-      'status': request.user.status
+      'id': str(customer.id),
+      'email': customer.email,
+      'first_name': customer.first_name,
+      'last_name': customer.last_name,
+      'phone': customer.phone,
+      'country': customer.country,
+      'status': customer.status
     })
\ No newline at end of file
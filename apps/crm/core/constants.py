@@ -0,0 +1,8 @@
+"""CRM constants."""
+
+# List pagination
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Above this many planner-estimated rows list counts are estimates, not COUNT(*)
+COUNT_ESTIMATE_THRESHOLD = 10000
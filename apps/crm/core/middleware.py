@@ -1,3 +1,5 @@
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.http import HttpResponseForbidden
 from shared.utils.logger import logger
 
@@ -13,21 +15,42 @@ class StaffAuthenticationMiddleware:
     return self.get_response(request)
 
 class AuditLogMiddleware:
+  """Logs one record per CRM request; shipping happens off the request path."""
+  sync_capable = True
+  async_capable = True
+
   def __init__(self, get_response):
     self.get_response = get_response
+    if iscoroutinefunction(get_response):
+      markcoroutinefunction(self)
 
   def __call__(self, request):
+    if iscoroutinefunction(self):
+      return self.__acall__(request)
+    started = time.monotonic()
     response = self.get_response(request)
-    
-    if request.path.startswith('/api/v1/crm/'):
-      logger.info(
-        'Staff action',
-        extra={
-          'staff_id': request.user.id,
-          'path': request.path,
-          'method': request.method,
-          'status_code': response.status_code
-        }
-      )
-    
-    return response
\ No newline at end of file
+    self.log(request, response, started)
+    return response
+
+  async def __acall__(self, request):
+    started = time.monotonic()
+    response = await self.get_response(request)
+    self.log(request, response, started)
+    return response
+
+  @staticmethod
+  def log(request, response, started: float) -> None:
+    if not request.path.startswith('/api/v1/crm/'):
+      return
+    staff_id = getattr(request.user, 'id', None)
+    logger.info(
+      'Staff action',
+      extra={
+        'staff_id': str(staff_id) if staff_id else None,
+        'path': request.path,
+        'method': request.method,
+        'status_code': response.status_code,
+        'duration_ms': round((time.monotonic() - started) * 1000, 2),
+        'ip': request.META.get('REMOTE_ADDR')
+      }
+    )
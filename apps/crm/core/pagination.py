@@ -0,0 +1,165 @@
+"""
+Keyset pagination for CRM lists.
+
+Pages are read with a range condition on a unique sort key instead of
+OFFSET, so the database seeks straight to the page through an index
+whatever its depth. Counting the whole result is the other cost that grows
+with the table; above a threshold the planner's row estimate is returned
+instead of running COUNT(*).
+"""
+import json
+from base64 import b64decode, b64encode
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .constants import PAGE_SIZE, MAX_PAGE_SIZE, COUNT_ESTIMATE_THRESHOLD
+
+def planner_estimate(queryset) -> Optional[int]:
+  """Rows the PostgreSQL planner expects a queryset to return, None elsewhere."""
+  connection = connections[queryset.db]
+  if connection.vendor != 'postgresql':
+    return None
+  sql, params = queryset.order_by().values('pk').query.sql_with_params()
+  with connection.cursor() as cursor:
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+    plan = cursor.fetchone()[0]
+  if isinstance(plan, str):
+    plan = json.loads(plan)
+  return int(plan[0]['Plan']['Plan Rows'])
+
+def approximate_count(queryset, threshold: int = COUNT_ESTIMATE_THRESHOLD) -> Tuple[int, bool]:
+  """
+  Count a queryset, exactly only when that is cheap.
+
+  Returns:
+    (count, estimated): the planner's estimate when it is at least
+    threshold rows, otherwise the exact count
+  """
+  estimate = planner_estimate(queryset)
+  if estimate is not None and estimate >= threshold:
+    return estimate, True
+  return queryset.count(), False
+
+class KeysetPagination(BasePagination):
+  """
+  Newest-first pages keyed on (created_at, id).
+
+  The cursor holds the key of the last row of the page, or of the first
+  one when paging backwards. id breaks ties between rows created in the
+  same instant, so no row is skipped or repeated.
+  """
+  keys = ('created_at', 'id')
+  cursor_query_param = 'cursor'
+  page_size_query_param = 'page_size'
+  page_size = PAGE_SIZE
+  max_page_size = MAX_PAGE_SIZE
+  invalid_cursor_message = 'Invalid cursor'
+
+  def paginate_queryset(self, queryset, request, view=None) -> List[Any]:
+    self.request = request
+    self.base_url = request.build_absolute_uri()
+    self.page_size = self.get_page_size(request)
+    self.count, self.count_estimated = approximate_count(
+      queryset,
+      getattr(settings, 'CRM_COUNT_ESTIMATE_THRESHOLD', COUNT_ESTIMATE_THRESHOLD)
+    )
+
+    cursor = self.decode_cursor(request, queryset.model)
+    reverse = bool(cursor and cursor['reverse'])
+    direction = '' if reverse else '-'
+    queryset = queryset.order_by(*(f"{direction}{key}" for key in self.keys))
+    if cursor:
+      queryset = queryset.filter(self.after(cursor['position'], reverse))
+
+    rows = list(queryset[:self.page_size + 1])
+    has_more = len(rows) > self.page_size
+    rows = rows[:self.page_size]
+    if reverse:
+      rows.reverse()
+      self.has_next, self.has_previous = True, has_more
+    else:
+      self.has_next, self.has_previous = has_more, cursor is not None
+    self.page = rows
+    return rows
+
+  def after(self, position: List[Any], reverse: bool) -> Q:
+    """Rows past position in the direction being read."""
+    (first, first_value), (second, second_value) = zip(self.keys, position)
+    lookup = 'gt' if reverse else 'lt'
+    # The bare range on the leading key lets the index seek to the page
+    return Q(**{f"{first}__{lookup}e": first_value}) & (
+      Q(**{f"{first}__{lookup}": first_value}) |
+      Q(**{f"{second}__{lookup}": second_value})
+    )
+
+  def get_page_size(self, request) -> int:
+    try:
+      size = int(request.query_params[self.page_size_query_param])
+    except (KeyError, ValueError):
+      return self.page_size
+    return min(max(size, 1), self.max_page_size)
+
+  def decode_cursor(self, request, model) -> Optional[Dict[str, Any]]:
+    encoded = request.query_params.get(self.cursor_query_param)
+    if not encoded:
+      return None
+    try:
+      data = json.loads(b64decode(encoded.encode('ascii')))
+      if len(data['p']) != len(self.keys):
+        raise ValueError
+      position = [
+        model._meta.get_field(key).to_python(value)
+        for key, value in zip(self.keys, data['p'])
+      ]
+      return {'position': position, 'reverse': bool(data.get('r'))}
+    except Exception:
+      raise NotFound(self.invalid_cursor_message)
+
+  def encode_cursor(self, instance, reverse: bool) -> str:
+    position = [str(getattr(instance, key)) for key in self.keys]
+    data = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+    return replace_query_param(
+      self.base_url,
+      self.cursor_query_param,
+      b64encode(data.encode('utf-8')).decode('ascii')
+    )
+
+  def get_next_link(self) -> Optional[str]:
+    if not self.has_next or not self.page:
+      return None
+    return self.encode_cursor(self.page[-1], reverse=False)
+
+  def get_previous_link(self) -> Optional[str]:
+    if not self.has_previous:
+      return None
+    if not self.page:
+      return remove_query_param(self.base_url, self.cursor_query_param)
+    return self.encode_cursor(self.page[0], reverse=True)
+
+  def get_paginated_response(self, data) -> Response:
+    return Response({
+      'count': self.count,
+      'count_estimated': self.count_estimated,
+      'next': self.get_next_link(),
+      'previous': self.get_previous_link(),
+      'results': data
+    })
+
+  def get_paginated_response_schema(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+      'type': 'object',
+      'properties': {
+        'count': {'type': 'integer'},
+        'count_estimated': {'type': 'boolean'},
+        'next': {'type': 'string', 'nullable': True},
+        'previous': {'type': 'string', 'nullable': True},
+        'results': schema
+      }
+    }
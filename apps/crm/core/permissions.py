@@ -0,0 +1,9 @@
+from rest_framework.permissions import BasePermission
+
+class IsStaffUser(BasePermission):
+  def has_permission(self, request, view):
+    return bool(
+      request.user and
+      request.user.is_authenticated and
+      getattr(request.user, 'is_staff', False)
+    )
@@ -0,0 +1,13 @@
+import django_filters
+from django.contrib.auth import get_user_model
+
+Customer = get_user_model()
+
+class CustomerFilter(django_filters.FilterSet):
+  email = django_filters.CharFilter(lookup_expr='iexact')
+  created_after = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte')
+  created_before = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lt')
+
+  class Meta:
+    model = Customer
+    fields = ['email', 'status', 'country', 'is_active']
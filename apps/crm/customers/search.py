@@ -0,0 +1,64 @@
+"""
+Customer type-ahead for the CRM search box.
+
+Queries the autocomplete subfields of the customer index without counting
+total hits. When Elasticsearch can't answer, a database substring search is
+used instead so the search box keeps working, only slower.
+
+Both run synchronously: the views are served by WSGI, where the async
+Elasticsearch connection and SQLAlchemy engine, each bound to one event
+loop, can't be shared between requests.
+"""
+from typing import Any, Dict, List, Optional
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+from core.elasticsearch.client import es_client
+from core.elasticsearch.constants import AUTOCOMPLETE_SIZE
+from core.elasticsearch.exceptions import ESError
+from core.elasticsearch.indices import CustomerIndex
+from shared.utils.logger import logger
+
+Customer = get_user_model()
+
+def search_database(
+  text: str,
+  status: Optional[str] = None,
+  country: Optional[str] = None,
+  size: int = AUTOCOMPLETE_SIZE
+) -> List[Dict[str, Any]]:
+  """Customers whose names, email or phone contain text, newest first."""
+  customers = Customer.objects.filter(
+    Q(email__icontains=text) |
+    Q(first_name__icontains=text) |
+    Q(last_name__icontains=text) |
+    Q(phone__icontains=text)
+  )
+  if status:
+    customers = customers.filter(status=status)
+  if country:
+    customers = customers.filter(country=country.upper())
+  rows = customers.order_by('-created_at', '-id').values(*CustomerIndex.AUTOCOMPLETE_SOURCE)[:size]
+  # Ids as strings, like the documents
+  return [{**row, 'id': str(row['id'])} for row in rows]
+
+def autocomplete_customers(
+  text: str,
+  status: Optional[str] = None,
+  country: Optional[str] = None,
+  size: int = AUTOCOMPLETE_SIZE
+) -> List[Dict[str, Any]]:
+  """Customers whose names, email or phone start with the words of text, best first."""
+  try:
+    response = es_client.search_sync(
+      index=CustomerIndex.get_index_name(),
+      query=CustomerIndex.autocomplete_query(text, status=status, country=country),
+      size=size,
+      source=CustomerIndex.AUTOCOMPLETE_SOURCE,
+      track_total_hits=False
+    )
+  except ESError as e:
+    logger.warning(f"Customer autocomplete falling back to the database: {str(e)}")
+    return search_database(text, status=status, country=country, size=size)
+  return [hit['_source'] for hit in response['hits']['hits']]
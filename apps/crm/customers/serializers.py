@@ -0,0 +1,32 @@
+from rest_framework import serializers
+from django.contrib.auth import get_user_model
+from core.elasticsearch.constants import AUTOCOMPLETE_SIZE, AUTOCOMPLETE_MAX_SIZE
+
+Customer = get_user_model()
+
+class CustomerSerializer(serializers.ModelSerializer):
+  class Meta:
+    model = Customer
+    fields = [
+      'id', 'email', 'first_name', 'last_name', 'phone', 'country',
+      'status', 'is_active', 'created_at', 'updated_at'
+    ]
+    read_only_fields = ['id', 'created_at', 'updated_at']
+
+class CustomerUpdateSerializer(serializers.ModelSerializer):
+  class Meta:
+    model = Customer
+    fields = ['first_name', 'last_name', 'phone', 'country', 'status']
+
+class AutocompleteSerializer(serializers.Serializer):
+  q = serializers.CharField(min_length=2, max_length=100, trim_whitespace=True)
+  status = serializers.ChoiceField(
+    choices=Customer._meta.get_field('status').choices,
+    required=False
+  )
+  country = serializers.CharField(min_length=2, max_length=2, required=False)
+  size = serializers.IntegerField(
+    min_value=1,
+    max_value=AUTOCOMPLETE_MAX_SIZE,
+    default=AUTOCOMPLETE_SIZE
+  )
@@ -0,0 +1,7 @@
+from rest_framework.routers import SimpleRouter
+from .views import CustomerViewSet
+
+router = SimpleRouter()
+router.register('', CustomerViewSet, basename='customer')
+
+urlpatterns = router.urls
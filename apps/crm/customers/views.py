@@ -2,10 +2,11 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
-from .serializers import CustomerSerializer, CustomerUpdateSerializer
+from apps.crm.core.pagination import KeysetPagination
+from apps.crm.core.permissions import IsStaffUser
+from .serializers import CustomerSerializer, CustomerUpdateSerializer, AutocompleteSerializer
 from .filters import CustomerFilter
-from shared.services.elasticsearch import es_client
-from models.customers.elasticsearch import CustomerIndex
+from .search import autocomplete_customers
 
 Customer = get_user_model()
 
@@ -13,9 +14,11 @@ class CustomerViewSet(viewsets.ModelViewSet):
   queryset = Customer.objects.all()
   serializer_class = CustomerSerializer
   filterset_class = CustomerFilter
+  permission_classes = [IsStaffUser]
+  pagination_class = KeysetPagination
   
   def get_serializer_class(self):
-    if self.action == 'update':
+    if self.action in ('update', 'partial_update'):
       return CustomerUpdateSerializer
     return CustomerSerializer
   
@@ -23,13 +26,21 @@ class CustomerViewSet(viewsets.ModelViewSet):
   def block(self, request, pk=None):
     customer = self.get_object()
     customer.status = 'blocked'
+    # Reindexed by the post_save signal
     customer.save()
     
-    # Update Elasticsearch
-    es_client.update(
-      index=CustomerIndex.get_index_name(),
-      id=str(customer.id),
-      doc={'status': 'blocked'}
+    return Response({'status': 'blocked'})
+
+  @action(detail=False, methods=['get'])
+  def autocomplete(self, request):
+    params = AutocompleteSerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    query = params.validated_data
+
+    results = autocomplete_customers(
+      query['q'],
+      status=query.get('status'),
+      country=query.get('country'),
+      size=query['size']
     )
-    
-    return Response({'status': 'blocked'})
\ No newline at end of file
+    return Response({'results': results})
@@ -0,0 +1,10 @@
+"""
+Benchmarks of the hot paths, run against in-process stand-ins.
+
+  python -m benchmarks                      # everything
+  python -m benchmarks redis es.search      # by name or prefix
+  python -m benchmarks --baseline benchmarks/results/<earlier run>.json
+
+Each run writes a JSON report to benchmarks/results/ (or --output); with a
+baseline the run fails when a median latency grew beyond --tolerance.
+"""
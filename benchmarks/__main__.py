@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+
+from .harness import DEFAULT_ITERATIONS, DEFAULT_WARMUP, DEFAULT_TOLERANCE
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+def parse_args(argv=None) -> argparse.Namespace:
+  parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmark the hot paths.')
+  parser.add_argument('names', nargs='*', help='Benchmarks to run, by name or prefix such as "redis"')
+  parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help='Measured steps per benchmark')
+  parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help='Unmeasured steps run first')
+  parser.add_argument('--output', help='Report path, defaults to a new file in benchmarks/results/')
+  parser.add_argument('--baseline', help='Earlier report to compare with')
+  parser.add_argument(
+    '--tolerance',
+    type=float,
+    default=DEFAULT_TOLERANCE,
+    help='Median latency growth over the baseline that fails the run, e.g. 0.2 for 20%%'
+  )
+  parser.add_argument('--list', action='store_true', help='List the benchmarks and exit')
+  return parser.parse_args(argv)
+
+def selected(name: str, patterns) -> bool:
+  return not patterns or any(name == pattern or name.startswith(f"{pattern}.") for pattern in patterns)
+
+def main(argv=None) -> int:
+  args = parse_args(argv)
+
+  # Before Django: the stand-ins replace MT5Manager and decide the service ports
+  from .stubs import mt5
+  from . import services
+  mt5.install()
+  services.start()
+  os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+  import django
+  django.setup()
+  # Measure the code paths, not console output of their info logs
+  logging.getLogger('app').setLevel(logging.WARNING)
+  logging.getLogger('elasticsearch').setLevel(logging.WARNING)
+  # Every rejected request of cp.unauthenticated would be logged
+  logging.getLogger('django.request').setLevel(logging.ERROR)
+
+  from .harness import BENCHMARKS, run, build_report, save_report, load_report, compare, format_table
+  from . import bench_redis, bench_elasticsearch, bench_cp, bench_indices, bench_mt5  # noqa: F401
+
+  benchmarks = [bench for name, bench in BENCHMARKS.items() if selected(name, args.names)]
+  if args.list:
+    for bench in benchmarks:
+      print(f"{bench.name:<28} {bench.description}")
+    services.stop()
+    return 0
+  if not benchmarks:
+    print(f"No benchmark matches {' '.join(args.names)}", file=sys.stderr)
+    services.stop()
+    return 2
+
+  loop = asyncio.new_event_loop()
+  asyncio.set_event_loop(loop)
+  results, failed = {}, []
+  try:
+    for bench in benchmarks:
+      print(f"Running {bench.name}...", file=sys.stderr, flush=True)
+      try:
+        results[bench.name] = run(bench, loop, args.iterations, args.warmup)
+      except Exception as e:
+        failed.append(bench.name)
+        print(f"  {bench.name} failed: {e!r}", file=sys.stderr)
+  finally:
+    loop.close()
+    services.stop()
+
+  report = build_report(results, args.iterations, args.warmup)
+  report['failed'] = failed
+  output = args.output or os.path.join(
+    RESULTS_DIR,
+    f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.json"
+  )
+  save_report(report, output)
+
+  baseline = load_report(args.baseline) if args.baseline else None
+  print(format_table(report, baseline))
+  print(f"\nReport written to {output}")
+
+  status = 1 if failed else 0
+  if baseline is not None:
+    regressions = compare(report, baseline, args.tolerance)
+    if regressions:
+      print(f"\nSlower than the baseline by more than {args.tolerance:.0%}:")
+      for regression in regressions:
+        print(f"  {regression}")
+      status = 1
+  return status
+
+if __name__ == '__main__':
+  sys.exit(main())
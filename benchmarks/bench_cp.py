@@ -0,0 +1,73 @@
+"""Requests through the CP middleware stack, as configured in MIDDLEWARE."""
+import math
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import AsyncClient
+
+from apps.cp.authentication.tokens import token_service
+from core.redis.ratelimit import GCRA_SCRIPT
+from . import services
+from .harness import benchmark
+
+PROFILE_URL = '/api/v1/cp/profile'
+
+def emulate_gcra(server, keys, args):
+  """GCRA_SCRIPT for the fake Redis server."""
+  limit, period, cost = int(args[0]), float(args[1]), int(args[2])
+  interval = period / limit
+  now = time.time()
+  stored = server.cmd_get(keys[0])
+  tat = max(float(stored), now) if stored else now
+  new_tat = tat + interval * cost
+  allow_at = new_tat - period
+  if allow_at > now:
+    return [0, 0, str(allow_at - now), str(tat - now)]
+  server.cmd_set(keys[0], str(new_tat).encode(), b'PX', str(math.ceil((new_tat - now) * 1000)).encode())
+  return [1, math.floor((period - (new_tat - now)) / interval), '0', str(new_tat - now)]
+
+_customer = None
+
+def get_customer():
+  """Migrate the benchmark database once and create the customer requests are made as."""
+  global _customer
+  if _customer is None:
+    call_command('migrate', verbosity=0)
+    _customer = get_user_model().objects.create_user(
+      email='bench@example.com',
+      password='benchmark',
+      first_name='Bench',
+      last_name='User'
+    )
+  return _customer
+
+async def get_headers(authenticated: bool) -> dict:
+  services.redis_server.register_script(GCRA_SCRIPT, emulate_gcra)
+  customer = await sync_to_async(get_customer)()
+  if not authenticated:
+    return {}
+  return {'Authorization': f"Bearer {token_service.issue(customer)['access']}"}
+
+def check(response, status: int) -> None:
+  if response.status_code != status:
+    raise RuntimeError(f"Expected {status}, got {response.status_code}: {response.content[:200]!r}")
+
+@benchmark('cp.profile')
+async def cp_profile(timer):
+  """Authenticated GET of the profile, rate limited per user"""
+  client = AsyncClient()
+  headers = await get_headers(authenticated=True)
+  check(await client.get(PROFILE_URL, headers=headers), 200)
+  for _ in timer:
+    await client.get(PROFILE_URL, headers=headers)
+
+@benchmark('cp.unauthenticated')
+async def cp_unauthenticated(timer):
+  """GET of the profile without a token, rejected after the middleware"""
+  client = AsyncClient()
+  await get_headers(authenticated=False)
+  check(await client.get(PROFILE_URL), 401)
+  for _ in timer:
+    await client.get(PROFILE_URL)
@@ -0,0 +1,76 @@
+"""ESClient against the local HTTP Elasticsearch stub."""
+import uuid
+from datetime import datetime, timezone
+
+from django.conf import settings
+from elasticsearch import AsyncElasticsearch
+
+from core.elasticsearch import ESClient
+from core.elasticsearch.constants import REFRESH_FALSE
+from core.elasticsearch.indices import CustomerIndex
+from .harness import benchmark
+
+BATCH = 100
+
+def make_document(n: int) -> dict:
+  now = datetime.now(timezone.utc).isoformat()
+  return {
+    'id': str(uuid.UUID(int=n)),
+    'email': f'user{n}@example.com',
+    'first_name': 'Bench',
+    'last_name': f'User {n}',
+    'phone': f'+357{n:08d}',
+    'country': 'CY',
+    'status': 'active',
+    'kyc_status': None,
+    'agent_id': None,
+    'profile': {'date_of_birth': None, 'nationality': None, 'address': None},
+    'created_at': now,
+    'updated_at': now
+  }
+
+def make_client() -> ESClient:
+  # Skips connect(): the stub has no index or alias APIs to set up against
+  client = ESClient()
+  client.connection = AsyncElasticsearch(
+    hosts=[f"http://{settings.ELASTICSEARCH_HOST}:{settings.ELASTICSEARCH_PORT}"],
+    max_retries=0
+  )
+  client._initialized = True
+  return client
+
+@benchmark('es.add_document')
+async def es_add_document(timer):
+  """Index one customer document"""
+  client = make_client()
+  index = CustomerIndex.get_index_name()
+  document = make_document(1)
+  try:
+    for _ in timer:
+      await client.add_document(index, document['id'], document, refresh=REFRESH_FALSE)
+  finally:
+    await client.close()
+
+@benchmark('es.bulk_update', batch=BATCH)
+async def es_bulk_update(timer):
+  """Bulk upsert of 100 customer documents"""
+  client = make_client()
+  index = CustomerIndex.get_index_name()
+  documents = [make_document(n) for n in range(BATCH)]
+  try:
+    for _ in timer:
+      await client.bulk_update(index, documents, refresh=REFRESH_FALSE)
+  finally:
+    await client.close()
+
+@benchmark('es.search')
+async def es_search(timer):
+  """Search returning 20 customers, bypassing the search cache"""
+  client = make_client()
+  index = CustomerIndex.get_index_name()
+  query = {'multi_match': {'query': 'bench', 'fields': ['first_name', 'last_name', 'email']}}
+  try:
+    for _ in timer:
+      await client.search(index, query, size=20, cache=False)
+  finally:
+    await client.close()
@@ -0,0 +1,26 @@
+"""Building Elasticsearch documents from models."""
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from core.elasticsearch.indices import CustomerIndex
+from .harness import benchmark
+
+@benchmark('indices.customer_document')
+def customer_document(timer):
+  """CustomerIndex.get_document of a loaded customer"""
+  now = timezone.now()
+  customer = get_user_model()(
+    id=uuid.uuid4(),
+    email='bench@example.com',
+    first_name='Bench',
+    last_name='User',
+    phone='+35700000000',
+    country='CY',
+    status='active',
+    created_at=now,
+    updated_at=now
+  )
+  for _ in timer:
+    CustomerIndex.get_document(customer)
@@ -0,0 +1,37 @@
+"""MT5 sinks as called on the pump thread, with the MT5Manager stand-in."""
+from core.mt5.accounts import AccountStore
+from core.mt5.deals import DealBuffer
+from core.mt5.dispatcher import EventDispatcher
+from core.mt5.sinks import MT5DealSink, MT5UserSink
+from .harness import benchmark
+from .stubs.mt5 import MTDeal, MTUser
+
+def handle(event) -> None:
+  pass
+
+@benchmark('mt5.deal_sink')
+def mt5_deal_sink(timer):
+  """OnDealAdd into the deal buffer and the dispatcher"""
+  dispatcher = EventDispatcher()
+  sink = MT5DealSink(dispatcher, DealBuffer())
+  sink.add_callback('deal_add', handle)
+  deals = [MTDeal(ticket) for ticket in range(timer.warmup + timer.iterations)]
+  try:
+    for _, deal in zip(timer, deals):
+      sink.OnDealAdd(deal)
+  finally:
+    dispatcher.stop()
+
+@benchmark('mt5.user_sink')
+def mt5_user_sink(timer):
+  """OnUserUpdate into the account store and the dispatcher"""
+  dispatcher = EventDispatcher()
+  sink = MT5UserSink(dispatcher, AccountStore(server_id=1))
+  sink.add_callback('user_update', handle)
+  # Updates of existing accounts, the common case once the store is loaded
+  users = [MTUser(1000 + n % 500) for n in range(timer.warmup + timer.iterations)]
+  try:
+    for _, user in zip(timer, users):
+      sink.OnUserUpdate(user)
+  finally:
+    dispatcher.stop()
@@ -0,0 +1,75 @@
+"""RedisClient against the fake Redis server."""
+from core.redis import RedisClient
+from .harness import benchmark
+
+BATCH = 100
+
+VALUE = {
+  'id': '00000000-0000-0000-0000-000000000001',
+  'email': 'user1@example.com',
+  'status': 'active',
+  'balance': '1000.00',
+  'groups': ['demo\\standard', 'real\\pro']
+}
+
+async def make_client() -> RedisClient:
+  client = RedisClient(near_cache=False)
+  await client.ensure_connection()
+  return client
+
+@benchmark('redis.get')
+async def redis_get(timer):
+  """GET of one small value"""
+  client = await make_client()
+  try:
+    await client.set('bench:get', VALUE)
+    for _ in timer:
+      await client.get('bench:get')
+  finally:
+    await client.close()
+
+@benchmark('redis.set')
+async def redis_set(timer):
+  """SET of one small value with an expiry"""
+  client = await make_client()
+  try:
+    for _ in timer:
+      await client.set('bench:set', VALUE)
+  finally:
+    await client.close()
+
+@benchmark('redis.get_many', batch=BATCH)
+async def redis_get_many(timer):
+  """Pipelined GET of 100 keys"""
+  client = await make_client()
+  keys = [f'bench:many:{n}' for n in range(BATCH)]
+  try:
+    await client.set_many(dict.fromkeys(keys, VALUE))
+    for _ in timer:
+      await client.get_many(keys)
+  finally:
+    await client.close()
+
+@benchmark('redis.set_many', batch=BATCH)
+async def redis_set_many(timer):
+  """Pipelined SET of 100 keys"""
+  client = await make_client()
+  mapping = {f'bench:many:{n}': VALUE for n in range(BATCH)}
+  try:
+    for _ in timer:
+      await client.set_many(mapping)
+  finally:
+    await client.close()
+
+@benchmark('redis.delete_pattern', batch=10)
+async def redis_delete_pattern(timer):
+  """SCAN and DEL of the 10 keys matching a pattern"""
+  client = await make_client()
+  mapping = {f'bench:pattern:{n}': VALUE for n in range(10)}
+  try:
+    for _ in timer:
+      with timer.paused():
+        await client.set_many(mapping)
+      await client.delete_pattern('bench:pattern:*')
+  finally:
+    await client.close()
@@ -0,0 +1,183 @@
+"""
+Timing loop, registry and result files of the benchmark suite.
+
+A benchmark is a function, sync or async, that sets up what it needs and
+then runs the measured operation once per step of the timer it is given:
+
+  @benchmark('redis.get')
+  async def redis_get(timer):
+    client = ...
+    for _ in timer:
+      await client.get('key')
+
+The timer runs warmup steps first and only records the ones after them.
+Work inside a step that shouldn't count, like preparing keys for the next
+delete, goes in a `with timer.paused():` block.
+"""
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction
+
+DEFAULT_ITERATIONS = 2000
+DEFAULT_WARMUP = 200
+# Relative growth of the median latency reported as a regression
+DEFAULT_TOLERANCE = 0.2
+
+class Benchmark(NamedTuple):
+  name: str
+  func: Callable
+  # Items handled per step, e.g. keys per get_many call
+  batch: int
+  description: str
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+def benchmark(name: str, batch: int = 1) -> Callable:
+  def decorator(func: Callable) -> Callable:
+    if name in BENCHMARKS:
+      raise ValueError(f"Benchmark {name} is already registered")
+    description = (func.__doc__ or '').strip().split('\n')[0]
+    BENCHMARKS[name] = Benchmark(name, func, batch, description)
+    return func
+  return decorator
+
+class Timer:
+  def __init__(self, iterations: int = DEFAULT_ITERATIONS, warmup: int = DEFAULT_WARMUP):
+    self.iterations = iterations
+    self.warmup = warmup
+    self.samples: List[float] = []
+    self._paused = 0.0
+
+  def __iter__(self) -> Iterator[None]:
+    for _ in range(self.warmup):
+      yield
+    samples = self.samples
+    clock = time.perf_counter
+    for _ in range(self.iterations):
+      self._paused = 0.0
+      started = clock()
+      yield
+      samples.append(clock() - started - self._paused)
+
+  @contextmanager
+  def paused(self) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+      yield
+    finally:
+      self._paused += time.perf_counter() - started
+
+def percentile(ordered: List[float], fraction: float) -> float:
+  """Nearest-rank percentile of sorted samples."""
+  if not ordered:
+    return 0.0
+  index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+  return ordered[index]
+
+def summarize(bench: Benchmark, samples: List[float]) -> Dict[str, Any]:
+  ordered = sorted(samples)
+  total = sum(ordered)
+  ops = len(ordered) / total if total else 0.0
+  return {
+    'iterations': len(ordered),
+    'batch': bench.batch,
+    'total_seconds': total,
+    'ops_per_second': ops,
+    'items_per_second': ops * bench.batch,
+    'mean_ms': total / len(ordered) * 1000 if ordered else 0.0,
+    'p50_ms': percentile(ordered, 0.50) * 1000,
+    'p90_ms': percentile(ordered, 0.90) * 1000,
+    'p99_ms': percentile(ordered, 0.99) * 1000,
+    'max_ms': ordered[-1] * 1000 if ordered else 0.0
+  }
+
+def run(bench: Benchmark, loop, iterations: int, warmup: int) -> Dict[str, Any]:
+  """Run one benchmark; async ones run on the suite's event loop."""
+  timer = Timer(iterations, warmup)
+  if iscoroutinefunction(bench.func):
+    loop.run_until_complete(bench.func(timer))
+  else:
+    bench.func(timer)
+  if len(timer.samples) != iterations:
+    raise RuntimeError(f"{bench.name} stopped after {len(timer.samples)} of {iterations} steps")
+  return summarize(bench, timer.samples)
+
+def git_commit() -> Optional[str]:
+  try:
+    return subprocess.run(
+      ['git', 'rev-parse', 'HEAD'],
+      capture_output=True,
+      text=True,
+      check=True,
+      cwd=os.path.dirname(os.path.abspath(__file__))
+    ).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+def build_report(results: Dict[str, Dict[str, Any]], iterations: int, warmup: int) -> Dict[str, Any]:
+  return {
+    'created_at': datetime.now(timezone.utc).isoformat(),
+    'commit': git_commit(),
+    'python': sys.version.split()[0],
+    'platform': platform.platform(),
+    'iterations': iterations,
+    'warmup': warmup,
+    'results': results
+  }
+
+def save_report(report: Dict[str, Any], path: str) -> None:
+  os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+  with open(path, 'w', encoding='utf-8') as f:
+    json.dump(report, f, indent=2, sort_keys=True)
+    f.write('\n')
+
+def load_report(path: str) -> Dict[str, Any]:
+  with open(path, encoding='utf-8') as f:
+    return json.load(f)
+
+def compare(
+  report: Dict[str, Any],
+  baseline: Dict[str, Any],
+  tolerance: float = DEFAULT_TOLERANCE
+) -> List[str]:
+  """Benchmarks whose median latency grew by more than tolerance over the baseline."""
+  regressions = []
+  for name, result in report['results'].items():
+    previous = baseline.get('results', {}).get(name)
+    if not previous or not previous['p50_ms']:
+      continue
+    change = result['p50_ms'] / previous['p50_ms'] - 1
+    if change > tolerance:
+      regressions.append(
+        f"{name}: p50 {previous['p50_ms']:.3f}ms -> {result['p50_ms']:.3f}ms (+{change:.0%})"
+      )
+  return regressions
+
+def format_table(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+  header = f"{'benchmark':<28} {'ops/s':>12} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+  if baseline is not None:
+    header += f" {'p50 vs base':>12}"
+  lines = [header, '-' * len(header)]
+  for name, result in report['results'].items():
+    line = (
+      f"{name:<28} {result['ops_per_second']:>12,.0f} {result['p50_ms']:>9.3f} "
+      f"{result['p90_ms']:>9.3f} {result['p99_ms']:>9.3f} {result['max_ms']:>9.3f}"
+    )
+    if baseline is not None:
+      previous = baseline.get('results', {}).get(name)
+      if previous and previous['p50_ms']:
+        line += f" {result['p50_ms'] / previous['p50_ms'] - 1:>+12.1%}"
+      else:
+        line += f" {'new':>12}"
+    lines.append(line)
+  return '\n'.join(lines)
@@ -0,0 +1,44 @@
+"""Stand-ins shared by every benchmark of a run."""
+import os
+from typing import Optional
+
+from .stubs import FakeRedisServer, ESStubServer
+
+redis_server: Optional[FakeRedisServer] = None
+es_server: Optional[ESStubServer] = None
+
+# Returned by every search against the stub
+SEARCH_HITS = [
+  {
+    'id': f'00000000-0000-0000-0000-{n:012d}',
+    'email': f'user{n}@example.com',
+    'first_name': 'Bench',
+    'last_name': f'User {n}',
+    'country': 'CY',
+    'status': 'active'
+  }
+  for n in range(20)
+]
+
+def start() -> None:
+  """Start the stand-ins and point the settings, read later, at them."""
+  global redis_server, es_server
+  redis_server = FakeRedisServer()
+  host, port = redis_server.start()
+  os.environ['REDIS_HOST'] = host
+  os.environ['REDIS_PORT'] = str(port)
+  os.environ.pop('REDIS_PASSWORD', None)
+
+  es_server = ESStubServer(hits=SEARCH_HITS)
+  host, port = es_server.start()
+  os.environ['ELASTICSEARCH_HOST'] = host
+  os.environ['ELASTICSEARCH_PORT'] = str(port)
+
+def stop() -> None:
+  global redis_server, es_server
+  if redis_server is not None:
+    redis_server.stop()
+    redis_server = None
+  if es_server is not None:
+    es_server.stop()
+    es_server = None
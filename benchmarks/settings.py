@@ -0,0 +1,45 @@
+"""
+Settings for the benchmark suite: the CP settings with every external
+service replaced. Hosts and ports of the stand-ins are filled in by the
+runner through the environment before Django is set up.
+"""
+import os
+import tempfile
+
+# Read by the settings package on import, whatever module is used
+for name in ('SECRET_KEY', 'DB_NAME', 'DB_USER', 'DB_PASSWORD', 'DB_HOST'):
+  os.environ.setdefault(name, 'benchmark')
+os.environ.setdefault('REDIS_HOST', '127.0.0.1')
+os.environ.setdefault('ELASTICSEARCH_HOST', '127.0.0.1')
+
+from core.settings.cp import *
+
+DEBUG = False
+SECRET_KEY = 'benchmark-secret-key-not-for-production'
+ALLOWED_HOSTS = ['*']
+ELASTICSEARCH_INDEX_PREFIX = 'benchmark'
+
+# A file, not :memory:, so sync views on executor threads see the same data
+DATABASES = {
+  'default': {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': os.path.join(tempfile.mkdtemp(prefix='benchmarks-'), 'db.sqlite3'),
+  }
+}
+
+# django_redis would need a larger subset of Redis than the stand-in has
+CACHES = {
+  'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+  }
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Same policies, with limits no run reaches, so every request gets to the view
+CP_RATE_LIMITS = [
+  {**policy, 'LIMIT': 10 ** 9} for policy in CP_RATE_LIMITS
+]
+
+MT5_ENABLED = False
+LOG_SHIPPING_ENABLED = False
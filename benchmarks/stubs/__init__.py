@@ -0,0 +1,6 @@
+"""In-process stand-ins for the services the benchmarks talk to."""
+from .redis import FakeRedisServer
+from .elasticsearch import ESStubServer
+from . import mt5
+
+__all__ = ["FakeRedisServer", "ESStubServer", "mt5"]
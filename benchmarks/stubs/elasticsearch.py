@@ -0,0 +1,137 @@
+"""
+Local HTTP stand-in for Elasticsearch.
+
+Answers the few endpoints the benchmarks call with canned, well-formed
+responses, so ESClient is measured through elasticsearch-py, its HTTP
+transport and a real socket without a cluster. Documents are not stored.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+INFO = {
+  'name': 'benchmark-stub',
+  'cluster_name': 'benchmark',
+  'version': {'number': '8.11.0', 'build_flavor': 'default'},
+  'tagline': 'You Know, for Search'
+}
+
+class ESStubHandler(BaseHTTPRequestHandler):
+  protocol_version = 'HTTP/1.1'
+  server: 'ESStubServer'
+
+  def log_message(self, format, *args):
+    pass
+
+  def _read_body(self) -> bytes:
+    length = int(self.headers.get('Content-Length') or 0)
+    return self.rfile.read(length) if length else b''
+
+  def _reply(self, status: int, body: Optional[Dict[str, Any]] = None) -> None:
+    data = json.dumps(body).encode() if body is not None else b''
+    self.send_response(status)
+    # elasticsearch-py refuses servers that don't identify as Elasticsearch
+    self.send_header('X-Elastic-Product', 'Elasticsearch')
+    self.send_header('Content-Type', 'application/json')
+    self.send_header('Content-Length', str(len(data)))
+    self.end_headers()
+    if self.command != 'HEAD':
+      self.wfile.write(data)
+
+  def _route(self) -> Tuple[int, Optional[Dict[str, Any]]]:
+    body = self._read_body()
+    self.server.requests += 1
+    parts = [part for part in urlsplit(self.path).path.split('/') if part]
+
+    if not parts:
+      return 200, INFO
+    if parts[-1] == '_bulk':
+      return 200, self.server.bulk(body)
+    if parts[-1] == '_search':
+      return 200, self.server.search(parts[0])
+    if len(parts) == 3 and parts[1] == '_doc':
+      index, _, id = parts
+      if self.command == 'DELETE':
+        return 200, self.server.result(index, id, 'deleted')
+      if self.command == 'GET':
+        return 200, {'_index': index, '_id': id, '_version': 1, 'found': True, '_source': {'id': id}}
+      return 201, self.server.result(index, id, 'created')
+    return 404, {'error': {'type': 'stub_unsupported', 'reason': f"{self.command} {self.path}"}, 'status': 404}
+
+  def _handle(self) -> None:
+    status, body = self._route()
+    self._reply(status, body)
+
+  do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _handle
+
+class ESStubServer(ThreadingHTTPServer):
+  daemon_threads = True
+
+  def __init__(self, host: str = '127.0.0.1', port: int = 0, hits: Optional[List[Dict[str, Any]]] = None):
+    """
+    Initialize Elasticsearch stub
+
+    Args:
+      host: Interface to listen on
+      port: Port to listen on, 0 picks a free one
+      hits: Documents every search returns
+    """
+    super().__init__((host, port), ESStubHandler)
+    self.hits = hits or []
+    self.requests = 0
+    self._thread: Optional[threading.Thread] = None
+
+  @property
+  def address(self) -> Tuple[str, int]:
+    return self.server_address[0], self.server_address[1]
+
+  def start(self) -> Tuple[str, int]:
+    self._thread = threading.Thread(target=self.serve_forever, name='es-stub', daemon=True)
+    self._thread.start()
+    return self.address
+
+  def stop(self) -> None:
+    self.shutdown()
+    self.server_close()
+
+  @staticmethod
+  def result(index: str, id: str, result: str) -> Dict[str, Any]:
+    return {
+      '_index': index,
+      '_id': id,
+      '_version': 1,
+      'result': result,
+      '_shards': {'total': 1, 'successful': 1, 'failed': 0},
+      '_seq_no': 0,
+      '_primary_term': 1
+    }
+
+  def bulk(self, body: bytes) -> Dict[str, Any]:
+    items = []
+    lines = iter(line for line in body.split(b'\n') if line)
+    for line in lines:
+      action, meta = next(iter(json.loads(line).items()))
+      if action != 'delete':
+        # Skip the document or partial update that follows the action
+        next(lines, None)
+      result = self.result(meta.get('_index'), meta.get('_id'), 'deleted' if action == 'delete' else 'updated')
+      result['status'] = 200
+      items.append({action: result})
+    return {'took': 1, 'errors': False, 'items': items}
+
+  def search(self, index: str) -> Dict[str, Any]:
+    return {
+      'took': 1,
+      'timed_out': False,
+      '_shards': {'total': 1, 'successful': 1, 'skipped': 0, 'failed': 0},
+      'hits': {
+        'total': {'value': len(self.hits), 'relation': 'eq'},
+        'max_score': 1.0,
+        'hits': [
+          {'_index': index, '_id': str(hit.get('id')), '_score': 1.0, '_source': hit}
+          for hit in self.hits
+        ]
+      }
+    }
@@ -0,0 +1,96 @@
+"""
+Stand-in for the MT5Manager extension module.
+
+The real module only exists on Windows with the MetaTrader 5 manager API
+installed. install() puts this one in sys.modules so core.mt5 can be imported
+anywhere; MTUser and MTDeal carry the attributes the sinks read.
+"""
+import sys
+import time
+import types
+from typing import List
+
+class MTUser:
+  def __init__(self, login: int, group: str = 'demo\\standard', email: str = ''):
+    self.Login = login
+    self.Group = group
+    self.FirstName = 'Bench'
+    self.LastName = f'User {login}'
+    self.EMail = email or f'user{login}@example.com'
+    self.Country = 'CY'
+    self.Leverage = 100
+    self.Balance = 1000.0
+    self.Credit = 0.0
+    self.Agent = 0
+    self.Rights = 0
+    self.Registration = int(time.time())
+    self.LastAccess = int(time.time())
+    self.Comment = ''
+
+class MTDeal:
+  def __init__(self, ticket: int, login: int = 1000):
+    self.Deal = ticket
+    self.Order = ticket
+    self.Time = int(time.time())
+    self.Login = login
+    self.Symbol = 'EURUSD'
+    self.Action = 0
+    self.Entry = 0
+    self.Volume = 10000
+    self.Price = 1.0842
+    self.Commission = -0.5
+    self.Profit = 12.3
+    self.Comment = ''
+    self.Dealer = 0
+
+class ManagerAPI:
+  class EnPumpModes:
+    PUMP_MODE_FULL = 0xFFFFFFFF
+
+  def __init__(self, data_folder: str = ''):
+    self.data_folder = data_folder
+    self.users: List[MTUser] = []
+    self.deals: List[MTDeal] = []
+
+  def Connect(self, ip, login, password, pump_mode, timeout) -> bool:
+    return True
+
+  def Disconnect(self) -> None:
+    pass
+
+  def UserSubscribe(self, sink) -> bool:
+    return True
+
+  def UserUnsubscribe(self, sink) -> bool:
+    return True
+
+  def DealSubscribe(self, sink) -> bool:
+    return True
+
+  def DealUnsubscribe(self, sink) -> bool:
+    return True
+
+  def TimeServer(self) -> int:
+    return int(time.time())
+
+  def UserGetByGroup(self, group: str) -> List[MTUser]:
+    return list(self.users)
+
+  def UserRequest(self, login: int):
+    return next((user for user in self.users if user.Login == login), None)
+
+  def DealRequestByGroup(self, group: str, start: int, end: int) -> List[MTDeal]:
+    return [deal for deal in self.deals if start <= deal.Time <= end]
+
+def LastError():
+  return (0, 'MT_RET_OK')
+
+def install() -> types.ModuleType:
+  """Register the stand-in as MT5Manager, replacing the real module if any."""
+  module = types.ModuleType('MT5Manager')
+  module.ManagerAPI = ManagerAPI
+  module.MTUser = MTUser
+  module.MTDeal = MTDeal
+  module.LastError = LastError
+  sys.modules['MT5Manager'] = module
+  return module
@@ -0,0 +1,328 @@
+"""
+In-process Redis stand-in speaking RESP2, or RESP3 after HELLO 3, over TCP.
+
+It runs on its own thread and event loop, so RedisClient goes through
+redis-py, its connection pool and the socket exactly as in production; only
+the server side is replaced. It implements the commands the project uses.
+Lua scripts can't run here: register_script maps a script's source to a
+Python function that does the same thing.
+"""
+import asyncio
+import fnmatch
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+class Status(str):
+  pass
+
+class Error(str):
+  pass
+
+class WrongType(Exception):
+  pass
+
+OK = Status('OK')
+QUEUED = Status('QUEUED')
+
+def encode(value: Any, resp3: bool = False) -> bytes:
+  if value is None:
+    return b'_\r\n' if resp3 else b'$-1\r\n'
+  if isinstance(value, Status):
+    return f'+{value}\r\n'.encode()
+  if isinstance(value, Error):
+    return f'-{value}\r\n'.encode()
+  if isinstance(value, bool):
+    return b':1\r\n' if value else b':0\r\n'
+  if isinstance(value, int):
+    return b':%d\r\n' % value
+  if isinstance(value, str):
+    value = value.encode()
+  if isinstance(value, bytes):
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+  if isinstance(value, float):
+    return encode(repr(value), resp3)
+  if isinstance(value, dict):
+    if resp3:
+      return b'%%%d\r\n' % len(value) + b''.join(
+        encode(key, resp3) + encode(item, resp3) for key, item in value.items()
+      )
+    value = [item for pair in value.items() for item in pair]
+  return b'*%d\r\n' % len(value) + b''.join(encode(item, resp3) for item in value)
+
+class FakeRedisServer:
+  def __init__(self, host: str = '127.0.0.1', port: int = 0):
+    self.host = host
+    self.port = port
+    self.data: Dict[bytes, Any] = {}
+    # key -> time.monotonic() deadline
+    self.expires: Dict[bytes, float] = {}
+    self.scripts: Dict[str, Callable] = {}
+    self._sources: Dict[str, Callable] = {}
+    self.commands = 0
+    self._loop: Optional[asyncio.AbstractEventLoop] = None
+    self._server = None
+    self._thread: Optional[threading.Thread] = None
+
+  def start(self) -> Tuple[str, int]:
+    ready = threading.Event()
+
+    def serve():
+      self._loop = asyncio.new_event_loop()
+      asyncio.set_event_loop(self._loop)
+      self._server = self._loop.run_until_complete(
+        asyncio.start_server(self._handle, self.host, self.port)
+      )
+      self.port = self._server.sockets[0].getsockname()[1]
+      ready.set()
+      self._loop.run_forever()
+      self._server.close()
+      # Connections the clients left open
+      tasks = asyncio.all_tasks(self._loop)
+      for task in tasks:
+        task.cancel()
+      self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+      self._loop.close()
+
+    self._thread = threading.Thread(target=serve, name='fake-redis', daemon=True)
+    self._thread.start()
+    ready.wait()
+    return self.host, self.port
+
+  def stop(self) -> None:
+    if self._loop is not None:
+      self._loop.call_soon_threadsafe(self._loop.stop)
+      self._thread.join()
+      self._loop = None
+
+  def register_script(self, source: str, func: Callable) -> None:
+    """Emulate a Lua script with func(server, keys, args)."""
+    self._sources[source] = func
+    self.scripts[hashlib.sha1(source.encode()).hexdigest()] = func
+
+  async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    queued: Optional[List[List[bytes]]] = None
+    resp3 = False
+    try:
+      while True:
+        command = await self._read_command(reader)
+        if command is None:
+          break
+        name = command[0].upper()
+        if name == b'HELLO':
+          resp3 = len(command) > 1 and command[1] == b'3'
+          reply = {'server': 'redis', 'version': '7.2.0', 'proto': 3 if resp3 else 2, 'mode': 'standalone'}
+        elif name == b'MULTI':
+          queued = []
+          reply = OK
+        elif name == b'EXEC':
+          reply = [self.execute(queued_command) for queued_command in queued or ()]
+          queued = None
+        elif queued is not None:
+          queued.append(command)
+          reply = QUEUED
+        else:
+          reply = self.execute(command)
+        writer.write(encode(reply, resp3))
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+      pass
+    finally:
+      writer.close()
+
+  @staticmethod
+  async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+      return None
+    if not line.startswith(b'*'):
+      return line.split()
+    args = []
+    for _ in range(int(line[1:])):
+      size = int((await reader.readline())[1:])
+      args.append((await reader.readexactly(size + 2))[:-2])
+    return args
+
+  def execute(self, command: List[bytes]) -> Any:
+    self.commands += 1
+    handler = getattr(self, f'cmd_{command[0].decode().lower()}', None)
+    if handler is None:
+      return Error(f"ERR unknown command '{command[0].decode()}'")
+    try:
+      return handler(*command[1:])
+    except WrongType:
+      return Error('WRONGTYPE Operation against a key holding the wrong kind of value')
+    except TypeError:
+      return Error(f"ERR wrong number of arguments for '{command[0].decode()}' command")
+
+  def _alive(self, key: bytes) -> bool:
+    deadline = self.expires.get(key)
+    if deadline is not None and deadline <= time.monotonic():
+      self.data.pop(key, None)
+      del self.expires[key]
+    return key in self.data
+
+  def _string(self, key: bytes) -> Optional[bytes]:
+    if not self._alive(key):
+      return None
+    value = self.data[key]
+    if isinstance(value, dict):
+      raise WrongType(key)
+    return value
+
+  def _hash(self, key: bytes, create: bool = False) -> Optional[dict]:
+    if not self._alive(key):
+      if not create:
+        return None
+      self.data[key] = {}
+    value = self.data[key]
+    if not isinstance(value, dict):
+      raise WrongType(key)
+    return value
+
+  # Connection
+
+  def cmd_ping(self, *args):
+    return args[0] if args else Status('PONG')
+
+  def cmd_client(self, *args):
+    return OK
+
+  def cmd_select(self, db):
+    return OK
+
+  def cmd_auth(self, *args):
+    return OK
+
+  def cmd_time(self):
+    now = time.time()
+    return [str(int(now)), str(int(now % 1 * 1_000_000))]
+
+  # Strings and keys
+
+  def cmd_get(self, key):
+    return self._string(key)
+
+  def cmd_mget(self, *keys):
+    return [self._string(key) for key in keys]
+
+  def cmd_set(self, key, value, *options):
+    options = [option.upper() if isinstance(option, bytes) else option for option in options]
+    exists = self._alive(key)
+    if (b'NX' in options and exists) or (b'XX' in options and not exists):
+      return None
+    self.data[key] = value
+    self.expires.pop(key, None)
+    for unit, scale in ((b'EX', 1.0), (b'PX', 0.001)):
+      if unit in options:
+        ttl = int(options[options.index(unit) + 1])
+        self.expires[key] = time.monotonic() + ttl * scale
+    return OK
+
+  def cmd_incr(self, key):
+    value = int(self._string(key) or 0) + 1
+    self.data[key] = str(value).encode()
+    return value
+
+  def cmd_del(self, *keys):
+    deleted = 0
+    for key in keys:
+      if self._alive(key):
+        del self.data[key]
+        self.expires.pop(key, None)
+        deleted += 1
+    return deleted
+
+  def cmd_exists(self, *keys):
+    return sum(1 for key in keys if self._alive(key))
+
+  def cmd_expire(self, key, seconds):
+    if not self._alive(key):
+      return 0
+    self.expires[key] = time.monotonic() + int(seconds)
+    return 1
+
+  def cmd_pttl(self, key):
+    if not self._alive(key):
+      return -2
+    deadline = self.expires.get(key)
+    return -1 if deadline is None else int((deadline - time.monotonic()) * 1000)
+
+  def cmd_rename(self, key, new_key):
+    if not self._alive(key):
+      return Error('ERR no such key')
+    self.data[new_key] = self.data.pop(key)
+    deadline = self.expires.pop(key, None)
+    self.expires.pop(new_key, None)
+    if deadline is not None:
+      self.expires[new_key] = deadline
+    return OK
+
+  def cmd_scan(self, cursor, *options):
+    options = list(options)
+    pattern, count = b'*', 10
+    for index in range(0, len(options) - 1, 2):
+      option = options[index].upper()
+      if option == b'MATCH':
+        pattern = options[index + 1]
+      elif option == b'COUNT':
+        count = int(options[index + 1])
+    # The cursor is an offset into the sorted keys, good enough for one scanner at a time
+    keys = sorted(key for key in list(self.data) if self._alive(key))
+    start = int(cursor)
+    page = keys[start:start + count]
+    following = start + count if start + count < len(keys) else 0
+    matched = [key for key in page if fnmatch.fnmatchcase(key.decode(), pattern.decode())]
+    return [str(following), matched]
+
+  def cmd_publish(self, channel, message):
+    return 0
+
+  # Hashes
+
+  def cmd_hset(self, key, *pairs):
+    values = self._hash(key, create=True)
+    added = 0
+    for field, value in zip(pairs[::2], pairs[1::2]):
+      added += field not in values
+      values[field] = value
+    return added
+
+  def cmd_hmget(self, key, *fields):
+    values = self._hash(key) or {}
+    return [values.get(field) for field in fields]
+
+  def cmd_hgetall(self, key):
+    return dict(self._hash(key) or {})
+
+  def cmd_hdel(self, key, *fields):
+    values = self._hash(key) or {}
+    return sum(1 for field in fields if values.pop(field, None) is not None)
+
+  # Scripts
+
+  def cmd_script(self, subcommand, *args):
+    subcommand = subcommand.upper()
+    if subcommand == b'LOAD':
+      source = args[0].decode()
+      if source not in self._sources:
+        return Error('ERR script is not emulated by the fake Redis server')
+      return hashlib.sha1(args[0]).hexdigest()
+    if subcommand == b'EXISTS':
+      return [int(sha.decode() in self.scripts) for sha in args]
+    return OK
+
+  def cmd_evalsha(self, sha, numkeys, *rest):
+    func = self.scripts.get(sha.decode())
+    if func is None:
+      return Error('NOSCRIPT No matching script. Please use EVAL.')
+    numkeys = int(numkeys)
+    return func(self, list(rest[:numkeys]), list(rest[numkeys:]))
+
+  def cmd_eval(self, source, numkeys, *rest):
+    func = self._sources.get(source.decode())
+    if func is None:
+      return Error('ERR script is not emulated by the fake Redis server')
+    numkeys = int(numkeys)
+    return func(self, list(rest[:numkeys]), list(rest[numkeys:]))
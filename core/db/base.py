@@ -1,22 +1,53 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import URL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from django.conf import settings
+from .constants import (
+  POOL_SIZE,
+  MAX_OVERFLOW,
+  POOL_TIMEOUT,
+  POOL_RECYCLE,
+  POOL_PRE_PING,
+  STATEMENT_CACHE_SIZE
+)
+
+# asyncpg connections belong to the event loop that opened them, so the pool
+# is only shared by code running on the ASGI server's loop. Sync views must
+# use the Django ORM: async_to_sync runs every call on a new loop.
+
+# Sizes both asyncpg's statement cache and the dialect's, passed in the URL;
+# both must be off behind pgbouncer in transaction mode
+statement_cache_size = getattr(settings, 'DB_STATEMENT_CACHE_SIZE', STATEMENT_CACHE_SIZE)
 
 # Create async engine using Django's database settings
 DB_CONFIG = settings.DATABASES['default']
-DATABASE_URL = f"postgresql+asyncpg://{DB_CONFIG['USER']}:{DB_CONFIG['PASSWORD']}@{DB_CONFIG['HOST']}:{DB_CONFIG['PORT']}/{DB_CONFIG['NAME']}"
+DATABASE_URL = URL.create(
+  'postgresql+asyncpg',
+  username=DB_CONFIG['USER'],
+  password=DB_CONFIG['PASSWORD'],
+  host=DB_CONFIG['HOST'],
+  port=int(DB_CONFIG['PORT']) if DB_CONFIG['PORT'] else None,
+  database=DB_CONFIG['NAME'],
+  query={'prepared_statement_cache_size': str(statement_cache_size)},
+)
 
 engine = create_async_engine(
   DATABASE_URL,
-  echo=settings.DEBUG,
+  echo=getattr(settings, 'DB_ECHO', False),
+  pool_size=getattr(settings, 'DB_POOL_SIZE', POOL_SIZE),
+  max_overflow=getattr(settings, 'DB_MAX_OVERFLOW', MAX_OVERFLOW),
+  pool_timeout=getattr(settings, 'DB_POOL_TIMEOUT', POOL_TIMEOUT),
+  pool_recycle=getattr(settings, 'DB_POOL_RECYCLE', POOL_RECYCLE),
+  pool_pre_ping=getattr(settings, 'DB_POOL_PRE_PING', POOL_PRE_PING),
+  connect_args={'statement_cache_size': statement_cache_size},
 )
 
 # Create declarative base for models
 Base = declarative_base()
 
 # Create async session factory
-AsyncSessionLocal = sessionmaker(
+AsyncSessionLocal = async_sessionmaker(
   engine,
   class_=AsyncSession,
   expire_on_commit=False,
-)
\ No newline at end of file
+)
@@ -0,0 +1,14 @@
+"""Async database constants."""
+
+# Connection pool settings, per process
+POOL_SIZE = 20  # connections kept open
+MAX_OVERFLOW = 10  # extra connections opened under bursts
+POOL_TIMEOUT = 5  # seconds to wait for a connection before failing
+POOL_RECYCLE = 1800  # seconds before a connection is replaced
+POOL_PRE_PING = True
+STATEMENT_CACHE_SIZE = 100  # prepared statements per connection, 0 behind pgbouncer
+
+# Query settings
+IN_CHUNK_SIZE = 1000  # ids per IN (...) lookup
+SEARCH_LIMIT = 20
+LIKE_ESCAPE = '\\'  # escapes %, _ and itself in search patterns
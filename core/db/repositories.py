@@ -0,0 +1,130 @@
+"""
+Async read repositories over the SQLAlchemy engine.
+
+Each call checks a connection out of the engine's pool for a single
+statement and returns plain dicts, so ASGI handlers can fan out reads
+without holding sync worker threads or building ORM instances.
+"""
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from .base import AsyncSessionLocal
+from .constants import IN_CHUNK_SIZE, LIKE_ESCAPE, SEARCH_LIMIT
+from .tables import CustomerTable
+
+CustomerId = Union[str, uuid.UUID]
+
+# Columns returned for a customer, matching the CP profile response
+PROFILE_COLUMNS = (
+  CustomerTable.id,
+  CustomerTable.email,
+  CustomerTable.first_name,
+  CustomerTable.last_name,
+  CustomerTable.phone,
+  CustomerTable.country,
+  CustomerTable.status,
+)
+
+LIST_COLUMNS = PROFILE_COLUMNS + (
+  CustomerTable.is_active,
+  CustomerTable.created_at,
+)
+
+def _as_uuid(value: CustomerId) -> Optional[uuid.UUID]:
+  if isinstance(value, uuid.UUID):
+    return value
+  try:
+    return uuid.UUID(str(value))
+  except ValueError:
+    return None
+
+def _contains(value: str) -> str:
+  """LIKE pattern matching value anywhere, with its wildcards taken literally."""
+  for char in (LIKE_ESCAPE, '%', '_'):
+    value = value.replace(char, LIKE_ESCAPE + char)
+  return f"%{value}%"
+
+def _row(row) -> Dict[str, Any]:
+  data = dict(row)
+  data['id'] = str(data['id'])
+  return data
+
+class CustomerRepository:
+  def __init__(self, session_factory: async_sessionmaker = AsyncSessionLocal):
+    """
+    Initialize customer repository
+
+    Args:
+      session_factory: Creates the sessions statements run in
+    """
+    self.session_factory = session_factory
+
+  async def get_profile(self, customer_id: CustomerId) -> Optional[Dict[str, Any]]:
+    """Profile fields of one customer, or None."""
+    customer_id = _as_uuid(customer_id)
+    if customer_id is None:
+      return None
+    async with self.session_factory() as session:
+      result = await session.execute(
+        select(*PROFILE_COLUMNS).where(CustomerTable.id == customer_id)
+      )
+      row = result.mappings().first()
+    return _row(row) if row is not None else None
+
+  async def get_many(self, customer_ids: Iterable[CustomerId]) -> Dict[str, Dict[str, Any]]:
+    """Customers by id, with one query per IN_CHUNK_SIZE ids."""
+    ids = list({_as_uuid(value) for value in customer_ids} - {None})
+    customers = {}
+    if not ids:
+      return customers
+    async with self.session_factory() as session:
+      for start in range(0, len(ids), IN_CHUNK_SIZE):
+        result = await session.execute(
+          select(*LIST_COLUMNS).where(CustomerTable.id.in_(ids[start:start + IN_CHUNK_SIZE]))
+        )
+        for row in result.mappings():
+          customer = _row(row)
+          customers[customer['id']] = customer
+    return customers
+
+  def _search_filter(self, query: str):
+    pattern = _contains(query)
+    return or_(
+      CustomerTable.email.ilike(pattern, escape=LIKE_ESCAPE),
+      CustomerTable.first_name.ilike(pattern, escape=LIKE_ESCAPE),
+      CustomerTable.last_name.ilike(pattern, escape=LIKE_ESCAPE),
+      CustomerTable.phone.ilike(pattern, escape=LIKE_ESCAPE),
+    )
+
+  async def search(
+    self,
+    query: str,
+    limit: int = SEARCH_LIMIT,
+    offset: int = 0,
+    status: Optional[str] = None,
+    country: Optional[str] = None
+  ) -> List[Dict[str, Any]]:
+    """Substring search over email, names and phone, for when Elasticsearch is unavailable."""
+    statement = select(*LIST_COLUMNS).where(self._search_filter(query))
+    if status:
+      statement = statement.where(CustomerTable.status == status)
+    if country:
+      statement = statement.where(CustomerTable.country == country.upper())
+    statement = statement.order_by(CustomerTable.created_at.desc(), CustomerTable.id.desc())
+    async with self.session_factory() as session:
+      result = await session.execute(statement.limit(limit).offset(offset))
+      return [_row(row) for row in result.mappings()]
+
+  async def count(self, query: Optional[str] = None, status: Optional[str] = None) -> int:
+    statement = select(func.count()).select_from(CustomerTable)
+    if query:
+      statement = statement.where(self._search_filter(query))
+    if status:
+      statement = statement.where(CustomerTable.status == status)
+    async with self.session_factory() as session:
+      return (await session.execute(statement)).scalar_one()
+
+customer_repository = CustomerRepository()
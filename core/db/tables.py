@@ -0,0 +1,29 @@
+"""
+SQLAlchemy mappings of tables owned by Django models.
+
+Django migrations create and change these tables; the mappings here only
+mirror them for async reads and must be kept in step with the models.
+"""
+from sqlalchemy import Boolean, Column, DateTime, String, Uuid
+from .base import Base
+
+class CustomerTable(Base):
+  """Mirror of models.Customer (db_table "customers"), without the password hash."""
+  __tablename__ = 'customers'
+
+  id = Column(Uuid, primary_key=True)
+  email = Column(String(254), nullable=False, unique=True)
+  first_name = Column(String(150), nullable=False)
+  last_name = Column(String(150), nullable=False)
+  phone = Column(String(20), nullable=False)
+  country = Column(String(2), nullable=False)
+  status = Column(String(20), nullable=False)
+  is_active = Column(Boolean, nullable=False)
+  is_staff = Column(Boolean, nullable=False)
+  is_superuser = Column(Boolean, nullable=False)
+  last_login = Column(DateTime(timezone=True))
+  date_joined = Column(DateTime(timezone=True), nullable=False)
+  created_at = Column(DateTime(timezone=True), nullable=False)
+  updated_at = Column(DateTime(timezone=True), nullable=False)
+  created_by = Column(Uuid)
+  updated_by = Column(Uuid)
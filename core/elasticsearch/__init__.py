@@ -1,4 +1,5 @@
 """Elasticsearch module initialization."""
 from .client import ESClient, es_client
+from .queue import IndexingQueue, indexing_queue
 
-__all__ = ["ESClient", "es_client"]
\ No newline at end of file
+__all__ = ["ESClient", "es_client", "IndexingQueue", "indexing_queue"]
\ No newline at end of file
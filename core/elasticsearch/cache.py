@@ -0,0 +1,127 @@
+"""
+Redis-backed cache for Elasticsearch search responses.
+
+Entries are keyed by a hash of the index and the full request, scoped by a
+per-index generation counter. Writes to an index bump its generation, which
+makes every cached response for that index unreachable at once; stale
+entries then simply expire.
+
+A write that doesn't wait for a refresh is invisible to searches until the
+index's next periodic refresh. Such writes also place a short hold on the
+index, during which responses are served but not cached, so the results from
+before the write don't get cached under the new generation.
+"""
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+
+from core.redis.client import RedisClient
+from .constants import SEARCH_CACHE_PREFIX, SEARCH_CACHE_TTL, SEARCH_CACHE_WRITE_HOLD
+
+logger = logging.getLogger('elasticsearch')
+
+class SearchCache:
+  def __init__(self, client: Optional[RedisClient] = None, ttl: Optional[int] = None):
+    """
+    Initialize search cache
+
+    Args:
+      client: Redis client to use. Defaults to a dedicated instance so its
+        connection pool belongs to the event loop of the owning ESClient.
+      ttl: Seconds a response stays cached. Defaults to the
+        ELASTICSEARCH_SEARCH_CACHE_TTL setting.
+    """
+    self._client = client
+    self._ttl = ttl
+
+  @property
+  def enabled(self) -> bool:
+    return getattr(settings, 'ELASTICSEARCH_SEARCH_CACHE', False)
+
+  @property
+  def ttl(self) -> int:
+    if self._ttl is not None:
+      return self._ttl
+    return getattr(settings, 'ELASTICSEARCH_SEARCH_CACHE_TTL', SEARCH_CACHE_TTL)
+
+  async def _redis(self) -> RedisClient:
+    if self._client is None:
+      # Generations must always be read fresh from Redis
+      self._client = RedisClient(near_cache=False)
+    await self._client.ensure_connection()
+    return self._client
+
+  @property
+  def write_hold(self) -> int:
+    return getattr(settings, 'ELASTICSEARCH_SEARCH_CACHE_WRITE_HOLD', SEARCH_CACHE_WRITE_HOLD)
+
+  @staticmethod
+  def _generation_key(index: str) -> str:
+    return f"{SEARCH_CACHE_PREFIX}gen:{index}"
+
+  @staticmethod
+  def _hold_key(index: str) -> str:
+    return f"{SEARCH_CACHE_PREFIX}hold:{index}"
+
+  @staticmethod
+  def make_key(index: str, generation: int, request: Dict[str, Any]) -> str:
+    """Build a key that is identical for semantically equal requests."""
+    canonical = json.dumps(request, sort_keys=True, separators=(',', ':'), default=str)
+    digest = hashlib.sha1(canonical.encode()).hexdigest()
+    return f"{SEARCH_CACHE_PREFIX}{index}:{generation}:{digest}"
+
+  async def get(self, index: str, request: Dict[str, Any]) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Look up a cached response.
+
+    Returns the response (or None on a miss) and the key to store the
+    fresh response under. The key is None when the response must not be
+    cached or Redis is unavailable.
+    """
+    try:
+      redis = await self._redis()
+      generation_key, hold_key = self._generation_key(index), self._hold_key(index)
+      values = await redis.get_many([generation_key, hold_key])
+      if hold_key in values:
+        return None, None
+      key = self.make_key(index, values.get(generation_key) or 0, request)
+      return await redis.get(key), key
+    except Exception as e:
+      logger.warning(f"Search cache lookup failed for {index}: {str(e)}")
+      return None, None
+
+  async def set(self, key: Optional[str], response: Dict) -> None:
+    if key is None:
+      return
+    try:
+      redis = await self._redis()
+      await redis.set(key, response, expire=self.ttl)
+    except Exception as e:
+      logger.warning(f"Search cache store failed for {key}: {str(e)}")
+
+  async def invalidate(self, index: str, hold: bool = False) -> None:
+    """
+    Make all cached responses for an index unreachable.
+
+    Args:
+      index: Index written to
+      hold: Don't cache responses for the index until the write is searchable
+
+    Runs even when the cache is off by default, since single searches can
+    still opt in with cache=True.
+    """
+    try:
+      redis = await self._redis()
+      # Hold first, so no search can cache under the new generation in between
+      if hold:
+        await redis.set(self._hold_key(index), 1, expire=self.write_hold)
+      await redis.increment(self._generation_key(index))
+    except Exception as e:
+      logger.warning(f"Search cache invalidation failed for {index}: {str(e)}")
+
+  async def close(self) -> None:
+    if self._client is not None:
+      await self._client.close()
@@ -1,29 +1,60 @@
 """
 Elasticsearch client configuration and management.
 """
-from typing import Optional, Dict, Any, List
-from elasticsearch import AsyncElasticsearch
+from contextlib import aclosing, asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, AsyncIterator, List, Set, Type, Union
+from elasticsearch import AsyncElasticsearch, Elasticsearch
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+import asyncio
 import logging
+import threading
 from shared.utils.logger import logger
-from .exceptions import ESConnectionError, ESOperationError, ESBulkOperationError
-from .constants import DEFAULT_SETTINGS, MAX_RETRIES, REQUEST_TIMEOUT
+from core.metrics.timing import timed
+from core.metrics.constants import BACKEND_ES
+from .exceptions import ESConnectionError, ESOperationError, ESIndexError, ESBulkOperationError
+from .constants import (
+    DEFAULT_SETTINGS,
+    MAX_RETRIES,
+    REQUEST_TIMEOUT,
+    REFRESH_TRUE,
+    REFRESH_FALSE,
+    REFRESH_POLICIES,
+    DEFAULT_REFRESH_POLICY,
+    BULK_LOAD_SETTINGS,
+    REINDEX_POLL_INTERVAL,
+    REINDEX_CATCHUP_PASSES,
+    REINDEX_CATCHUP_MARGIN,
+    SEARCH_PAGE_SIZE,
+    PIT_KEEP_ALIVE
+)
+from .cache import SearchCache
+from .indices.base import BaseIndex
 from .indices.customer import CustomerIndex
-# from .indices.transaction import TransactionIndex
+from .indices.transaction import TransactionIndex
 
 logger = logging.getLogger('elasticsearch')
 
+RefreshPolicy = Union[bool, str]
+
 class ESClient:
-    def __init__(self):
+    def __init__(self, search_cache: Optional[SearchCache] = None):
         self.connection: Optional[AsyncElasticsearch] = None
+        # For sync code such as WSGI views: the async connection belongs to
+        # the event loop it was opened on, and async_to_sync uses a new one
+        self._sync_connection: Optional[Elasticsearch] = None
+        self._sync_lock = threading.Lock()
         self._initialized = False
+        self.search_cache = search_cache or SearchCache()
         
         # Define indices using the schemas
         self.indices = [
             CustomerIndex,
-            # TransactionIndex
+            TransactionIndex
         ]
+        # Indices currently being bulk loaded; writes to them never refresh
+        self._bulk_loading: Set[str] = set()
 
     async def initialize(self) -> None:
         """Initialize Elasticsearch connection if not already initialized."""
@@ -51,67 +82,294 @@ class ESClient:
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.close()
 
+    async def close(self) -> None:
+        """Close Elasticsearch connection."""
+        if self.connection:
+            await self.connection.close()
+            self.connection = None
+        with self._sync_lock:
+            sync_connection, self._sync_connection = self._sync_connection, None
+        if sync_connection is not None:
+            sync_connection.close()
+        await self.search_cache.close()
+
+    @staticmethod
+    def _connection_config() -> Dict[str, Any]:
+        # Base connection config
+        connection_config = {
+          "hosts": [f"http://{settings.ELASTICSEARCH_HOST}:{settings.ELASTICSEARCH_PORT}"],
+          "verify_certs": False,
+          "max_retries": MAX_RETRIES,
+          "retry_on_timeout": True,
+          "request_timeout": REQUEST_TIMEOUT
+        }
+
+        # Add authentication if configured
+        if hasattr(settings, 'ELASTICSEARCH_USER') and hasattr(settings, 'ELASTICSEARCH_PASSWORD'):
+          connection_config["basic_auth"] = (
+            settings.ELASTICSEARCH_USER,
+            settings.ELASTICSEARCH_PASSWORD
+          )
+        return connection_config
+
     async def connect(self) -> None:
         """Establish connection to Elasticsearch."""
         try:
             logger.info(f"Connecting to Elasticsearch at {settings.ELASTICSEARCH_HOST}")
-            
-            # Base connection config
-            connection_config = {
-              "hosts": [f"http://{settings.ELASTICSEARCH_HOST}:{settings.ELASTICSEARCH_PORT}"],
-              "verify_certs": False,
-              "max_retries": MAX_RETRIES,
-              "retry_on_timeout": True,
-              "request_timeout": REQUEST_TIMEOUT
-            }
-            
-            # Add authentication if configured
-            if hasattr(settings, 'ELASTICSEARCH_USER') and hasattr(settings, 'ELASTICSEARCH_PASSWORD'):
-              connection_config["basic_auth"] = (
-                settings.ELASTICSEARCH_USER,
-                settings.ELASTICSEARCH_PASSWORD
-              )
-            
-            self.connection = AsyncElasticsearch(**connection_config)
+            self.connection = AsyncElasticsearch(**self._connection_config())
             
             # Test connection
             await self.connection.ping()
             logger.info("Elasticsearch connection established successfully")
             
-            # Initialize indices
-            await self.initialize_indices()
-            
         except Exception as e:
             logger.error(f"Failed to connect to Elasticsearch: {str(e)}")
             raise ESConnectionError(f"Elasticsearch connection failed: {str(e)}")
 
-    async def initialize_indices(self) -> None:
-        """Initialize all defined indices."""
-        for index in self.indices:
-            try:
-                index_name = index.get_index_name()
-                exists = await self.index_exists(index_name)
-                
-                if not exists:
-                    # Only create if index doesn't exist
-                    await self.create_index(
-                        index_name,
-                        index.get_mapping(),
-                        index.get_settings()
-                    )
-                    logger.info(f"Created new index: {index_name}")
-                else:
-                    # Optionally update mapping for existing index
-                    await self.update_index(
-                        index_name,
-                        index.get_mapping(),
-                        index.get_settings()
-                    )
-                    logger.info(f"Updated existing index: {index_name}")
-                    
-            except Exception as e:
-                logger.error(f"Failed to initialize index {index.get_index_name()}: {str(e)}")
-                raise
+    async def migrate_indices(
+        self,
+        index_classes: Optional[List[Type[BaseIndex]]] = None,
+        keep_old: bool = False
+    ) -> Dict[str, bool]:
+        """
+        Rebuild every index whose version changed and swap it in.
+
+        This copies whole indices, so it runs from the migrate__elasticsearch
+        command at deploy time rather than on a request. Replaced versions
+        are deleted unless keep_old is set. Returns, per alias, whether it
+        now points at the current version.
+        """
+        if not self.connection:
+            # Not initialize(): that would warn about the versions being migrated
+            await self.connect()
+        migrated = {}
+        for index_class in index_classes or self.indices:
+            alias = index_class.get_index_name()
+            migrated[alias] = await self.ensure_index_version(index_class, rebuild=True)
+            if migrated[alias] and not keep_old:
+                await self.delete_old_versions(index_class)
+        return migrated
+
+    async def ensure_index_version(self, index_class: Type[BaseIndex], rebuild: bool = False) -> bool:
+        """
+        Make the alias of an index point at its current version.
+
+        A finished version is swapped in and a missing index is created
+        empty, both cheap enough for startup. Building a version from a live
+        index copies every document, so it only happens with rebuild=True;
+        until then the live index keeps being served. Returns whether the
+        alias points at the current version.
+        """
+        alias = index_class.get_index_name()
+        target = index_class.get_versioned_index_name()
+        current = await self.get_alias_targets(alias)
+
+        if current == [target]:
+            return True
+
+        if await self.index_exists(target):
+            if await self.is_index_complete(target):
+                await self.swap_alias(alias, target, await self.get_live_indices(alias))
+                return True
+            # Either another process is building it or a build crashed;
+            # never expose a partial index, keep serving the old one
+            logger.warning(
+                f"Index {target} exists but is incomplete, skipping alias swap; "
+                f"delete it if no rebuild is running"
+            )
+            return False
+
+        if not rebuild and await self.get_live_indices(alias):
+            logger.warning(
+                f"Index {alias} is not at version {index_class.VERSION}; "
+                f"run manage.py migrate__elasticsearch to rebuild it"
+            )
+            return False
+
+        return await self.rebuild_index(index_class)
+
+    async def get_alias_targets(self, alias: str) -> List[str]:
+        """Return the physical indices an alias points at."""
+        try:
+            if not await self.connection.indices.exists_alias(name=alias):
+                return []
+            response = await self.connection.indices.get_alias(name=alias)
+            return sorted(response.keys())
+        except Exception as e:
+            logger.error(f"Failed to get alias {alias}: {str(e)}")
+            raise ESIndexError(f"Failed to get alias: {str(e)}")
+
+    async def get_live_indices(self, alias: str) -> List[str]:
+        """Return the indices currently served under an index name."""
+        current = await self.get_alias_targets(alias)
+        # Before versioning the alias name itself was a concrete index
+        if not current and await self.index_exists(alias):
+            current = [alias]
+        return current
+
+    async def is_index_complete(self, index: str) -> bool:
+        """Check whether a versioned index finished building."""
+        response = await self.connection.indices.get_mapping(index=index)
+        mapping = next(iter(response.values()))["mappings"]
+        return bool(mapping.get("_meta", {}).get("complete"))
+
+    async def create_index_version(self, index_class: Type[BaseIndex]) -> str:
+        """
+        Create the physical index for the current version, tuned for loading.
+
+        The index starts without replicas or periodic refreshes and is marked
+        incomplete until finalize_index_version() runs.
+        """
+        target = index_class.get_versioned_index_name()
+        mapping = {
+            **index_class.get_mapping(),
+            "_meta": {"version": index_class.VERSION, "complete": False}
+        }
+        index_settings = {**index_class.get_settings(), **BULK_LOAD_SETTINGS}
+
+        if not await self.create_index(target, mapping, index_settings):
+            raise ESIndexError(f"Failed to create index {target}")
+        return target
+
+    async def finalize_index_version(self, index_class: Type[BaseIndex], target: str) -> None:
+        """Restore serving settings on a freshly built index and swap it in."""
+        alias = index_class.get_index_name()
+        index_settings = index_class.get_settings()
+        await self.connection.indices.put_settings(
+            index=target,
+            settings={
+                "index": {
+                    name: index_settings.get(name, index_settings.get("index", {}).get(name))
+                    for name in BULK_LOAD_SETTINGS
+                }
+            }
+        )
+        await self.connection.indices.refresh(index=target)
+        await self.connection.indices.put_mapping(
+            index=target,
+            meta={"version": index_class.VERSION, "complete": True}
+        )
+        await self.swap_alias(alias, target, await self.get_live_indices(alias))
+
+    async def rebuild_index(self, index_class: Type[BaseIndex]) -> bool:
+        """
+        Build the current version from the live index and swap it in.
+
+        Writes keep going to the live index while it is copied, so documents
+        whose CHANGED_FIELD moved since a copy started are copied again,
+        until a pass finds none or REINDEX_CATCHUP_PASSES is reached. Only
+        changes made during the last pass can miss the swap; deletions made
+        during the copy are not replayed.
+        """
+        alias = index_class.get_index_name()
+        current = await self.get_live_indices(alias)
+
+        try:
+            target = await self.create_index_version(index_class)
+        except ESIndexError:
+            if await self.index_exists(index_class.get_versioned_index_name()):
+                # Lost the race against another process
+                logger.info(f"Index {index_class.get_versioned_index_name()} is already being built")
+                return False
+            raise
+        logger.info(f"Building index {target} for {alias}")
+
+        if current:
+            since = self._catchup_start()
+            await self.reindex(current, target)
+            if index_class.CHANGED_FIELD:
+                await self.catch_up(current, target, index_class.CHANGED_FIELD, since)
+
+        await self.finalize_index_version(index_class, target)
+        return True
+
+    async def catch_up(self, source: List[str], dest: str, field: str, since: str) -> None:
+        """Copy documents changed since a time again, until a pass finds none."""
+        for _ in range(REINDEX_CATCHUP_PASSES):
+            started = self._catchup_start()
+            copied = await self.reindex(source, dest, query={"range": {field: {"gte": since}}})
+            logger.info(f"Caught up {copied} documents changed in {source} since {since}")
+            if not copied:
+                return
+            since = started
+
+    @staticmethod
+    def _catchup_start() -> str:
+        # Timestamps come from the application servers, allow for clock skew
+        start = datetime.now(timezone.utc) - timedelta(seconds=REINDEX_CATCHUP_MARGIN)
+        return start.isoformat()
+
+    async def reindex(self, source: List[str], dest: str, query: Optional[Dict] = None) -> int:
+        """Copy documents server side, wait for the task and return how many were written."""
+        response = await self.connection.reindex(
+            source={"index": source, **({"query": query} if query else {})},
+            dest={"index": dest},
+            conflicts="proceed",
+            slices="auto",
+            wait_for_completion=False
+        )
+        task_id = response["task"]
+
+        while True:
+            task = await self.connection.tasks.get(task_id=task_id)
+            status = task["task"]["status"]
+            logger.info(
+                f"Reindexing {source} into {dest}: "
+                f"{status.get('created', 0) + status.get('updated', 0)}/{status.get('total', 0)}"
+            )
+            if task.get("completed"):
+                break
+            await asyncio.sleep(REINDEX_POLL_INTERVAL)
+
+        failures = task.get("response", {}).get("failures") or task.get("error")
+        if failures:
+            raise ESIndexError(f"Reindex into {dest} failed: {failures}")
+        return status.get('created', 0) + status.get('updated', 0)
+
+    async def delete_old_versions(self, index_class: Type[BaseIndex]) -> List[str]:
+        """
+        Delete versioned indices older than the current version.
+
+        Indices the alias still points at are kept, and so are newer
+        versions, which a deploy running ahead may be building.
+        """
+        alias = index_class.get_index_name()
+        live = set(await self.get_alias_targets(alias))
+        response = await self.connection.indices.get(
+            index=f"{alias}_v*",
+            ignore_unavailable=True,
+            allow_no_indices=True
+        )
+        prefix = f"{alias}_v"
+        old = []
+        for name in response.keys():
+            version = name[len(prefix):]
+            if name in live or not version.isdigit() or int(version) >= index_class.VERSION:
+                continue
+            old.append(name)
+
+        for name in sorted(old):
+            await self.connection.indices.delete(index=name)
+            logger.info(f"Deleted old index version {name}")
+        return sorted(old)
+
+    async def swap_alias(self, alias: str, target: str, current: List[str]) -> None:
+        """Atomically point an alias at a new index."""
+        actions = []
+        for index in current:
+            if index == target:
+                continue
+            if index == alias:
+                # A concrete index can't share a name with an alias; drop it
+                # in the same request so there is no gap
+                actions.append({"remove_index": {"index": index}})
+            else:
+                actions.append({"remove": {"index": index, "alias": alias}})
+        actions.append({"add": {"index": target, "alias": alias, "is_write_index": True}})
+
+        await self.connection.indices.update_aliases(actions=actions)
+        await self.search_cache.invalidate(alias)
+        logger.info(f"Alias {alias} now points to {target} (previously {current or 'none'})")
 
     async def index_exists(self, index: str) -> bool:
         """Check if an index exists."""
@@ -137,65 +395,132 @@ class ESClient:
             logger.error(f"Failed to create index {index}: {str(e)}")
             return False
 
-    async def update_index(self, index: str, mapping: Dict, settings: Dict) -> bool:
-        """Update existing index with new mapping and settings."""
+    def get_index_class(self, index: str) -> Optional[Type[BaseIndex]]:
+        """Return the index definition registered under the given name."""
+        return next((i for i in self.indices if i.get_index_name() == index), None)
+
+    def get_refresh_policy(self, index: str, refresh: Optional[RefreshPolicy] = None) -> str:
+        """
+        Resolve the refresh policy for a write.
+
+        An explicit per-call policy wins. Otherwise indices being bulk loaded
+        never refresh, then the index's REFRESH_POLICY applies, then the
+        ELASTICSEARCH_REFRESH_POLICY setting.
+        """
+        if refresh is None:
+            if index in self._bulk_loading:
+                return REFRESH_FALSE
+            index_class = self.get_index_class(index)
+            refresh = index_class.REFRESH_POLICY if index_class else None
+        if refresh is None:
+            refresh = getattr(settings, 'ELASTICSEARCH_REFRESH_POLICY', DEFAULT_REFRESH_POLICY)
+
+        if isinstance(refresh, bool):
+            return REFRESH_TRUE if refresh else REFRESH_FALSE
+        if refresh not in REFRESH_POLICIES:
+            raise ValueError(f"Invalid refresh policy: {refresh}")
+        return refresh
+
+    async def _invalidate_cache(self, index: str, refresh: str) -> None:
+        # A write that didn't refresh only becomes searchable at the next
+        # periodic refresh; responses read before then must not be cached
+        await self.search_cache.invalidate(index, hold=refresh == REFRESH_FALSE)
+
+    @asynccontextmanager
+    async def bulk_load(self, index: str):
+        """
+        Temporarily tune an index for a large load.
+
+        Disables periodic refreshes and replicas while the block runs, then
+        restores the previous settings and refreshes the index once.
+        """
+        await self.ensure_connection()
+        response = await self.connection.indices.get_settings(
+            index=index,
+            flat_settings=True
+        )
+        current = next(iter(response.values()))["settings"]
+        original = {
+            name: current.get(f"index.{name}")
+            for name in BULK_LOAD_SETTINGS
+        }
+
+        await self.connection.indices.put_settings(
+            index=index,
+            settings={"index": BULK_LOAD_SETTINGS}
+        )
+        self._bulk_loading.add(index)
+        logger.info(f"Bulk load mode enabled for index: {index}")
         try:
-            # Close index
-            await self.connection.indices.close(index=index)
-            
-            # Update settings and mapping
+            yield self
+        finally:
+            self._bulk_loading.discard(index)
+            # A None value resets the setting to the cluster default
             await self.connection.indices.put_settings(
-              index=index,
-              body=settings
-            )
-            await self.connection.indices.put_mapping(
-              index=index,
-              body=mapping
+                index=index,
+                settings={"index": original}
             )
-            
-            # Reopen index
-            await self.connection.indices.open(index=index)
-            
-            logger.info(f"Updated index: {index}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to update index {index}: {str(e)}")
-            await self.connection.indices.open(index=index)
-            return False
+            await self.connection.indices.refresh(index=index)
+            # Responses cached during the load predate the documents
+            await self.search_cache.invalidate(index)
+            logger.info(f"Bulk load mode disabled for index: {index}")
 
-    async def add_document(self, index: str, id: str, document: Dict[str, Any]) -> bool:
+    @timed(BACKEND_ES)
+    async def add_document(
+        self,
+        index: str,
+        id: str,
+        document: Dict[str, Any],
+        refresh: Optional[RefreshPolicy] = None
+    ) -> bool:
         """Add or update a single document."""
         try:
             await self.ensure_connection()
+            refresh = self.get_refresh_policy(index, refresh)
             await self.connection.index(
                 index=index,
                 id=id,
                 document=document,
-                refresh=True
+                refresh=refresh
             )
+            await self._invalidate_cache(index, refresh)
             return True
         except Exception as e:
             logger.error(f"Failed to add document to {index}: {str(e)}")
             return False
             
-    async def delete_document(self, index: str, id: str) -> bool:
+    @timed(BACKEND_ES)
+    async def delete_document(
+      self,
+      index: str,
+      id: str,
+      refresh: Optional[RefreshPolicy] = None
+    ) -> bool:
       """Delete a single document by ID."""
       try:
           await self.ensure_connection()
+          refresh = self.get_refresh_policy(index, refresh)
           await self.connection.delete(
               index=index,
               id=id,
-              refresh=True
+              refresh=refresh
           )
+          await self._invalidate_cache(index, refresh)
           return True
       except Exception as e:
           logger.error(f"Failed to delete document {id} from {index}: {str(e)}")
           return False
 
-    async def bulk_update(self, index: str, documents: List[Dict[str, Any]]) -> bool:
+    @timed(BACKEND_ES)
+    async def bulk_update(
+        self,
+        index: str,
+        documents: List[Dict[str, Any]],
+        refresh: Optional[RefreshPolicy] = None
+    ) -> bool:
         """Perform bulk update operation."""
         try:
+            await self.ensure_connection()
             operations = []
             for doc in documents:
                 operations.extend([
@@ -203,11 +528,13 @@ class ESClient:
                     {"doc": doc, "doc_as_upsert": True}
                 ])
             
+            refresh = self.get_refresh_policy(index, refresh)
             response = await self.connection.bulk(
                 operations=operations,
-                refresh=True
+                refresh=refresh
             )
             
+            await self._invalidate_cache(index, refresh)
             if response.get("errors"):
                 self._handle_bulk_errors(response, index, len(documents))
                 return False
@@ -218,20 +545,56 @@ class ESClient:
             logger.error(f"Bulk update failed for index {index}: {str(e)}")
             return False
 
-    def _handle_bulk_errors(self, response: Dict, index: str, doc_count: int) -> None:
+    @timed(BACKEND_ES)
+    async def bulk_delete(
+        self,
+        index: str,
+        ids: List[str],
+        refresh: Optional[RefreshPolicy] = None
+    ) -> bool:
+        """Perform bulk delete operation."""
+        try:
+            await self.ensure_connection()
+            operations = [{"delete": {"_index": index, "_id": id}} for id in ids]
+
+            refresh = self.get_refresh_policy(index, refresh)
+            response = await self.connection.bulk(
+                operations=operations,
+                refresh=refresh
+            )
+
+            await self._invalidate_cache(index, refresh)
+            if response.get("errors"):
+                self._handle_bulk_errors(response, index, len(ids), action="delete")
+                return False
+
+            return True
+
+        except Exception as e:
+            logger.error(f"Bulk delete failed for index {index}: {str(e)}")
+            return False
+
+    def _handle_bulk_errors(
+        self,
+        response: Dict,
+        index: str,
+        doc_count: int,
+        action: str = "update"
+    ) -> None:
         """Handle bulk operation errors."""
         errored_documents = []
         
         for item in response["items"]:
-            if "error" in item.get("update", {}):
+            result = item.get(action, {})
+            if "error" in result:
                 errored_documents.append({
-                    "status": item["update"].get("status"),
-                    "error": item["update"].get("error"),
-                    "id": item["update"].get("_id")
+                    "status": result.get("status"),
+                    "error": result.get("error"),
+                    "id": result.get("_id")
                 })
         
         logger.error(
-            "Bulk update errors",
+            f"Bulk {action} errors",
             extra={
                 "index": index,
                 "total_docs": doc_count,
@@ -241,34 +604,38 @@ class ESClient:
         )
 
     async def setup_indices(self) -> None:
-      """Setup all indices."""
+      """Create missing indices and swap in finished versions; never rebuilds."""
       try:
         for index in self.indices:
-          exists = await self.index_exists(index.get_index_name())
-          if not exists:
-            await self.create_index(
-              index.get_index_name(),
-              index.get_mapping(),
-              index.get_settings()
-            )
+          await self.ensure_index_version(index)
       except Exception as e:
         logger.error(f"Failed to setup indices: {str(e)}")
         raise
 
-    async def index(self, index: str, id: str, document: Dict, refresh: bool = False) -> None:
+    @timed(BACKEND_ES)
+    async def index(
+        self,
+        index: str,
+        id: str,
+        document: Dict,
+        refresh: Optional[RefreshPolicy] = None
+    ) -> None:
         """Index a document."""
         try:
             await self.ensure_connection()
+            refresh = self.get_refresh_policy(index, refresh)
             await self.connection.index(
                 index=index,
                 id=id,
                 document=document,
                 refresh=refresh
             )
+            await self._invalidate_cache(index, refresh)
         except Exception as e:
             logger.error(f"Failed to add document to {index}: {str(e)}")
             raise ESOperationError(f"Failed to index document: {str(e)}")
 
+    @timed(BACKEND_ES)
     async def get(self, index: str, id: str) -> Dict:
         """Get a document by ID."""
         try:
@@ -281,17 +648,216 @@ class ESClient:
             logger.error(f"Failed to get document from {index}: {str(e)}")
             raise ESOperationError(f"Failed to get document: {str(e)}")
 
-    async def search(self, index: str, query: Dict) -> Dict:
-        """Search documents."""
+    @timed(BACKEND_ES)
+    async def search(
+        self,
+        index: str,
+        query: Dict,
+        size: Optional[int] = None,
+        from_: Optional[int] = None,
+        sort: Optional[List[Any]] = None,
+        search_after: Optional[List[Any]] = None,
+        source: Optional[Union[bool, List[str]]] = None,
+        cache: Optional[bool] = None,
+        track_total_hits: Optional[Union[bool, int]] = None
+    ) -> Dict:
+        """
+        Search documents.
+
+        Pass the sort values of the last hit as search_after to fetch the
+        next page instead of increasing from_. Responses are served from the
+        search cache when it is enabled (or cache=True); cache=False always
+        queries the cluster. The response is always a plain dict.
+        track_total_hits=False skips counting matches
+        beyond the returned page.
+        """
         try:
             await self.ensure_connection()
-            return await self.connection.search(
-                index=index,
-                query=query
-            )
+            params = {
+                "query": query,
+                "size": size,
+                "from_": from_,
+                "sort": sort,
+                "search_after": search_after,
+                "source": source,
+                "track_total_hits": track_total_hits
+            }
+            params = {name: value for name, value in params.items() if value is not None}
+
+            use_cache = self.search_cache.enabled if cache is None else cache
+            if use_cache:
+                cached, key = await self.search_cache.get(index, params)
+                if cached is not None:
+                    return cached
+
+            response = await self.connection.search(index=index, **params)
+            # Plain dict, the same type cache hits return
+            response = getattr(response, "body", response)
+
+            if use_cache:
+                await self.search_cache.set(key, response)
+            return response
+        except Exception as e:
+            logger.error(f"Failed to search in {index}: {str(e)}")
+            raise ESOperationError(f"Failed to search documents: {str(e)}")
+
+    def _get_sync_connection(self) -> Elasticsearch:
+        with self._sync_lock:
+            if self._sync_connection is None:
+                self._sync_connection = Elasticsearch(**self._connection_config())
+            return self._sync_connection
+
+    @timed(BACKEND_ES, 'search')
+    def search_sync(
+        self,
+        index: str,
+        query: Dict,
+        size: Optional[int] = None,
+        source: Optional[Union[bool, List[str]]] = None,
+        track_total_hits: Optional[Union[bool, int]] = None
+    ) -> Dict:
+        """
+        Search documents from sync code, e.g. WSGI views.
+
+        Uses a blocking connection shared by the process's threads and
+        bypasses the search cache, whose Redis client is async.
+        """
+        try:
+            params = {
+                "query": query,
+                "size": size,
+                "source": source,
+                "track_total_hits": track_total_hits
+            }
+            params = {name: value for name, value in params.items() if value is not None}
+            response = self._get_sync_connection().search(index=index, **params)
+            return getattr(response, "body", response)
         except Exception as e:
             logger.error(f"Failed to search in {index}: {str(e)}")
             raise ESOperationError(f"Failed to search documents: {str(e)}")
 
+    async def iter_search(
+        self,
+        index: str,
+        query: Optional[Dict] = None,
+        page_size: int = SEARCH_PAGE_SIZE,
+        source: Optional[Union[bool, List[str]]] = None,
+        sort: Optional[List[Any]] = None,
+        slices: int = 1,
+        keep_alive: str = PIT_KEEP_ALIVE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over every hit of a query in constant memory.
+
+        Pages are read from a point in time with search_after, so the
+        result is a consistent snapshot and is not limited by
+        max_result_window. With slices > 1 the point in time is split and
+        read concurrently; hits are then yielded in no particular order.
+        """
+        await self.ensure_connection()
+        try:
+            response = await self.connection.open_point_in_time(
+                index=index,
+                keep_alive=keep_alive
+            )
+        except Exception as e:
+            logger.error(f"Failed to open point in time for {index}: {str(e)}")
+            raise ESOperationError(f"Failed to open point in time: {str(e)}")
+
+        pit = {"id": response["id"], "keep_alive": keep_alive}
+        search = {
+            "query": query or {"match_all": {}},
+            "size": page_size,
+            "sort": sort or [{"_shard_doc": "asc"}],
+            "source": source,
+            "track_total_hits": False
+        }
+        try:
+            # Closed explicitly so slice readers stop before the point in time does
+            if slices <= 1:
+                async with aclosing(self._iter_pages(pit, search)) as pages:
+                    async for page in pages:
+                        for hit in page:
+                            yield hit
+            else:
+                async with aclosing(self._iter_slices(pit, search, slices)) as hits:
+                    async for hit in hits:
+                        yield hit
+        finally:
+            try:
+                await self.connection.close_point_in_time(id=pit["id"])
+            except Exception as e:
+                logger.error(f"Failed to close point in time for {index}: {str(e)}")
+
+    async def _iter_pages(
+        self,
+        pit: Dict[str, str],
+        search: Dict[str, Any]
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield pages of hits from a point in time until exhausted."""
+        search_after = None
+        while True:
+            try:
+                response = await self.connection.search(
+                    pit=dict(pit),
+                    search_after=search_after,
+                    **{name: value for name, value in search.items() if value is not None}
+                )
+            except Exception as e:
+                logger.error(f"Failed to read point in time page: {str(e)}")
+                raise ESOperationError(f"Failed to search documents: {str(e)}")
+
+            # The point in time id may change between requests; updated in
+            # place so the slices and iter_search's close use the live one
+            pit["id"] = response.get("pit_id", pit["id"])
+
+            hits = response["hits"]["hits"]
+            if not hits:
+                return
+            yield hits
+
+            if len(hits) < search["size"]:
+                return
+            search_after = hits[-1]["sort"]
+
+    async def _iter_slices(
+        self,
+        pit: Dict[str, str],
+        search: Dict[str, Any],
+        slices: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Read slices of a point in time concurrently and merge their hits."""
+        # Bounded so fast slices wait for the consumer instead of buffering
+        queue: asyncio.Queue = asyncio.Queue(maxsize=slices * 2)
+        done = object()
+
+        async def read_slice(slice_id: int) -> None:
+            try:
+                async for page in self._iter_pages(
+                    pit,
+                    {**search, "slice": {"id": slice_id, "max": slices}}
+                ):
+                    await queue.put(page)
+                await queue.put(done)
+            except Exception as e:
+                await queue.put(e)
+
+        tasks = [asyncio.create_task(read_slice(i)) for i in range(slices)]
+        try:
+            remaining = slices
+            while remaining:
+                item = await queue.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    for hit in item:
+                        yield hit
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
 # Create singleton instance
 es_client = ESClient()
\ No newline at end of file
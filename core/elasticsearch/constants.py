@@ -2,7 +2,6 @@
 
 # Index settings
 DEFAULT_SETTINGS = {
-  "max_ngram_diff": 19,
   "index": {
     "max_result_window": 10000,
     "queries": {
@@ -15,29 +14,126 @@ DEFAULT_SETTINGS = {
         "type": "custom",
         "tokenizer": "standard",
         "filter": ["lowercase", "asciifolding"]
-      },
-      "autocomplete": {
-        "filter": ["lowercase", "autocomplete_filter"],
-        "type": "custom",
-        "tokenizer": "standard"
-      }
-    },
-    "filter": {
-      "autocomplete_filter": {
-        "type": "ngram",
-        "min_gram": "1",
-        "max_gram": "20"
       }
     }
   },
   "number_of_replicas": "1"
 }
 
+# Type-ahead analysis. Only prefixes are indexed (edge n-grams), a handful
+# of terms per word instead of every substring; search analyzers cut input
+# to the longest indexed prefix so long queries still match.
+AUTOCOMPLETE_MIN_GRAM = 2
+AUTOCOMPLETE_MAX_GRAM = 20
+AUTOCOMPLETE_ANALYSIS = {
+  "char_filter": {
+    "digits_only": {
+      "type": "pattern_replace",
+      "pattern": "[^0-9]",
+      "replacement": ""
+    }
+  },
+  "filter": {
+    "autocomplete_prefix": {
+      "type": "edge_ngram",
+      "min_gram": AUTOCOMPLETE_MIN_GRAM,
+      "max_gram": AUTOCOMPLETE_MAX_GRAM
+    },
+    "autocomplete_truncate": {
+      "type": "truncate",
+      "length": AUTOCOMPLETE_MAX_GRAM
+    }
+  },
+  "analyzer": {
+    # Prefixes of each word, for names
+    "autocomplete": {
+      "type": "custom",
+      "tokenizer": "standard",
+      "filter": ["lowercase", "asciifolding", "autocomplete_prefix"]
+    },
+    "autocomplete_search": {
+      "type": "custom",
+      "tokenizer": "standard",
+      "filter": ["lowercase", "asciifolding", "autocomplete_truncate"]
+    },
+    # Prefixes of the whole value, for emails
+    "autocomplete_keyword": {
+      "type": "custom",
+      "tokenizer": "keyword",
+      "filter": ["lowercase", "autocomplete_prefix"]
+    },
+    "autocomplete_keyword_search": {
+      "type": "custom",
+      "tokenizer": "keyword",
+      "filter": ["lowercase", "autocomplete_truncate"]
+    },
+    # Prefixes of the digits, so "+357 99" finds "+35799123456"
+    "autocomplete_phone": {
+      "type": "custom",
+      "tokenizer": "keyword",
+      "char_filter": ["digits_only"],
+      "filter": ["autocomplete_prefix"]
+    },
+    "autocomplete_phone_search": {
+      "type": "custom",
+      "tokenizer": "keyword",
+      "char_filter": ["digits_only"],
+      "filter": ["autocomplete_truncate"]
+    }
+  }
+}
+
+# Type-ahead results per request
+AUTOCOMPLETE_SIZE = 10
+AUTOCOMPLETE_MAX_SIZE = 20
+
 # Connection settings
 MAX_RETRIES = 5
 REQUEST_TIMEOUT = 60
 BULK_SIZE = 500
 
+# Refresh policies for write operations
+REFRESH_TRUE = "true"
+REFRESH_FALSE = "false"
+REFRESH_WAIT_FOR = "wait_for"
+REFRESH_POLICIES = (REFRESH_TRUE, REFRESH_FALSE, REFRESH_WAIT_FOR)
+DEFAULT_REFRESH_POLICY = REFRESH_FALSE
+
+# Index settings applied while bulk loading
+BULK_LOAD_SETTINGS = {
+  "refresh_interval": "-1",
+  "number_of_replicas": "0"
+}
+
+# Point in time iteration settings
+SEARCH_PAGE_SIZE = 1000
+PIT_KEEP_ALIVE = "1m"
+
+# Search result cache settings
+SEARCH_CACHE_PREFIX = "es:search:"
+SEARCH_CACHE_TTL = 30  # seconds
+# Seconds responses aren't cached after a write that didn't refresh; covers
+# the default 1s refresh_interval
+SEARCH_CACHE_WRITE_HOLD = 2
+
+# Seconds between reindex task status checks
+REINDEX_POLL_INTERVAL = 5
+
+# Rebuilds copy documents changed during the copy again, at most this many times
+REINDEX_CATCHUP_PASSES = 3
+# Seconds subtracted from catch-up start times for clock skew between servers
+REINDEX_CATCHUP_MARGIN = 60
+
+# Indexing queue settings
+QUEUE_FLUSH_SIZE = BULK_SIZE
+QUEUE_FLUSH_INTERVAL = 1.0  # seconds
+QUEUE_STOP_TIMEOUT = 10  # seconds
+
+# Full reindex settings
+SYNC_WORKERS = 4
+SYNC_CHUNK_RETRIES = 3
+SYNC_PROGRESS_INTERVAL = 5  # seconds
+
 # Index prefixes
 CUSTOMER_INDEX = "customers"
 TRANSACTION_INDEX = "transactions"
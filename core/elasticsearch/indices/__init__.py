@@ -1,3 +1,4 @@
 from .customer import CustomerIndex
+from .transaction import TransactionIndex
 
-__all__ = ['CustomerIndex'] 
\ No newline at end of file
+__all__ = ['CustomerIndex', 'TransactionIndex'] 
@@ -1,11 +1,32 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, ClassVar
+from typing import Dict, Any, ClassVar, Iterator, NamedTuple, Optional, Tuple
 from django.conf import settings
-from core.elasticsearch.constants import DEFAULT_SETTINGS
+from django.core.exceptions import FieldDoesNotExist
+from core.elasticsearch.constants import DEFAULT_SETTINGS, BULK_SIZE
+
+class DocumentPlan(NamedTuple):
+  """Field-extraction plan for one index and model, resolved once."""
+  fields: Tuple[str, ...]
+  missing_fields: Tuple[str, ...]
+  relations: Tuple[str, ...]
+  only: Tuple[str, ...]
+
+# (index class, model) -> plan
+_plans: Dict[Tuple[type, type], DocumentPlan] = {}
 
 class BaseIndex:
   INDEX_NAME: ClassVar[str] = None
+  # Bump whenever settings or mapping change in a way that needs a rebuild
+  VERSION: ClassVar[int] = 1
   SETTINGS: ClassVar[Dict] = DEFAULT_SETTINGS
+  # One of "true", "false" or "wait_for"; None falls back to the client default
+  REFRESH_POLICY: ClassVar[Optional[str]] = None
+  # Attributes read from the instance; absent ones are indexed as None
+  DOCUMENT_FIELDS: ClassVar[Tuple[str, ...]] = ()
+  # Related object name -> attributes read from it
+  RELATED_FIELDS: ClassVar[Dict[str, Tuple[str, ...]]] = {}
+  # Date field set on every write; rebuilds copy documents changed during the copy by it
+  CHANGED_FIELD: ClassVar[Optional[str]] = 'updated_at'
 
   @classmethod
   def get_mapping(cls) -> Dict:
@@ -13,16 +34,96 @@ class BaseIndex:
 
   @classmethod
   def get_index_name(cls) -> str:
+    """Name of the alias all reads and writes go through."""
     if cls.INDEX_NAME is None:
         raise NotImplementedError("INDEX_NAME must be set")
     return f"{settings.ELASTICSEARCH_INDEX_PREFIX}_{cls.INDEX_NAME}"
 
+  @classmethod
+  def get_versioned_index_name(cls, version: Optional[int] = None) -> str:
+    """Name of the physical index backing the alias for a version."""
+    return f"{cls.get_index_name()}_v{cls.VERSION if version is None else version}"
+
   @classmethod
   def get_settings(cls) -> Dict:
     return cls.SETTINGS
 
+  @classmethod
+  def get_plan(cls, model: type) -> DocumentPlan:
+    """Resolve which declared fields and relations exist on a model."""
+    plan = _plans.get((cls, model))
+    if plan is not None:
+      return plan
+
+    fields, missing_fields, relations = [], [], []
+    only = [model._meta.pk.name]
+    for name in cls.DOCUMENT_FIELDS:
+      try:
+        field = model._meta.get_field(name)
+      except FieldDoesNotExist:
+        # Properties and other plain attributes are read but can't be deferred
+        (fields if hasattr(model, name) else missing_fields).append(name)
+        continue
+      fields.append(name)
+      if field.concrete:
+        only.append(name)
+
+    for relation, related_fields in cls.RELATED_FIELDS.items():
+      try:
+        field = model._meta.get_field(relation)
+      except FieldDoesNotExist:
+        continue
+      if not field.is_relation or field.many_to_many or field.one_to_many:
+        continue
+      relations.append(relation)
+      if field.concrete:
+        only.append(relation)
+      only.extend(
+        f"{relation}__{name}" for name in related_fields
+        if cls._is_concrete(field.related_model, name)
+      )
+
+    plan = DocumentPlan(tuple(fields), tuple(missing_fields), tuple(relations), tuple(only))
+    _plans[(cls, model)] = plan
+    return plan
+
+  @staticmethod
+  def _is_concrete(model: type, name: str) -> bool:
+    try:
+      return model._meta.get_field(name).concrete
+    except FieldDoesNotExist:
+      return False
+
+  @classmethod
+  def extract(cls, instance: Any) -> Dict[str, Any]:
+    """Read all declared fields and related fields of an instance."""
+    plan = cls.get_plan(type(instance))
+    values = {name: getattr(instance, name) for name in plan.fields}
+    values.update(dict.fromkeys(plan.missing_fields))
+    for relation, related_fields in cls.RELATED_FIELDS.items():
+      related = getattr(instance, relation, None) if relation in plan.relations else None
+      values[relation] = {
+        name: getattr(related, name, None) if related is not None else None
+        for name in related_fields
+      }
+    return values
+
+  @classmethod
+  def get_queryset(cls, queryset):
+    """Load only what get_document reads, joining related objects."""
+    plan = cls.get_plan(queryset.model)
+    if plan.relations:
+      queryset = queryset.select_related(*plan.relations)
+    return queryset.only(*plan.only)
+
+  @classmethod
+  def get_documents(cls, queryset, chunk_size: int = BULK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Convert a queryset to ES documents with one query per chunk."""
+    for instance in cls.get_queryset(queryset).iterator(chunk_size=chunk_size):
+      yield cls.get_document(instance)
+
   @classmethod
   @abstractmethod
   def get_document(cls, instance: Any) -> Dict[str, Any]:
     """Convert instance to ES document."""
-    pass 
\ No newline at end of file
+    pass
\ No newline at end of file
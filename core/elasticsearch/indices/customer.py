@@ -1,31 +1,83 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from django.conf import settings
+from core.elasticsearch.constants import DEFAULT_SETTINGS, AUTOCOMPLETE_ANALYSIS
 from .base import BaseIndex
 
+def _autocomplete_field(analyzer: str) -> Dict[str, Any]:
+  # Only whether a prefix occurs is needed, not frequencies or positions
+  return {
+    "type": "text",
+    "analyzer": analyzer,
+    "search_analyzer": f"{analyzer}_search",
+    "index_options": "docs",
+    "norms": False
+  }
+
 class CustomerIndex(BaseIndex):
   INDEX_NAME = 'customers'
+  # 2: autocomplete subfields
+  VERSION = 2
+  SETTINGS = {
+    **DEFAULT_SETTINGS,
+    "analysis": {
+      **AUTOCOMPLETE_ANALYSIS,
+      "analyzer": {
+        **DEFAULT_SETTINGS["analysis"]["analyzer"],
+        **AUTOCOMPLETE_ANALYSIS["analyzer"]
+      }
+    }
+  }
+  # Fields returned by autocomplete
+  AUTOCOMPLETE_SOURCE = ['id', 'email', 'first_name', 'last_name', 'phone', 'country', 'status']
+  DOCUMENT_FIELDS = (
+    'email',
+    'first_name',
+    'last_name',
+    'phone',
+    'country',
+    'status',
+    'kyc_status',
+    'agent_id',
+    'created_at',
+    'updated_at'
+  )
+  RELATED_FIELDS = {
+    'profile': ('date_of_birth', 'nationality', 'address')
+  }
   
   @classmethod
   def get_mapping(cls) -> Dict[str, Any]:
     return {
       "properties": {
         "id": {"type": "keyword"},
-        "email": {"type": "keyword"},
+        "email": {
+          "type": "keyword",
+          "fields": {
+            "autocomplete": _autocomplete_field("autocomplete_keyword")
+          }
+        },
         "first_name": {
           "type": "text",
           "analyzer": "custom_analyzer",
           "fields": {
-            "keyword": {"type": "keyword"}
+            "keyword": {"type": "keyword"},
+            "autocomplete": _autocomplete_field("autocomplete")
           }
         },
         "last_name": {
           "type": "text",
           "analyzer": "custom_analyzer",
           "fields": {
-            "keyword": {"type": "keyword"}
+            "keyword": {"type": "keyword"},
+            "autocomplete": _autocomplete_field("autocomplete")
+          }
+        },
+        "phone": {
+          "type": "keyword",
+          "fields": {
+            "autocomplete": _autocomplete_field("autocomplete_phone")
           }
         },
-        "phone": {"type": "keyword"},
         "country": {"type": "keyword"},
         "status": {"type": "keyword"},
         "kyc_status": {"type": "keyword"},
@@ -42,23 +94,67 @@ class CustomerIndex(BaseIndex):
       }
     }
   
+  @classmethod
+  def autocomplete_query(
+    cls,
+    text: str,
+    status: Optional[str] = None,
+    country: Optional[str] = None
+  ) -> Dict[str, Any]:
+    """
+    Type-ahead query over names, email and phone.
+
+    Every word has to prefix a first or last name, so "jo sm" finds John
+    Smith; email and phone match on the prefix of the whole value. Status
+    and country are filters: they don't score and their results are cached.
+    """
+    should: List[Dict[str, Any]] = [
+      {
+        "multi_match": {
+          "query": text,
+          "type": "cross_fields",
+          "operator": "and",
+          "fields": ["first_name.autocomplete", "last_name.autocomplete"]
+        }
+      },
+      {"match": {"email.autocomplete": {"query": text, "operator": "and"}}}
+    ]
+    if any(char.isdigit() for char in text):
+      should.append({"match": {"phone.autocomplete": text}})
+
+    filters: List[Dict[str, Any]] = []
+    if status:
+      filters.append({"term": {"status": status}})
+    if country:
+      filters.append({"term": {"country": country.upper()}})
+
+    return {
+      "bool": {
+        "should": should,
+        "minimum_should_match": 1,
+        "filter": filters
+      }
+    }
+
   @classmethod
   def get_document(cls, customer) -> Dict[str, Any]:
+    values = cls.extract(customer)
+    profile = values["profile"]
     return {
       "id": str(customer.id),
-      "email": customer.email,
-      "first_name": customer.first_name,
-      "last_name": customer.last_name,
-      "phone": customer.phone,
-      "country": customer.country,
-      "status": customer.status,
-      "kyc_status": getattr(customer, 'kyc_status', None),
-      "agent_id": getattr(customer, 'agent_id', None),
+      "email": values["email"],
+      "first_name": values["first_name"],
+      "last_name": values["last_name"],
+      "phone": values["phone"],
+      "country": values["country"],
+      "status": values["status"],
+      "kyc_status": values["kyc_status"],
+      "agent_id": values["agent_id"],
       "profile": {
-        "date_of_birth": customer.profile.date_of_birth.isoformat() if hasattr(customer, 'profile') and customer.profile.date_of_birth else None,
-        "nationality": customer.profile.nationality if hasattr(customer, 'profile') else None,
-        "address": customer.profile.address if hasattr(customer, 'profile') else None
+        "date_of_birth": profile["date_of_birth"].isoformat() if profile["date_of_birth"] else None,
+        "nationality": profile["nationality"],
+        "address": profile["address"]
       },
-      "created_at": customer.created_at.isoformat(),
-      "updated_at": customer.updated_at.isoformat()
-    } 
\ No newline at end of file
+      "created_at": values["created_at"].isoformat(),
+      "updated_at": values["updated_at"].isoformat()
+    }
\ No newline at end of file
@@ -0,0 +1,69 @@
+from typing import Dict, Any
+from .base import BaseIndex
+
+class TransactionIndex(BaseIndex):
+  INDEX_NAME = 'transactions'
+  # Deals are never changed once ingested
+  CHANGED_FIELD = 'created_at'
+  DOCUMENT_FIELDS = (
+    'server_id',
+    'ticket',
+    'order',
+    'login',
+    'time',
+    'symbol',
+    'action',
+    'entry',
+    'volume',
+    'price',
+    'commission',
+    'profit',
+    'comment',
+    'dealer',
+    'created_at'
+  )
+
+  @classmethod
+  def get_mapping(cls) -> Dict[str, Any]:
+    return {
+      "properties": {
+        "id": {"type": "keyword"},
+        "server_id": {"type": "short"},
+        "ticket": {"type": "long"},
+        "order": {"type": "long"},
+        "login": {"type": "long"},
+        "time": {"type": "date"},
+        "symbol": {"type": "keyword"},
+        "action": {"type": "short"},
+        "entry": {"type": "short"},
+        "volume": {"type": "long"},
+        "price": {"type": "double"},
+        "commission": {"type": "double"},
+        "profit": {"type": "double"},
+        "comment": {"type": "keyword"},
+        "dealer": {"type": "long"},
+        "created_at": {"type": "date"}
+      }
+    }
+
+  @classmethod
+  def get_document(cls, deal) -> Dict[str, Any]:
+    values = cls.extract(deal)
+    return {
+      "id": str(deal.id),
+      "server_id": values["server_id"],
+      "ticket": values["ticket"],
+      "order": values["order"],
+      "login": values["login"],
+      "time": values["time"].isoformat(),
+      "symbol": values["symbol"],
+      "action": values["action"],
+      "entry": values["entry"],
+      "volume": values["volume"],
+      "price": float(values["price"]),
+      "commission": float(values["commission"]),
+      "profit": float(values["profit"]),
+      "comment": values["comment"],
+      "dealer": values["dealer"],
+      "created_at": values["created_at"].isoformat()
+    }
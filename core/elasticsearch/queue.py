@@ -0,0 +1,175 @@
+"""
+In-process, batched indexing queue for Elasticsearch.
+
+Writers enqueue documents and return immediately; a background worker
+coalesces repeated operations on the same document and flushes them through
+the bulk API once the batch is large enough or the flush interval elapses.
+"""
+import asyncio
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+from .client import ESClient
+from .constants import QUEUE_FLUSH_INTERVAL, QUEUE_FLUSH_SIZE, QUEUE_STOP_TIMEOUT
+
+logger = logging.getLogger('elasticsearch')
+
+# Marker stored in place of a document for pending deletes
+DELETE = None
+
+class IndexingQueue:
+  def __init__(
+    self,
+    client: Optional[ESClient] = None,
+    flush_size: int = QUEUE_FLUSH_SIZE,
+    flush_interval: float = QUEUE_FLUSH_INTERVAL
+  ):
+    """
+    Initialize indexing queue
+
+    Args:
+      client: Client used for flushing. Defaults to a dedicated ESClient so
+        its connection is bound to the worker's event loop.
+      flush_size: Number of pending documents that triggers an early flush
+      flush_interval: Maximum seconds a document waits before being flushed
+    """
+    self._client = client
+    self.flush_size = flush_size
+    self.flush_interval = flush_interval
+
+    self._pending: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+    self._lock = threading.Lock()
+    self._wakeup = threading.Event()
+    self._stopping = threading.Event()
+    self._thread: Optional[threading.Thread] = None
+
+    self.stats = {
+      "enqueued": 0,
+      "coalesced": 0,
+      "flushed": 0,
+      "failed": 0,
+      "requests": 0
+    }
+
+  def enqueue(self, index: str, id: str, document: Dict[str, Any]) -> None:
+    """Schedule a document to be added or updated."""
+    self._put(index, id, document)
+
+  def enqueue_delete(self, index: str, id: str) -> None:
+    """Schedule a document to be deleted."""
+    self._put(index, id, DELETE)
+
+  def _put(self, index: str, id: str, document: Optional[Dict[str, Any]]) -> None:
+    key = (index, str(id))
+    with self._lock:
+      if key in self._pending:
+        self.stats["coalesced"] += 1
+      # Last write wins: a later update or delete replaces the pending one
+      self._pending[key] = document
+      self.stats["enqueued"] += 1
+      pending = len(self._pending)
+
+    self._ensure_worker()
+    if pending >= self.flush_size:
+      self._wakeup.set()
+
+  @property
+  def pending(self) -> int:
+    """Number of documents waiting to be flushed."""
+    with self._lock:
+      return len(self._pending)
+
+  def _ensure_worker(self) -> None:
+    if self._thread is not None and self._thread.is_alive():
+      return
+    with self._lock:
+      if self._thread is not None and self._thread.is_alive():
+        return
+      self._stopping.clear()
+      self._thread = threading.Thread(
+        target=self._run,
+        name="es-indexing-queue",
+        daemon=True
+      )
+      self._thread.start()
+
+  def _drain(self) -> Dict[Tuple[str, str], Optional[Dict[str, Any]]]:
+    with self._lock:
+      batch, self._pending = self._pending, {}
+    return batch
+
+  def _run(self) -> None:
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    if self._client is None:
+      self._client = ESClient()
+
+    try:
+      while not self._stopping.is_set():
+        self._wakeup.wait(self.flush_interval)
+        self._wakeup.clear()
+        self._flush_pending(loop)
+
+      # Flush whatever was enqueued while stopping
+      self._flush_pending(loop)
+    finally:
+      try:
+        loop.run_until_complete(self._client.close())
+      except Exception as e:
+        logger.error(f"Failed to close indexing queue client: {str(e)}")
+      loop.close()
+
+  def _flush_pending(self, loop: asyncio.AbstractEventLoop) -> None:
+    while True:
+      batch = self._drain()
+      if not batch:
+        return
+      try:
+        loop.run_until_complete(self._flush(batch))
+      except Exception as e:
+        self.stats["failed"] += len(batch)
+        logger.error(f"Indexing queue flush failed: {str(e)}")
+      if len(batch) < self.flush_size:
+        return
+
+  async def _flush(self, batch: Dict[Tuple[str, str], Optional[Dict[str, Any]]]) -> None:
+    """Send one coalesced batch, grouped per index and operation."""
+    upserts = defaultdict(list)
+    deletes = defaultdict(list)
+    for (index, id), document in batch.items():
+      if document is DELETE:
+        deletes[index].append(id)
+      else:
+        upserts[index].append({**document, "id": id})
+
+    for index, documents in upserts.items():
+      for start in range(0, len(documents), self.flush_size):
+        chunk = documents[start:start + self.flush_size]
+        self._record(await self._client.bulk_update(index, chunk), len(chunk))
+
+    for index, ids in deletes.items():
+      for start in range(0, len(ids), self.flush_size):
+        chunk = ids[start:start + self.flush_size]
+        self._record(await self._client.bulk_delete(index, chunk), len(chunk))
+
+  def _record(self, success: bool, count: int) -> None:
+    self.stats["requests"] += 1
+    if success:
+      self.stats["flushed"] += count
+    else:
+      self.stats["failed"] += count
+
+  def stop(self, timeout: float = QUEUE_STOP_TIMEOUT) -> None:
+    """Flush pending documents and stop the worker."""
+    if self._thread is None or not self._thread.is_alive():
+      return
+    self._stopping.set()
+    self._wakeup.set()
+    self._thread.join(timeout)
+
+# Create singleton instance
+indexing_queue = IndexingQueue()
+atexit.register(indexing_queue.stop)
@@ -0,0 +1,27 @@
+"""Request and backend latency metrics."""
+from .registry import Histogram, MetricsRegistry, registry
+from .timing import (
+  RequestTimings,
+  TimedProxy,
+  current_timings,
+  record,
+  timed,
+  track
+)
+from .constants import BACKEND_DB, BACKEND_REDIS, BACKEND_ES, BACKEND_MT5
+
+__all__ = [
+  "Histogram",
+  "MetricsRegistry",
+  "registry",
+  "RequestTimings",
+  "TimedProxy",
+  "current_timings",
+  "record",
+  "timed",
+  "track",
+  "BACKEND_DB",
+  "BACKEND_REDIS",
+  "BACKEND_ES",
+  "BACKEND_MT5"
+]
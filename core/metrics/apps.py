@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+class MetricsConfig(AppConfig):
+  name = 'core.metrics'
+  verbose_name = 'Metrics'
+
+  def ready(self):
+    from .timing import install_db_instrumentation
+    # Connections are created lazily per thread, after apps are ready
+    connection_created.connect(install_db_instrumentation, dispatch_uid='metrics_db_instrumentation')
@@ -0,0 +1,19 @@
+# Backends whose calls are timed per request, in Server-Timing order
+BACKEND_DB = 'db'
+BACKEND_REDIS = 'redis'
+BACKEND_ES = 'es'
+BACKEND_MT5 = 'mt5'
+BACKENDS = (BACKEND_DB, BACKEND_REDIS, BACKEND_ES, BACKEND_MT5)
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (
+  0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+  0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Label values for requests that keep label cardinality bounded
+UNMATCHED_ROUTE = 'unmatched'
+OTHER_METHOD = 'other'
+HTTP_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
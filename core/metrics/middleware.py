@@ -0,0 +1,74 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from .constants import HTTP_METHODS, OTHER_METHOD, UNMATCHED_ROUTE
+from .registry import registry
+from .timing import RequestTimings, begin_request, end_request, current_timings
+
+request_duration = registry.histogram(
+  'http_request_duration_seconds',
+  'Duration of HTTP requests.',
+  ('method', 'route', 'status')
+)
+
+request_backend_duration = registry.histogram(
+  'http_request_backend_duration_seconds',
+  'Time a request spent in a backend, for requests that used it.',
+  ('backend', 'route')
+)
+
+class MetricsMiddleware:
+  """
+  Times each request and what it spent in each backend.
+
+  Keep it first in MIDDLEWARE so the other middleware are timed too.
+  """
+  sync_capable = True
+  async_capable = True
+
+  def __init__(self, get_response):
+    self.get_response = get_response
+    self.server_timing = getattr(settings, 'METRICS_SERVER_TIMING', None)
+    if self.server_timing is None:
+      self.server_timing = settings.DEBUG
+    if iscoroutinefunction(get_response):
+      markcoroutinefunction(self)
+
+  def __call__(self, request):
+    if iscoroutinefunction(self):
+      return self.__acall__(request)
+    token = begin_request()
+    try:
+      response = self.get_response(request)
+      self.finish(request, response, current_timings())
+    finally:
+      end_request(token)
+    return response
+
+  async def __acall__(self, request):
+    token = begin_request()
+    try:
+      response = await self.get_response(request)
+      self.finish(request, response, current_timings())
+    finally:
+      end_request(token)
+    return response
+
+  def finish(self, request, response, timings: RequestTimings) -> None:
+    elapsed = timings.elapsed
+    route = self.get_route(request)
+    method = request.method if request.method in HTTP_METHODS else OTHER_METHOD
+    # Status classes, not codes, to keep the number of series small
+    request_duration.observe(elapsed, method, route, f"{response.status_code // 100}xx")
+    for backend, count in timings.counts.items():
+      if count:
+        request_backend_duration.observe(timings.durations[backend], backend, route)
+    if self.server_timing:
+      response['Server-Timing'] = timings.server_timing(elapsed)
+
+  @staticmethod
+  def get_route(request) -> str:
+    """URL pattern the request matched, never the raw path."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.route:
+      return UNMATCHED_ROUTE
+    return f"/{match.route}"
@@ -0,0 +1,124 @@
+"""
+Process-local metrics in the Prometheus text exposition format.
+
+Only histograms are needed, so they are implemented here rather than
+pulling in prometheus_client. Each worker process keeps its own registry;
+Prometheus scrapes every worker and sums the series.
+"""
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .constants import LATENCY_BUCKETS
+
+def _escape(value: str) -> str:
+  return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_bound(bound: float) -> str:
+  return repr(float(bound))
+
+class Histogram:
+  def __init__(
+    self,
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Iterable[float] = LATENCY_BUCKETS
+  ):
+    """
+    Initialize histogram
+
+    Args:
+      name: Metric name, e.g. http_request_duration_seconds
+      documentation: HELP text
+      labelnames: Names of the label values passed to observe, in order
+      buckets: Upper bounds of the buckets; +Inf is added
+    """
+    self.name = name
+    self.documentation = documentation
+    self.labelnames = tuple(labelnames)
+    self.buckets = tuple(sorted(buckets))
+    # Label values -> [per-bucket counts (last one is +Inf), sum]
+    self._series: Dict[Tuple[str, ...], list] = {}
+    self._lock = threading.Lock()
+
+  def observe(self, value: float, *labels: str) -> None:
+    if len(labels) != len(self.labelnames):
+      raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+    # Bounds are inclusive (le), so an exact match belongs to its own bucket
+    index = bisect_left(self.buckets, value)
+    with self._lock:
+      series = self._series.get(labels)
+      if series is None:
+        series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+      series[0][index] += 1
+      series[1] += value
+
+  def get(self, *labels: str) -> Optional[Tuple[int, float]]:
+    """Count and sum observed for label values, None if nothing was."""
+    with self._lock:
+      series = self._series.get(labels)
+      if series is None:
+        return None
+      return sum(series[0]), series[1]
+
+  def clear(self) -> None:
+    with self._lock:
+      self._series.clear()
+
+  def render(self) -> List[str]:
+    with self._lock:
+      series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+
+    lines = [
+      f"# HELP {self.name} {self.documentation}",
+      f"# TYPE {self.name} histogram"
+    ]
+    bounds = [_format_bound(bound) for bound in self.buckets] + ['+Inf']
+    for labels, counts, total in sorted(series):
+      pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+      cumulative = 0
+      for bound, count in zip(bounds, counts):
+        cumulative += count
+        bucket_labels = ','.join(pairs + [f'le="{bound}"'])
+        lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+      suffix = f"{{{','.join(pairs)}}}" if pairs else ''
+      lines.append(f"{self.name}_sum{suffix} {total}")
+      lines.append(f"{self.name}_count{suffix} {cumulative}")
+    return lines
+
+class MetricsRegistry:
+  def __init__(self):
+    self._metrics: Dict[str, Histogram] = {}
+    self._lock = threading.Lock()
+
+  def histogram(
+    self,
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Iterable[float] = LATENCY_BUCKETS
+  ) -> Histogram:
+    """Register a histogram, or return the one already registered under name."""
+    with self._lock:
+      metric = self._metrics.get(name)
+      if metric is None:
+        metric = self._metrics[name] = Histogram(name, documentation, labelnames, buckets)
+      return metric
+
+  def clear(self) -> None:
+    """Forget every observation, keeping the metrics registered."""
+    with self._lock:
+      metrics = list(self._metrics.values())
+    for metric in metrics:
+      metric.clear()
+
+  def render(self) -> str:
+    with self._lock:
+      metrics = list(self._metrics.values())
+    lines = []
+    for metric in metrics:
+      lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
@@ -0,0 +1,138 @@
+"""
+Time spent in backends, per call and per request.
+
+Every timed call is observed in backend_call_duration_seconds. While a
+request is being handled, MetricsMiddleware also keeps a RequestTimings in a
+context variable, so the calls add up to what the request spent in each
+backend. The context follows the request into tasks and sync_to_async
+threads; work handed to a plain thread pool is not attributed to it.
+
+Calls nested in another backend's call are counted for both, e.g. an ES
+search answered from the Redis search cache.
+"""
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from asgiref.sync import iscoroutinefunction
+
+from .constants import BACKENDS, BACKEND_DB
+from .registry import registry
+
+backend_call_duration = registry.histogram(
+  'backend_call_duration_seconds',
+  'Duration of calls to DB, Redis, Elasticsearch and MT5.',
+  ('backend', 'operation')
+)
+
+class RequestTimings:
+  """Calls and seconds per backend for one request."""
+  __slots__ = ('started', 'counts', 'durations')
+
+  def __init__(self):
+    self.started = time.perf_counter()
+    self.counts: Dict[str, int] = dict.fromkeys(BACKENDS, 0)
+    self.durations: Dict[str, float] = dict.fromkeys(BACKENDS, 0.0)
+
+  def add(self, backend: str, elapsed: float) -> None:
+    self.counts[backend] = self.counts.get(backend, 0) + 1
+    self.durations[backend] = self.durations.get(backend, 0.0) + elapsed
+
+  @property
+  def elapsed(self) -> float:
+    return time.perf_counter() - self.started
+
+  def server_timing(self, total: Optional[float] = None) -> str:
+    """Server-Timing header value, in milliseconds."""
+    entries = [
+      f'{backend};dur={self.durations[backend] * 1000:.2f};desc="{count} calls"'
+      for backend, count in self.counts.items()
+      if count
+    ]
+    total = self.elapsed if total is None else total
+    entries.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(entries)
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+
+def begin_request() -> Token:
+  return _request_timings.set(RequestTimings())
+
+def end_request(token: Token) -> None:
+  _request_timings.reset(token)
+
+def current_timings() -> Optional[RequestTimings]:
+  return _request_timings.get()
+
+def record(backend: str, operation: str, elapsed: float) -> None:
+  backend_call_duration.observe(elapsed, backend, operation)
+  timings = _request_timings.get()
+  if timings is not None:
+    timings.add(backend, elapsed)
+
+@contextmanager
+def track(backend: str, operation: str) -> Iterator[None]:
+  started = time.perf_counter()
+  try:
+    yield
+  finally:
+    record(backend, operation, time.perf_counter() - started)
+
+def timed(backend: str, operation: Optional[str] = None) -> Callable:
+  """Decorate a function or coroutine function so its calls are recorded."""
+  def decorator(func: Callable) -> Callable:
+    name = operation or func.__name__
+
+    if iscoroutinefunction(func):
+      @functools.wraps(func)
+      async def async_wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+          return await func(*args, **kwargs)
+        finally:
+          record(backend, name, time.perf_counter() - started)
+      return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+      started = time.perf_counter()
+      try:
+        return func(*args, **kwargs)
+      finally:
+        record(backend, name, time.perf_counter() - started)
+    return wrapper
+  return decorator
+
+class TimedProxy:
+  """Records every method call made through it on the wrapped object."""
+  __slots__ = ('_target', '_backend')
+
+  def __init__(self, target: Any, backend: str):
+    self._target = target
+    self._backend = backend
+
+  def __getattr__(self, name: str) -> Any:
+    value = getattr(self._target, name)
+    if not inspect.isroutine(value):
+      return value
+    return timed(self._backend, name)(value)
+
+  def __repr__(self) -> str:
+    return f"TimedProxy({self._target!r}, backend={self._backend!r})"
+
+def db_execute_wrapper(execute, sql, params, many, context):
+  """Django execute wrapper; operation is the SQL verb."""
+  started = time.perf_counter()
+  try:
+    return execute(sql, params, many, context)
+  finally:
+    operation = sql.lstrip().split(None, 1)[0].lower() if sql else 'unknown'
+    record(BACKEND_DB, operation, time.perf_counter() - started)
+
+def install_db_instrumentation(sender, connection, **kwargs) -> None:
+  """connection_created receiver: time every query run on the connection."""
+  if db_execute_wrapper not in connection.execute_wrappers:
+    connection.execute_wrappers.insert(0, db_execute_wrapper)
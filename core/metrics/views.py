@@ -0,0 +1,18 @@
+from hmac import compare_digest
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from .constants import PROMETHEUS_CONTENT_TYPE
+from .registry import registry
+
+def metrics(request):
+  """Prometheus scrape endpoint, requiring METRICS_TOKEN as a bearer token."""
+  token = getattr(settings, 'METRICS_TOKEN', None)
+  if not token:
+    # Off until a token is configured
+    raise Http404
+  if not compare_digest(
+    request.headers.get('Authorization', '').encode(),
+    f"Bearer {token}".encode()
+  ):
+    return HttpResponse('Unauthorized', status=401)
+  return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,332 @@
+"""
+In-memory store of MT5 accounts, kept current from the pump.
+
+The user sink copies every updated account into an AccountStore per server,
+so lookups by login, group or email are dict reads instead of manager API
+round trips. Changed accounts are written to a Redis hash once a second,
+which lets processes without an MT5 connection read the same data through
+AccountSnapshot.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from core.redis import RedisClient
+from core.redis.constants import MT5_ACCOUNT_PREFIX
+from .constants import ACCOUNT_SNAPSHOT_INTERVAL, EVENT_STOP_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# (MT5 attribute, field name)
+ACCOUNT_FIELDS = (
+  ('Login', 'login'),
+  ('Group', 'group'),
+  ('FirstName', 'first_name'),
+  ('LastName', 'last_name'),
+  ('EMail', 'email'),
+  ('Country', 'country'),
+  ('Leverage', 'leverage'),
+  ('Balance', 'balance'),
+  ('Credit', 'credit'),
+  ('Agent', 'agent'),
+  ('Rights', 'rights'),
+  ('Registration', 'registration'),
+  ('LastAccess', 'last_access'),
+  ('Comment', 'comment'),
+)
+
+ACCOUNT_COLUMNS = tuple(name for _, name in ACCOUNT_FIELDS)
+
+_read_user = attrgetter(*(attr for attr, _ in ACCOUNT_FIELDS))
+
+class MT5Account:
+  """One account, detached from the MT5Manager object it was read from."""
+  __slots__ = ACCOUNT_COLUMNS
+
+  def __init__(self, *values):
+    for name, value in zip(ACCOUNT_COLUMNS, values):
+      setattr(self, name, value)
+
+  @classmethod
+  def from_user(cls, user: Any) -> 'MT5Account':
+    return cls(*_read_user(user))
+
+  @classmethod
+  def from_dict(cls, data: Dict[str, Any]) -> 'MT5Account':
+    return cls(*(data.get(name) for name in ACCOUNT_COLUMNS))
+
+  def as_dict(self) -> Dict[str, Any]:
+    return {name: getattr(self, name) for name in ACCOUNT_COLUMNS}
+
+  def __repr__(self) -> str:
+    return f"MT5Account(login={self.login}, group={self.group!r})"
+
+def _email_key(email: Optional[str]) -> Optional[str]:
+  return email.strip().lower() if email else None
+
+class AccountSnapshot:
+  """Accounts of one server as last written to Redis by the process holding the pump."""
+
+  def __init__(self, server_id: int, client: Optional[RedisClient] = None):
+    """
+    Initialize account snapshot
+
+    Args:
+      server_id: MT5 server the accounts belong to
+      client: Redis client, defaults to a new one; it is bound to the event
+        loop it is first used on
+    """
+    self.server_id = server_id
+    self.key = f"{MT5_ACCOUNT_PREFIX}{server_id}"
+    self.client = client or RedisClient(near_cache=False)
+
+  async def get(self, login: int) -> Optional[MT5Account]:
+    return (await self.get_many([login])).get(login)
+
+  async def get_many(self, logins: Iterable[int]) -> Dict[int, MT5Account]:
+    await self.client.ensure_connection()
+    values = await self.client.hash_get(self.key, list(logins))
+    return {int(login): MT5Account.from_dict(data) for login, data in values.items()}
+
+  async def all(self) -> Dict[int, MT5Account]:
+    await self.client.ensure_connection()
+    values = await self.client.hash_get_all(self.key)
+    return {int(login): MT5Account.from_dict(data) for login, data in values.items()}
+
+  async def write(self, accounts: Iterable[MT5Account], deleted: Iterable[int] = ()) -> None:
+    await self.client.ensure_connection()
+    await self.client.hash_update(
+      self.key,
+      {account.login: account.as_dict() for account in accounts},
+      delete=list(deleted)
+    )
+
+  async def replace(self, accounts: Iterable[MT5Account]) -> None:
+    await self.client.ensure_connection()
+    await self.client.hash_replace(
+      self.key,
+      {account.login: account.as_dict() for account in accounts}
+    )
+
+class AccountStore:
+  def __init__(
+    self,
+    server_id: int,
+    snapshot: Optional[AccountSnapshot] = None,
+    snapshot_interval: float = ACCOUNT_SNAPSHOT_INTERVAL
+  ):
+    """
+    Initialize account store
+
+    Args:
+      server_id: MT5 server the accounts belong to
+      snapshot: Where changed accounts are written, defaults to Redis; the
+        writer thread creates it so its client is bound to the thread's loop
+      snapshot_interval: Seconds between snapshot writes
+    """
+    self.server_id = server_id
+    self.snapshot_interval = snapshot_interval
+    self._snapshot = snapshot
+    self._accounts: Dict[int, MT5Account] = {}
+    self._by_group: Dict[str, Set[int]] = defaultdict(set)
+    self._by_email: Dict[str, Set[int]] = defaultdict(set)
+    self._lock = threading.Lock()
+
+    # Changes not yet written to the snapshot
+    self._changed: Set[int] = set()
+    self._deleted: Set[int] = set()
+    self._replace = False
+    # Logins the pump touched since begin_load(), newer than the list being loaded
+    self._loading: Optional[Set[int]] = None
+    self._stopping = threading.Event()
+    self._thread: Optional[threading.Thread] = None
+
+    self.updates = 0
+    self.deletes = 0
+    self.snapshot_failures = 0
+
+  def __len__(self) -> int:
+    return len(self._accounts)
+
+  def __contains__(self, login: int) -> bool:
+    return login in self._accounts
+
+  def _index(self, account: MT5Account) -> None:
+    self._by_group[account.group].add(account.login)
+    email = _email_key(account.email)
+    if email:
+      self._by_email[email].add(account.login)
+
+  def _unindex(self, account: MT5Account) -> None:
+    for index, key in ((self._by_group, account.group), (self._by_email, _email_key(account.email))):
+      logins = index.get(key)
+      if logins is None:
+        continue
+      logins.discard(account.login)
+      if not logins:
+        del index[key]
+
+  def update(self, user: Any) -> MT5Account:
+    """Store an MT5 user; called on the pump thread."""
+    account = MT5Account.from_user(user)
+    with self._lock:
+      previous = self._accounts.get(account.login)
+      if previous is not None:
+        self._unindex(previous)
+      self._accounts[account.login] = account
+      self._index(account)
+      self._changed.add(account.login)
+      self._deleted.discard(account.login)
+      if self._loading is not None:
+        self._loading.add(account.login)
+      self.updates += 1
+    return account
+
+  def delete(self, login: int) -> Optional[MT5Account]:
+    with self._lock:
+      account = self._accounts.pop(login, None)
+      if account is not None:
+        self._unindex(account)
+      self._changed.discard(login)
+      self._deleted.add(login)
+      if self._loading is not None:
+        self._loading.add(login)
+      self.deletes += 1
+    return account
+
+  def begin_load(self) -> None:
+    """Mark the start of a full list request, so load() keeps newer pump updates."""
+    with self._lock:
+      self._loading = set()
+
+  def cancel_load(self) -> None:
+    """Stop tracking pump updates for a list request that failed."""
+    with self._lock:
+      self._loading = None
+
+  def load(self, users: Iterable[Any]) -> int:
+    """Replace every account, e.g. with the server's full list on connect."""
+    loaded = [MT5Account.from_user(user) for user in users]
+    with self._lock:
+      touched, self._loading = self._loading or set(), None
+      accounts = {account.login: account for account in loaded if account.login not in touched}
+      # Updated or deleted since the list was requested: the pump is newer
+      for login in touched:
+        if login in self._accounts:
+          accounts[login] = self._accounts[login]
+      self._accounts = accounts
+      self._by_group = defaultdict(set)
+      self._by_email = defaultdict(set)
+      for account in accounts.values():
+        self._index(account)
+      self._changed.clear()
+      self._deleted.clear()
+      self._replace = True
+    return len(accounts)
+
+  def get(self, login: int) -> Optional[MT5Account]:
+    return self._accounts.get(login)
+
+  def get_many(self, logins: Iterable[int]) -> Dict[int, MT5Account]:
+    accounts = self._accounts
+    return {login: accounts[login] for login in logins if login in accounts}
+
+  def by_group(self, group: str) -> List[MT5Account]:
+    with self._lock:
+      return [self._accounts[login] for login in self._by_group.get(group, ())]
+
+  def by_email(self, email: str) -> List[MT5Account]:
+    """Accounts registered with an email, e.g. all accounts of a customer."""
+    with self._lock:
+      return [self._accounts[login] for login in self._by_email.get(_email_key(email), ())]
+
+  def groups(self) -> Dict[str, int]:
+    """Number of accounts per group."""
+    with self._lock:
+      return {group: len(logins) for group, logins in self._by_group.items()}
+
+  def start(self) -> None:
+    """Start writing changes to the snapshot in the background."""
+    with self._lock:
+      if self._thread is not None and self._thread.is_alive():
+        return
+      self._stopping.clear()
+      self._thread = threading.Thread(
+        target=self._run,
+        name=f"mt5-accounts-{self.server_id}",
+        daemon=True
+      )
+      self._thread.start()
+
+  def _run(self) -> None:
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    if self._snapshot is None:
+      self._snapshot = AccountSnapshot(self.server_id)
+    try:
+      while not self._stopping.wait(self.snapshot_interval):
+        loop.run_until_complete(self.write_snapshot())
+      loop.run_until_complete(self.write_snapshot())
+    finally:
+      try:
+        loop.run_until_complete(self._snapshot.client.close())
+      except Exception as e:
+        logger.error(f"Failed to close account snapshot client: {str(e)}")
+      loop.close()
+
+  async def write_snapshot(self) -> None:
+    """Write what changed since the last call."""
+    with self._lock:
+      replace = self._replace
+      if replace:
+        changed = list(self._accounts.values())
+        deleted = []
+      else:
+        changed = [self._accounts[login] for login in self._changed]
+        deleted = list(self._deleted)
+      self._replace = False
+      self._changed = set()
+      self._deleted = set()
+
+    if not (replace or changed or deleted):
+      return
+    try:
+      if replace:
+        await self._snapshot.replace(changed)
+      else:
+        await self._snapshot.write(changed, deleted)
+    except Exception as e:
+      self.snapshot_failures += 1
+      logger.error(f"Failed to write MT5 account snapshot for server {self.server_id}: {str(e)}")
+      # Put the changes back unless newer ones superseded them
+      with self._lock:
+        if replace:
+          self._replace = True
+        else:
+          self._changed.update(
+            account.login for account in changed if account.login not in self._deleted
+          )
+          self._deleted.update(login for login in deleted if login not in self._accounts)
+
+  def stop(self, timeout: float = EVENT_STOP_TIMEOUT) -> None:
+    """Write pending changes and stop the writer."""
+    with self._lock:
+      thread, self._thread = self._thread, None
+    if thread is None or not thread.is_alive():
+      return
+    self._stopping.set()
+    thread.join(timeout)
+
+  def stats(self) -> Dict[str, Any]:
+    with self._lock:
+      return {
+        'accounts': len(self._accounts),
+        'groups': len(self._by_group),
+        'updates': self.updates,
+        'deletes': self.deletes,
+        'pending': len(self._changed) + len(self._deleted),
+        'snapshot_failures': self.snapshot_failures
+      }
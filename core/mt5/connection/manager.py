@@ -1,21 +1,32 @@
-from typing import Optional, Dict, List
+import threading
+from typing import Optional
 import MT5Manager
-from ..constants import MT5ServerConfig
+from core.metrics.timing import TimedProxy
+from core.metrics.constants import BACKEND_MT5
+from ..constants import MT5ServerConfig, MT5_CONNECT_TIMEOUT
 from ..exceptions import MT5ConnectionError
 from ..sinks import MT5UserSink, MT5DealSink
 
 class MT5ConnectionManager:
-  def __init__(self, server_config: MT5ServerConfig, data_folder: Optional[str] = None):
+  def __init__(self, server_config: MT5ServerConfig, data_folder: Optional[str] = None, pump: bool = True):
     """
     Initialize MT5 Connection Manager
     
     Args:
       server_config: Server configuration containing connection details
       data_folder: Optional custom data folder path for MT5Manager
+      pump: Receive the full pump; connections used only for requests don't need it
     """
     self.server_config = server_config
+    self.pump = pump
     self._manager = MT5Manager.ManagerAPI(data_folder) if data_folder else MT5Manager.ManagerAPI()
+    # Handed to callers so their requests are timed; sinks and pings use _manager
+    self._timed_manager = TimedProxy(self._manager, BACKEND_MT5)
     self._connected = False
+    # Guards connect, disconnect and reconnect against the heartbeat
+    self.lock = threading.RLock()
+    self.connected_ip: Optional[str] = None
+    self.last_error: Optional[str] = None
     self._user_sink: Optional[MT5UserSink] = None
     self._deal_sink: Optional[MT5DealSink] = None
         
@@ -23,43 +34,87 @@ class MT5ConnectionManager:
     """
     Attempts to connect to MT5 server using the configured IPs with failover
     """
-    if self._connected:
-      return True
-        
-    for ip in self.server_config.ips:
-      try:
-        connection_result = self._manager.Connect(
-          ip,
-          self.server_config.username,
-          self.server_config.manager_password,
-          MT5Manager.ManagerAPI.EnPumpModes.PUMP_MODE_FULL,
-          120000  # 2 minute timeout
-        )
-        
-        if connection_result:
-          self._connected = True
-          return True
-              
-      except Exception as e:
-        last_error = MT5Manager.LastError()
-        continue
-            
-    raise MT5ConnectionError(
-      f"Failed to connect to all IPs for server {self.server_config.name}. "
-      f"Last error: {MT5Manager.LastError()}"
-    )
+    with self.lock:
+      if self._connected:
+        return True
+
+      # Without the pump, requests still go straight to the server
+      pump_mode = MT5Manager.ManagerAPI.EnPumpModes.PUMP_MODE_FULL if self.pump else 0
+      for ip in self.server_config.ips:
+        try:
+          connection_result = self._manager.Connect(
+            ip,
+            self.server_config.username,
+            self.server_config.manager_password,
+            pump_mode,
+            MT5_CONNECT_TIMEOUT
+          )
+          
+          if connection_result:
+            self._connected = True
+            self.connected_ip = ip
+            self.last_error = None
+            self._resubscribe()
+            return True
+                
+        except Exception as e:
+          self.last_error = str(MT5Manager.LastError())
+          continue
+      
+      self.last_error = str(MT5Manager.LastError())
+      raise MT5ConnectionError(
+        f"Failed to connect to all IPs for server {self.server_config.name}. "
+        f"Last error: {self.last_error}"
+      )
+
+  def _resubscribe(self):
+    """Subscribe sinks set up before a reconnect again"""
+    if self._user_sink:
+      self._manager.UserSubscribe(self._user_sink)
+    if self._deal_sink:
+      self._manager.DealSubscribe(self._deal_sink)
       
   def disconnect(self):
     """
     Safely disconnect from MT5 server
     """
-    if self._connected:
-      if self._user_sink:
-        self._manager.UserUnsubscribe(self._user_sink)
-      if self._deal_sink:
-        self._manager.DealUnsubscribe(self._deal_sink)
-      self._manager.Disconnect()
-      self._connected = False
+    with self.lock:
+      if self._connected:
+        if self._user_sink:
+          self._manager.UserUnsubscribe(self._user_sink)
+        if self._deal_sink:
+          self._manager.DealUnsubscribe(self._deal_sink)
+        self._manager.Disconnect()
+        self._connected = False
+        self.connected_ip = None
+
+  def reconnect(self) -> bool:
+    """Drop a broken connection and connect again, trying every IP"""
+    with self.lock:
+      if self._connected:
+        try:
+          self._manager.Disconnect()
+        except Exception:
+          pass
+        self._connected = False
+        self.connected_ip = None
+      return self.connect()
+
+  def ping(self) -> bool:
+    """Check the connection with a cheap round trip to the server"""
+    if not self._connected:
+      return False
+    try:
+      if self._manager.TimeServer():
+        return True
+      self.last_error = str(MT5Manager.LastError())
+    except Exception as e:
+      self.last_error = str(e)
+    return False
+
+  @property
+  def connected(self) -> bool:
+    return self._connected
           
   @property
   def manager(self) -> MT5Manager.ManagerAPI:
@@ -71,7 +126,7 @@ class MT5ConnectionManager:
     """
     if not self._connected:
       raise MT5ConnectionError("Not connected to MT5 server")
-    return self._manager
+    return self._timed_manager
       
   def __enter__(self):
     """Context manager entry"""
@@ -83,82 +138,27 @@ class MT5ConnectionManager:
     self.disconnect()
     
   def setup_user_sink(self, sink: MT5UserSink) -> bool:
-    """Setup user event sink"""
-    if not self._connected:
-      raise MT5ConnectionError("Must be connected to setup sinks")
-    
-    if self._user_sink:
-      self._manager.UserUnsubscribe(self._user_sink)
-    
-    self._user_sink = sink
-    return self._manager.UserSubscribe(sink)
+    """Setup user event sink, subscribed when the connection is (re)established"""
+    with self.lock:
+      if not self._connected:
+        self._user_sink = sink
+        return False
+
+      if self._user_sink:
+        self._manager.UserUnsubscribe(self._user_sink)
+      
+      self._user_sink = sink
+      return self._manager.UserSubscribe(sink)
     
   def setup_deal_sink(self, sink: MT5DealSink) -> bool:
-    """Setup deal event sink"""
-    if not self._connected:
-      raise MT5ConnectionError("Must be connected to setup sinks")
-    
-    if self._deal_sink:
-      self._manager.DealUnsubscribe(self._deal_sink)
-    
-    self._deal_sink = sink
-    return self._manager.DealSubscribe(sink)
+    """Setup deal event sink, subscribed when the connection is (re)established"""
+    with self.lock:
+      if not self._connected:
+        self._deal_sink = sink
+        return False
 
-class MT5ConnectionPool:
-  def __init__(self, server_configs: List[MT5ServerConfig], data_folder: Optional[str] = None):
-    """
-    Initialize MT5 Connection Pool
-    
-    Args:
-      server_configs: List of server configurations
-      data_folder: Optional custom data folder path for MT5Manager
-    """
-    self.connections: Dict[str, MT5ConnectionManager] = {}
-    self.data_folder = data_folder
-    
-    for config in server_configs:
-      self.connections[config.name] = MT5ConnectionManager(config, data_folder)
-  
-  def connect_all(self) -> Dict[str, bool]:
-    """
-    Attempts to connect to all configured MT5 servers
-    Returns dict of server names and their connection status
-    """
-    results = {}
-    for name, connection in self.connections.items():
-      try:
-        connection.connect()
-        results[name] = True
-      except MT5ConnectionError as e:
-        results[name] = False
-    return results
-  
-  def disconnect_all(self):
-    """
-    Disconnects from all MT5 servers
-    """
-    for connection in self.connections.values():
-      connection.disconnect()
-  
-  def get_connection(self, server_name: str) -> MT5ConnectionManager:
-    """
-    Get connection manager for specific server
-    
-    Args:
-      server_name: Name of the server to get connection for
-        
-    Raises:
-      KeyError: If server name doesn't exist
-    """
-    if server_name not in self.connections:
-      raise KeyError(f"No connection found for server: {server_name}")
-    return self.connections[server_name]
-  
-  def __enter__(self):
-    """Context manager entry"""
-    self.connect_all()
-    return self
-  
-  def __exit__(self, exc_type, exc_val, exc_tb):
-    """Context manager exit"""
-    self.disconnect_all()
+      if self._deal_sink:
+        self._manager.DealUnsubscribe(self._deal_sink)
+      
+      self._deal_sink = sink
+      return self._manager.DealSubscribe(sink)
@@ -0,0 +1,285 @@
+"""
+Pool of MT5 manager connections to one server.
+
+A ManagerAPI instance can only serve one call at a time, so a single
+connection per server serialized every account query and balance operation.
+The pool keeps several connections; callers check one out for the duration
+of their calls and get exclusive use of it. Only the primary connection
+receives the pump and carries the sinks, the others only send requests.
+
+A heartbeat thread pings idle connections one at a time and schedules
+broken ones for reconnection across the server's IPs, backing off
+exponentially while the server is down.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ..constants import (
+  MT5ServerConfig,
+  MT5_POOL_SIZE,
+  MT5_CHECKOUT_TIMEOUT,
+  MT5_HEARTBEAT_INTERVAL,
+  MT5_RECONNECT_BACKOFF,
+  MT5_RECONNECT_BACKOFF_MAX
+)
+from ..exceptions import MT5ConnectionError, MT5PoolExhausted
+
+logger = logging.getLogger(__name__)
+
+class PooledConnection:
+  """A pool slot: one connection and its reconnect schedule."""
+  __slots__ = ('connection', 'failures', 'retry_at', 'checkouts')
+
+  def __init__(self, connection: Any):
+    self.connection = connection
+    self.failures = 0
+    self.retry_at = 0.0
+    self.checkouts = 0
+
+class MT5ConnectionPool:
+  def __init__(
+    self,
+    server_config: MT5ServerConfig,
+    size: int = MT5_POOL_SIZE,
+    data_folder: Optional[str] = None,
+    checkout_timeout: float = MT5_CHECKOUT_TIMEOUT,
+    heartbeat_interval: float = MT5_HEARTBEAT_INTERVAL,
+    connection_factory: Optional[Callable[..., Any]] = None
+  ):
+    """
+    Initialize MT5 Connection Pool
+
+    Args:
+      server_config: Server the connections are made to
+      size: Number of connections, the first one receives the pump
+      data_folder: Optional custom data folder path for MT5Manager
+      checkout_timeout: Seconds to wait for a free connection before giving up
+      heartbeat_interval: Seconds between health checks of idle connections
+      connection_factory: Builds a connection from (server_config, data_folder, pump),
+        defaults to MT5ConnectionManager
+    """
+    if size < 1:
+      raise ValueError("Pool size must be at least 1")
+    if connection_factory is None:
+      from .manager import MT5ConnectionManager
+      connection_factory = MT5ConnectionManager
+
+    self.server_config = server_config
+    self.size = size
+    self.checkout_timeout = checkout_timeout
+    self.heartbeat_interval = heartbeat_interval
+    self._slots: List[PooledConnection] = [
+      PooledConnection(connection_factory(server_config, data_folder, pump=index == 0))
+      for index in range(size)
+    ]
+    self._idle: deque = deque()
+    self._available = threading.Condition()
+    self._stopping = threading.Event()
+    self._heartbeat: Optional[threading.Thread] = None
+    # Run on the heartbeat thread whenever it reconnects the primary
+    self._primary_callbacks: List[Callable[[], None]] = []
+
+    self.checkouts = 0
+    self.waits = 0
+    self.timeouts = 0
+    self.reconnects = 0
+    self.failures = 0
+    self.wait_time = 0.0
+
+  @property
+  def primary(self) -> Any:
+    """Connection receiving the pump; sinks are subscribed on it"""
+    return self._slots[0].connection
+
+  @property
+  def connected(self) -> bool:
+    return any(slot.connection.connected for slot in self._slots)
+
+  def connect(self) -> Dict[str, Any]:
+    """Connect every connection, then start the heartbeat"""
+    errors = []
+    for slot in self._slots:
+      try:
+        slot.connection.connect()
+      except MT5ConnectionError as e:
+        errors.append(str(e))
+        self._schedule_reconnect(slot)
+        continue
+      self._checkin(slot)
+
+    self.start_heartbeat()
+    if len(errors) == self.size:
+      raise MT5ConnectionError(errors[-1])
+    return self.stats()
+
+  def disconnect(self) -> None:
+    """Stop the heartbeat and close every connection"""
+    self._stopping.set()
+    if self._heartbeat is not None:
+      self._heartbeat.join(self.heartbeat_interval)
+      self._heartbeat = None
+    with self._available:
+      self._idle.clear()
+    for slot in self._slots:
+      try:
+        slot.connection.disconnect()
+      except Exception as e:
+        logger.error(f"Failed to disconnect from {self.server_config.name}: {str(e)}")
+
+  def _checkin(self, slot: PooledConnection) -> None:
+    with self._available:
+      self._idle.append(slot)
+      self._available.notify()
+
+  def _checkout(self, timeout: Optional[float]) -> PooledConnection:
+    timeout = self.checkout_timeout if timeout is None else timeout
+    started = time.monotonic()
+    with self._available:
+      if not self._idle:
+        if not self.connected:
+          raise MT5ConnectionError(f"Not connected to MT5 server {self.server_config.name}")
+        self.waits += 1
+        if not self._available.wait_for(lambda: self._idle, timeout):
+          self.timeouts += 1
+          raise MT5PoolExhausted(
+            f"No free connection to {self.server_config.name} after {timeout} seconds"
+          )
+      # Most recently used first, so idle connections stay warm
+      slot = self._idle.pop()
+      self.checkouts += 1
+      self.wait_time += time.monotonic() - started
+    slot.checkouts += 1
+    return slot
+
+  @contextmanager
+  def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+    """
+    Check out a connection for exclusive use
+
+    Raises:
+      MT5PoolExhausted: If none became free within the timeout
+      MT5ConnectionError: If the server is unreachable
+    """
+    slot = self._checkout(timeout)
+    broken = False
+    try:
+      yield slot.connection
+    except MT5ConnectionError:
+      broken = True
+      raise
+    finally:
+      if broken:
+        # Kept out of the pool until the heartbeat has reconnected it
+        self._mark_broken(slot)
+      else:
+        self._checkin(slot)
+
+  @contextmanager
+  def manager(self, timeout: Optional[float] = None) -> Iterator[Any]:
+    """Check out a connection and use its ManagerAPI directly"""
+    with self.connection(timeout) as connection:
+      yield connection.manager
+
+  def _mark_broken(self, slot: PooledConnection) -> None:
+    self.failures += 1
+    self._schedule_reconnect(slot)
+
+  def _schedule_reconnect(self, slot: PooledConnection) -> None:
+    delay = min(MT5_RECONNECT_BACKOFF * (2 ** slot.failures), MT5_RECONNECT_BACKOFF_MAX)
+    slot.failures += 1
+    slot.retry_at = time.monotonic() + delay
+
+  def on_primary_reconnect(self, callback: Callable[[], None]) -> None:
+    """Call back once the pump connection is back, to request what it missed"""
+    self._primary_callbacks.append(callback)
+
+  def setup_user_sink(self, sink) -> bool:
+    return self.primary.setup_user_sink(sink)
+
+  def setup_deal_sink(self, sink) -> bool:
+    return self.primary.setup_deal_sink(sink)
+
+  def start_heartbeat(self) -> None:
+    if self._heartbeat is not None and self._heartbeat.is_alive():
+      return
+    self._stopping.clear()
+    self._heartbeat = threading.Thread(
+      target=self._run_heartbeat,
+      name=f"mt5-heartbeat-{self.server_config.id}",
+      daemon=True
+    )
+    self._heartbeat.start()
+
+  def _run_heartbeat(self) -> None:
+    while not self._stopping.wait(self.heartbeat_interval):
+      self.check()
+
+  def check(self) -> None:
+    """Ping idle connections and reconnect broken ones that are due"""
+    with self._available:
+      idle = list(self._idle)
+
+    # One slot at a time, so checkouts are never short of more than one
+    for slot in idle:
+      with self._available:
+        if slot not in self._idle:
+          continue
+        self._idle.remove(slot)
+      if slot.connection.ping():
+        self._checkin(slot)
+        continue
+      logger.warning(
+        f"MT5 connection to {self.server_config.name} failed its heartbeat: "
+        f"{slot.connection.last_error}"
+      )
+      self.failures += 1
+      slot.failures = 0
+      self._schedule_reconnect(slot)
+
+    now = time.monotonic()
+    for slot in self._slots:
+      if slot.retry_at and slot.retry_at <= now:
+        self._reconnect(slot)
+
+  def _reconnect(self, slot: PooledConnection) -> None:
+    try:
+      slot.connection.reconnect()
+    except Exception as e:
+      logger.error(f"Failed to reconnect to {self.server_config.name}: {str(e)}")
+      self._schedule_reconnect(slot)
+      return
+    slot.failures = 0
+    slot.retry_at = 0.0
+    self.reconnects += 1
+    self._checkin(slot)
+    if slot is self._slots[0]:
+      for callback in self._primary_callbacks:
+        try:
+          callback()
+        except Exception as e:
+          logger.error(f"Reconnect callback for {self.server_config.name} failed: {str(e)}")
+
+  def stats(self) -> Dict[str, Any]:
+    with self._available:
+      idle = len(self._idle)
+    connected = sum(1 for slot in self._slots if slot.connection.connected)
+    reconnecting = sum(1 for slot in self._slots if slot.retry_at)
+    return {
+      'server': self.server_config.name,
+      'size': self.size,
+      'connected': connected,
+      'idle': idle,
+      'in_use': self.size - idle - reconnecting,
+      'reconnecting': reconnecting,
+      'checkouts': self.checkouts,
+      'waits': self.waits,
+      'timeouts': self.timeouts,
+      'avg_wait': self.wait_time / self.checkouts if self.checkouts else 0.0,
+      'reconnects': self.reconnects,
+      'failures': self.failures,
+      'primary_ip': self.primary.connected_ip
+    }
@@ -28,4 +28,48 @@ MT5_SERVERS = [
     type='live',
     id=2
   ),
-]
\ No newline at end of file
+]
+
+# Pump event dispatching
+EVENT_CHANNEL_USER = 'user'
+EVENT_CHANNEL_DEAL = 'deal'
+EVENT_CHANNELS = (EVENT_CHANNEL_USER, EVENT_CHANNEL_DEAL)
+EVENT_QUEUE_SIZE = 100000  # events per channel
+EVENT_OVERFLOW_DROP_OLDEST = 'drop_oldest'
+EVENT_OVERFLOW_DROP_NEWEST = 'drop_newest'
+EVENT_IDLE_WAIT = 1.0  # seconds
+EVENT_STOP_TIMEOUT = 10  # seconds
+
+# Deal buffering
+DEAL_BUFFER_SIZE = 65536  # deals kept per sink before the oldest are dropped
+
+# Deal ingestion
+DEAL_FLUSH_SIZE = 5000  # deals per bulk write
+DEAL_FLUSH_INTERVAL = 1.0  # seconds a deal may wait before being written
+DEAL_POLL_INTERVAL = 0.05  # seconds between buffer checks
+DEAL_RETRY_DELAY = 2.0  # seconds before retrying a failed batch
+DEAL_RETRY_LIMIT = 5  # attempts at a failed batch before it is requested again instead
+DEAL_BACKFILL_OVERLAP = 300  # seconds re-requested before the last stored deal
+DEAL_INITIAL_BACKFILL = 86400  # seconds requested when no deal is stored yet
+DEAL_BACKFILL_RETRY_MAX = 60.0  # seconds between retries of a failed backfill, at most
+
+# Connection pooling
+MT5_CONNECT_TIMEOUT = 120000  # milliseconds per IP
+MT5_POOL_SIZE = 4  # connections per server
+MT5_CHECKOUT_TIMEOUT = 5.0  # seconds to wait for an idle connection
+MT5_HEARTBEAT_INTERVAL = 10.0  # seconds between health checks
+MT5_RECONNECT_BACKOFF = 1.0  # first reconnect delay in seconds, doubled per failure
+MT5_RECONNECT_BACKOFF_MAX = 60.0  # seconds
+
+# Startup readiness
+MT5_STATE_DISABLED = 'disabled'
+MT5_STATE_IDLE = 'idle'
+MT5_STATE_CONNECTING = 'connecting'
+MT5_STATE_READY = 'ready'
+MT5_STATE_DEGRADED = 'degraded'  # some servers unreachable, retried by the heartbeat
+MT5_STATE_UNAVAILABLE = 'unavailable'
+MT5_READY_TIMEOUT = 5.0  # seconds callers wait for startup by default
+
+# Account store
+ACCOUNT_SNAPSHOT_INTERVAL = 1.0  # seconds between writes of changed accounts to Redis
+ACCOUNT_LOAD_GROUP = '*'  # group mask of the accounts loaded on startup
@@ -0,0 +1,124 @@
+"""
+Compact deal representation for the MT5 pump.
+
+Deals are copied out of MT5Manager objects as soon as they arrive, either
+into a DealRecord or straight into DealBuffer, a ring buffer holding one
+preallocated array per field. Consumers drain many deals at once as column
+arrays instead of handling one dict per deal.
+"""
+import threading
+from array import array
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from .constants import DEAL_BUFFER_SIZE
+
+# (MT5 attribute, column name, array typecode or None for object columns)
+DEAL_FIELDS = (
+  ('Deal', 'ticket', 'Q'),
+  ('Order', 'order', 'Q'),
+  ('Time', 'time', 'q'),
+  ('Login', 'login', 'Q'),
+  ('Symbol', 'symbol', None),
+  ('Action', 'action', 'I'),
+  ('Entry', 'entry', 'I'),
+  ('Volume', 'volume', 'Q'),
+  ('Price', 'price', 'd'),
+  ('Commission', 'commission', 'd'),
+  ('Profit', 'profit', 'd'),
+  ('Comment', 'comment', None),
+  ('Dealer', 'dealer', 'Q'),
+)
+
+DEAL_COLUMNS = tuple(name for _, name, _ in DEAL_FIELDS)
+
+_read_deal = attrgetter(*(attr for attr, _, _ in DEAL_FIELDS))
+
+class DealRecord:
+  """One deal, detached from the MT5Manager object it was read from."""
+  __slots__ = DEAL_COLUMNS
+
+  def __init__(self, *values):
+    for name, value in zip(DEAL_COLUMNS, values):
+      setattr(self, name, value)
+
+  @classmethod
+  def from_deal(cls, deal: Any) -> 'DealRecord':
+    return cls(*_read_deal(deal))
+
+  def as_dict(self) -> Dict[str, Any]:
+    return {name: getattr(self, name) for name in DEAL_COLUMNS}
+
+  def __repr__(self) -> str:
+    return f"DealRecord(ticket={self.ticket}, login={self.login}, symbol={self.symbol!r})"
+
+class DealBatch:
+  """Deals drained from a buffer, one sequence per column."""
+  __slots__ = ('columns', 'size')
+
+  def __init__(self, columns: Dict[str, Sequence], size: int):
+    self.columns = columns
+    self.size = size
+
+  def __len__(self) -> int:
+    return self.size
+
+  def __getitem__(self, column: str) -> Sequence:
+    return self.columns[column]
+
+  def records(self) -> Iterator[DealRecord]:
+    """Rows of the batch, for consumers that need them one at a time."""
+    for values in zip(*(self.columns[name] for name in DEAL_COLUMNS)):
+      yield DealRecord(*values)
+
+class DealBuffer:
+  def __init__(self, capacity: int = DEAL_BUFFER_SIZE):
+    """
+    Initialize deal buffer
+
+    Args:
+      capacity: Deals kept before the oldest are overwritten
+    """
+    self.capacity = capacity
+    self._columns: List[Any] = [
+      array(typecode, [0]) * capacity if typecode else [None] * capacity
+      for _, _, typecode in DEAL_FIELDS
+    ]
+    self._start = 0
+    self._size = 0
+    self._lock = threading.Lock()
+    self.appended = 0
+    self.dropped = 0
+
+  def __len__(self) -> int:
+    return self._size
+
+  def append(self, deal: Any) -> None:
+    """Copy the fields of an MT5 deal into the buffer."""
+    values = _read_deal(deal)
+    with self._lock:
+      index = (self._start + self._size) % self.capacity
+      for column, value in zip(self._columns, values):
+        column[index] = value
+      if self._size == self.capacity:
+        # Full: the slot just written held the oldest deal
+        self._start = (self._start + 1) % self.capacity
+        self.dropped += 1
+      else:
+        self._size += 1
+      self.appended += 1
+
+  def drain(self, limit: Optional[int] = None) -> DealBatch:
+    """Remove up to limit of the oldest deals and return them as columns."""
+    with self._lock:
+      size = self._size if limit is None else min(limit, self._size)
+      start = self._start
+      end = start + size
+      if end <= self.capacity:
+        columns = [column[start:end] for column in self._columns]
+      else:
+        wrapped = end - self.capacity
+        columns = [column[start:] + column[:wrapped] for column in self._columns]
+      self._start = end % self.capacity
+      self._size -= size
+    return DealBatch(dict(zip(DEAL_COLUMNS, columns)), size)
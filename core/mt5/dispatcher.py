@@ -0,0 +1,162 @@
+"""
+Delivery of MT5 pump events off the MT5Manager callback thread.
+
+Sinks only append a small record to a bounded deque per channel; a worker
+thread per channel runs the callbacks, so events of one channel are handled
+in order while a slow deal handler can't delay user updates or the pump.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional
+
+from django.conf import settings
+
+from .constants import (
+  EVENT_CHANNELS,
+  EVENT_QUEUE_SIZE,
+  EVENT_OVERFLOW_DROP_OLDEST,
+  EVENT_OVERFLOW_DROP_NEWEST,
+  EVENT_IDLE_WAIT,
+  EVENT_STOP_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+class MT5Event(NamedTuple):
+  handler: Callable[[str, Any], None]
+  event: str
+  data: Any
+  received_at: float
+
+class ChannelStats:
+  __slots__ = ('submitted', 'processed', 'dropped', 'failed', 'last_lag', 'max_lag')
+
+  def __init__(self):
+    self.submitted = 0
+    self.processed = 0
+    self.dropped = 0
+    self.failed = 0
+    self.last_lag = 0.0
+    self.max_lag = 0.0
+
+class EventDispatcher:
+  def __init__(
+    self,
+    channels: Iterable[str] = EVENT_CHANNELS,
+    capacity: int = EVENT_QUEUE_SIZE,
+    overflow: str = EVENT_OVERFLOW_DROP_OLDEST
+  ):
+    """
+    Initialize event dispatcher
+
+    Args:
+      channels: Channel names, each gets its own queue and worker
+      capacity: Maximum queued events per channel
+      overflow: What to drop when a channel is full, "drop_oldest" or "drop_newest"
+    """
+    if overflow not in (EVENT_OVERFLOW_DROP_OLDEST, EVENT_OVERFLOW_DROP_NEWEST):
+      raise ValueError(f"Invalid overflow policy: {overflow}")
+    self.capacity = capacity
+    self.overflow = overflow
+    # deque append/popleft are atomic, so the pump thread never takes a lock
+    self._queues: Dict[str, deque] = {
+      channel: deque(maxlen=capacity if overflow == EVENT_OVERFLOW_DROP_OLDEST else None)
+      for channel in channels
+    }
+    self._wakeups = {channel: threading.Event() for channel in self._queues}
+    self._stats = {channel: ChannelStats() for channel in self._queues}
+    self._workers: Dict[str, threading.Thread] = {}
+    self._lock = threading.Lock()
+    self._stopping = False
+
+  def start(self) -> None:
+    with self._lock:
+      self._stopping = False
+      for channel in self._queues:
+        worker = self._workers.get(channel)
+        if worker is not None and worker.is_alive():
+          continue
+        worker = threading.Thread(
+          target=self._run,
+          args=(channel,),
+          name=f"mt5-events-{channel}",
+          daemon=True
+        )
+        self._workers[channel] = worker
+        worker.start()
+
+  def submit(self, channel: str, handler: Callable[[str, Any], None], event: str, data: Any) -> bool:
+    """Queue an event; called from the pump thread, so it must stay cheap."""
+    queue = self._queues[channel]
+    stats = self._stats[channel]
+    stats.submitted += 1
+    if len(queue) >= self.capacity:
+      stats.dropped += 1
+      if self.overflow == EVENT_OVERFLOW_DROP_NEWEST:
+        return False
+    queue.append(MT5Event(handler, event, data, time.monotonic()))
+    self._wakeups[channel].set()
+    if channel not in self._workers:
+      self.start()
+    return True
+
+  def _run(self, channel: str) -> None:
+    queue = self._queues[channel]
+    wakeup = self._wakeups[channel]
+    stats = self._stats[channel]
+    while True:
+      try:
+        item = queue.popleft()
+      except IndexError:
+        wakeup.clear()
+        # Re-check after clearing so a concurrent submit isn't missed
+        if queue:
+          continue
+        if self._stopping:
+          return
+        wakeup.wait(EVENT_IDLE_WAIT)
+        continue
+
+      lag = time.monotonic() - item.received_at
+      stats.last_lag = lag
+      if lag > stats.max_lag:
+        stats.max_lag = lag
+      try:
+        item.handler(item.event, item.data)
+      except Exception as e:
+        stats.failed += 1
+        logger.error(f"Error handling {item.event} event: {str(e)}")
+      stats.processed += 1
+
+  def stop(self, timeout: float = EVENT_STOP_TIMEOUT) -> None:
+    """Deliver what is queued, then stop the workers."""
+    with self._lock:
+      self._stopping = True
+      workers = list(self._workers.values())
+      self._workers = {}
+    for wakeup in self._wakeups.values():
+      wakeup.set()
+    for worker in workers:
+      worker.join(timeout)
+
+  def stats(self, channel: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    channels = [channel] if channel else list(self._queues)
+    return {
+      name: {
+        'depth': len(self._queues[name]),
+        'submitted': self._stats[name].submitted,
+        'processed': self._stats[name].processed,
+        'dropped': self._stats[name].dropped,
+        'failed': self._stats[name].failed,
+        'last_lag': self._stats[name].last_lag,
+        'max_lag': self._stats[name].max_lag
+      }
+      for name in channels
+    }
+
+mt5_dispatcher = EventDispatcher(
+  capacity=getattr(settings, 'MT5_EVENT_QUEUE_SIZE', EVENT_QUEUE_SIZE),
+  overflow=getattr(settings, 'MT5_EVENT_OVERFLOW', EVENT_OVERFLOW_DROP_OLDEST)
+)
@@ -1,3 +1,7 @@
 class MT5ConnectionError(Exception):
   """Exception raised for MT5 connection errors"""
   pass
+
+class MT5PoolExhausted(MT5ConnectionError):
+  """Exception raised when no pooled connection became free in time"""
+  pass
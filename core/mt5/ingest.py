@@ -0,0 +1,354 @@
+"""
+Persistence of MT5 deals to Postgres and Elasticsearch.
+
+Deal sinks copy every deal into a DealBuffer per server. A single worker
+thread drains the buffers in batches, once enough deals are waiting or the
+oldest has waited long enough, inserts them with one bulk_create and hands
+the documents to the indexing queue.
+
+Deal primary keys are derived from (server_id, ticket), so writing a deal
+twice is harmless: the insert skips existing rows and the document upsert
+overwrites itself. That lets a failed batch be retried as a whole and lets
+the deals received while the process was down be requested again from the
+server on startup, starting a little before the last one stored.
+
+A batch is retried a bounded number of times, since the buffer keeps
+overwriting its oldest deals while the flush of its server is blocked.
+Batches given up on and deals overwritten in a full buffer are logged and
+requested again from the server as soon as it is known where they start.
+So are the deals made while the pump connection was down, once it is back.
+A backfill that fails is retried with backoff until it succeeds.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Max
+
+from core.elasticsearch.indices import TransactionIndex
+from core.elasticsearch.queue import IndexingQueue, indexing_queue
+from models.deals import Deal
+from .constants import (
+  DEAL_FLUSH_SIZE,
+  DEAL_FLUSH_INTERVAL,
+  DEAL_POLL_INTERVAL,
+  DEAL_RETRY_DELAY,
+  DEAL_RETRY_LIMIT,
+  DEAL_BACKFILL_OVERLAP,
+  DEAL_INITIAL_BACKFILL,
+  DEAL_BACKFILL_RETRY_MAX,
+  EVENT_STOP_TIMEOUT
+)
+from .deals import DealBatch, DealBuffer
+
+logger = logging.getLogger(__name__)
+
+class PendingBackfill:
+  """Deals to request from one server; requests queued meanwhile are merged in."""
+  __slots__ = ('pool', 'starts', 'attempts', 'retry_at')
+
+  def __init__(self, pool: Any):
+    self.pool = pool
+    # Unix times to request from; None stands for the last stored deal
+    self.starts: Set[Optional[int]] = set()
+    self.attempts = 0
+    self.retry_at = 0.0
+
+class DealIngestor:
+  def __init__(
+    self,
+    buffers: Dict[int, DealBuffer],
+    flush_size: int = DEAL_FLUSH_SIZE,
+    flush_interval: float = DEAL_FLUSH_INTERVAL,
+    queue: Optional[IndexingQueue] = None
+  ):
+    """
+    Initialize deal ingestor
+
+    Args:
+      buffers: Deal buffer of each server, keyed by server id
+      flush_size: Deals written per batch; a full batch is written immediately
+      flush_interval: Maximum seconds a deal waits in its buffer
+      queue: Indexing queue for documents, defaults to the shared one
+    """
+    self.buffers = buffers
+    self.flush_size = flush_size
+    self.flush_interval = flush_interval
+    self.queue = queue or indexing_queue
+
+    # Batches whose write failed, retried before anything newer is drained
+    self._retries: Dict[int, DealBatch] = {}
+    self._retry_at: Dict[int, float] = {}
+    self._attempts: Dict[int, int] = {}
+    self._last_flush: Dict[int, float] = {}
+    # Newest deal time drained and buffer overwrites seen, per server
+    self._drained_until: Dict[int, int] = {}
+    self._overwritten: Dict[int, int] = {}
+    self._pools: Dict[int, Any] = {}
+    self._backfills: Dict[int, PendingBackfill] = {}
+    self._lock = threading.Lock()
+    self._stopping = threading.Event()
+    self._thread: Optional[threading.Thread] = None
+
+    self.stats = {
+      "written": 0,
+      "batches": 0,
+      "failed": 0,
+      "abandoned": 0,
+      "overwritten": 0,
+      "backfilled": 0
+    }
+
+  def start(self) -> None:
+    with self._lock:
+      if self._thread is not None and self._thread.is_alive():
+        return
+      self._stopping.clear()
+      self._thread = threading.Thread(target=self._run, name="mt5-deal-ingest", daemon=True)
+      self._thread.start()
+
+  def backfill(self, server_id: int, pool: Any, since: Optional[int] = None) -> None:
+    """Request the deals missed while not subscribed; runs on the worker."""
+    self._pools[server_id] = pool
+    self._queue_backfill(server_id, pool, {since})
+
+  def resume(self, server_id: int, pool: Any) -> None:
+    """Request the deals made while the pump connection of a server was down."""
+    since = self._drained_until.get(server_id)
+    if since is not None:
+      since -= DEAL_BACKFILL_OVERLAP
+    self.backfill(server_id, pool, since)
+
+  def _recover(self, server_id: int, since: Optional[int]) -> None:
+    """Request lost deals again from the server they came from."""
+    pool = self._pools.get(server_id)
+    if pool is None:
+      logger.error(f"No connection to request lost deals of server {server_id} since {since}")
+      return
+    self._queue_backfill(server_id, pool, {since})
+
+  def _queue_backfill(
+    self,
+    server_id: int,
+    pool: Any,
+    starts: Set[Optional[int]],
+    attempts: int = 0,
+    retry_at: float = 0.0
+  ) -> None:
+    with self._lock:
+      pending = self._backfills.get(server_id)
+      if pending is None:
+        pending = self._backfills[server_id] = PendingBackfill(pool)
+        pending.attempts = attempts
+        pending.retry_at = retry_at
+      elif not attempts:
+        # A new request, e.g. after a reconnect, doesn't wait out the backoff
+        pending.attempts = 0
+        pending.retry_at = 0.0
+      pending.pool = pool
+      pending.starts |= starts
+
+  def _run_backfills(self) -> None:
+    now = time.monotonic()
+    with self._lock:
+      due = [
+        (server_id, pending) for server_id, pending in self._backfills.items()
+        if pending.retry_at <= now
+      ]
+      for server_id, _ in due:
+        del self._backfills[server_id]
+
+    for server_id, pending in due:
+      if self._backfill_from(server_id, pending):
+        continue
+      attempts = pending.attempts + 1
+      delay = min(DEAL_RETRY_DELAY * 2 ** (attempts - 1), DEAL_BACKFILL_RETRY_MAX)
+      logger.warning(f"Retrying deal backfill for server {server_id} in {delay} seconds")
+      self._queue_backfill(
+        server_id, pending.pool, pending.starts, attempts, time.monotonic() + delay
+      )
+
+  def _run(self) -> None:
+    try:
+      while not self._stopping.is_set():
+        self._run_backfills()
+        for server_id, buffer in self.buffers.items():
+          self._check_overwritten(server_id, buffer)
+          self._flush_due(server_id, buffer)
+        self._stopping.wait(DEAL_POLL_INTERVAL)
+
+      # Write everything still buffered before exiting
+      for server_id, buffer in self.buffers.items():
+        while self._flush(server_id, buffer):
+          pass
+    finally:
+      connection.close()
+
+  def _check_overwritten(self, server_id: int, buffer: DealBuffer) -> None:
+    dropped = buffer.dropped - self._overwritten.get(server_id, 0)
+    if dropped <= 0:
+      return
+    self._overwritten[server_id] = buffer.dropped
+    self.stats["overwritten"] += dropped
+    logger.error(f"Deal buffer of server {server_id} is full, {dropped} deals were overwritten")
+
+    # The lost deals follow the newest one drained, or the stored ones if none was
+    self._recover(server_id, self._drained_until.get(server_id))
+
+  def _flush_due(self, server_id: int, buffer: DealBuffer) -> None:
+    now = time.monotonic()
+    if server_id in self._retries:
+      if now >= self._retry_at[server_id]:
+        self._flush(server_id, buffer)
+      return
+
+    # Keep writing full batches while the pump is ahead of us
+    while len(buffer) >= self.flush_size:
+      if not self._flush(server_id, buffer):
+        return
+    if len(buffer) and now - self._last_flush.get(server_id, 0) >= self.flush_interval:
+      self._flush(server_id, buffer)
+
+  def _flush(self, server_id: int, buffer: DealBuffer) -> bool:
+    """Write one batch, returning False when there was nothing to write or it failed."""
+    batch = self._retries.pop(server_id, None)
+    if batch is None:
+      batch = buffer.drain(self.flush_size)
+      if len(batch):
+        self._drained_until[server_id] = max(
+          self._drained_until.get(server_id, 0), max(batch['time'])
+        )
+    self._last_flush[server_id] = time.monotonic()
+    if not len(batch):
+      return False
+
+    try:
+      self.write(server_id, batch)
+    except Exception as e:
+      self.stats["failed"] += 1
+      attempts = self._attempts.get(server_id, 0) + 1
+      logger.error(f"Failed to write {len(batch)} deals for server {server_id}: {str(e)}")
+      if attempts >= DEAL_RETRY_LIMIT:
+        # Unblock the buffer and request the batch again later instead
+        self._attempts.pop(server_id, None)
+        self.stats["abandoned"] += len(batch)
+        logger.error(
+          f"Gave up on {len(batch)} deals for server {server_id} after {attempts} attempts"
+        )
+        self._recover(server_id, min(batch['time']))
+      else:
+        self._attempts[server_id] = attempts
+        self._retries[server_id] = batch
+        self._retry_at[server_id] = time.monotonic() + DEAL_RETRY_DELAY
+      return False
+    self._attempts.pop(server_id, None)
+    return True
+
+  def build(self, server_id: int, batch: DealBatch) -> List[Deal]:
+    """Turn a drained batch into unsaved Deal instances."""
+    make_id = Deal.make_id
+    utc = timezone.utc
+    return [
+      Deal(
+        id=make_id(server_id, ticket),
+        server_id=server_id,
+        ticket=ticket,
+        order=order,
+        login=login,
+        time=datetime.fromtimestamp(timestamp, tz=utc),
+        symbol=symbol or '',
+        action=action,
+        entry=entry,
+        volume=volume,
+        price=price,
+        commission=commission,
+        profit=profit,
+        comment=comment or '',
+        dealer=dealer
+      )
+      for ticket, order, timestamp, login, symbol, action, entry,
+          volume, price, commission, profit, comment, dealer in zip(
+        batch['ticket'], batch['order'], batch['time'], batch['login'],
+        batch['symbol'], batch['action'], batch['entry'], batch['volume'],
+        batch['price'], batch['commission'], batch['profit'],
+        batch['comment'], batch['dealer']
+      )
+    ]
+
+  def write(self, server_id: int, batch: DealBatch) -> None:
+    """Insert a batch, skipping deals already stored, then index it."""
+    deals = self.build(server_id, batch)
+    close_old_connections()
+    Deal.objects.bulk_create(deals, batch_size=self.flush_size, ignore_conflicts=True)
+
+    # Only index what is durable in Postgres; a rebuild can always recover the rest
+    index = TransactionIndex.get_index_name()
+    for deal in deals:
+      document = TransactionIndex.get_document(deal)
+      self.queue.enqueue(index, document["id"], document)
+
+    self.stats["written"] += len(deals)
+    self.stats["batches"] += 1
+
+  def _backfill_start(self, server_id: int) -> int:
+    close_old_connections()
+    last = Deal.objects.filter(server_id=server_id).aggregate(last=Max('time'))['last']
+    if last is not None:
+      return int(last.timestamp()) - DEAL_BACKFILL_OVERLAP
+
+    start = getattr(settings, 'MT5_DEAL_BACKFILL_START', None)
+    if start is None:
+      start = int(time.time()) - DEAL_INITIAL_BACKFILL
+    logger.info(f"No deals stored for server {server_id}, backfilling from {start}")
+    return start
+
+  def _backfill_from(self, server_id: int, pending: PendingBackfill) -> bool:
+    try:
+      starts = [
+        self._backfill_start(server_id) if since is None else since
+        for since in pending.starts
+      ]
+    except Exception as e:
+      logger.error(f"Deal backfill failed for server {server_id}: {str(e)}")
+      return False
+    return self._backfill(server_id, pending.pool, min(starts))
+
+  def _backfill(self, server_id: int, pool: Any, since: Optional[int] = None) -> bool:
+    """Request and write deals from since, returning False if it has to be retried."""
+    try:
+      if since is None:
+        since = self._backfill_start(server_id)
+      with pool.manager() as manager:
+        deals = manager.DealRequestByGroup('*', since, int(time.time()))
+      if deals is False or deals is None:
+        logger.error(f"Deal backfill request failed for server {server_id}")
+        return False
+    except Exception as e:
+      logger.error(f"Deal backfill failed for server {server_id}: {str(e)}")
+      return False
+
+    for start in range(0, len(deals), self.flush_size):
+      chunk = DealBuffer(capacity=self.flush_size)
+      for deal in deals[start:start + self.flush_size]:
+        chunk.append(deal)
+      batch = chunk.drain()
+      try:
+        self.write(server_id, batch)
+      except Exception as e:
+        logger.error(f"Failed to write backfilled deals for server {server_id}: {str(e)}")
+        return False
+      self.stats["backfilled"] += len(batch)
+    return True
+
+  def stop(self, timeout: float = EVENT_STOP_TIMEOUT) -> None:
+    """Write buffered deals and stop the worker."""
+    with self._lock:
+      thread, self._thread = self._thread, None
+    if thread is None or not thread.is_alive():
+      return
+    self._stopping.set()
+    thread.join(timeout)
@@ -1,8 +1,33 @@
-from typing import Dict, List, Optional, Callable
-from .connection.manager import MT5ConnectionManager
-from .constants import MT5ServerConfig, MT5_SERVERS
+import atexit
+import logging
+import threading
+from functools import partial
+from typing import Any, Dict, List, Optional, Callable
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from .connection.pool import MT5ConnectionPool
+from .constants import (
+  MT5ServerConfig,
+  MT5_SERVERS,
+  MT5_POOL_SIZE,
+  MT5_STATE_DISABLED,
+  MT5_STATE_IDLE,
+  MT5_STATE_CONNECTING,
+  MT5_STATE_READY,
+  MT5_STATE_DEGRADED,
+  MT5_STATE_UNAVAILABLE,
+  MT5_READY_TIMEOUT,
+  ACCOUNT_LOAD_GROUP
+)
 from .exceptions import MT5ConnectionError
 from .sinks import MT5UserSink, MT5DealSink
+from .dispatcher import mt5_dispatcher
+from .deals import DealBuffer
+from .accounts import AccountStore
+from .ingest import DealIngestor
+
+logger = logging.getLogger(__name__)
+
 class MT5ConnectionPools:
   _instance = None
   
@@ -20,8 +45,22 @@ class MT5ConnectionPools:
     self._demo_pool = None
     self._live_pool = None
     self._initialized = True
-    self._user_sink = MT5UserSink()
-    self._deal_sink = MT5DealSink()
+    # Callbacks run on dispatcher workers, never on the pump thread.
+    # One sink per server so events can be told apart by server id.
+    self._user_sinks = {
+      server.id: MT5UserSink(dispatcher=mt5_dispatcher, store=AccountStore(server.id))
+      for server in MT5_SERVERS
+    }
+    self._deal_sinks = {
+      server.id: MT5DealSink(dispatcher=mt5_dispatcher, buffer=DealBuffer())
+      for server in MT5_SERVERS
+    }
+    self._ingestor = DealIngestor(self.deal_buffers)
+    self._enabled = getattr(settings, 'MT5_ENABLED', True)
+    self._startup: Optional[threading.Thread] = None
+    self._startup_lock = threading.Lock()
+    # Set once the first connection attempt to every server has finished
+    self._started = threading.Event()
     print("DEBUG: MT5ConnectionPools initialized")  # Debug print
     
     # Connect to all servers during initialization
@@ -34,45 +73,160 @@ class MT5ConnectionPools:
     # except Exception as e:
     #   print(f"Failed to connect to MT5 servers: {str(e)}")
   
+  def start(self) -> bool:
+    """Connect to all servers in the background, returning immediately"""
+    if not self._enabled:
+      return False
+    with self._startup_lock:
+      if self._startup is not None:
+        return False
+      self._startup = threading.Thread(target=self._connect_in_background, name="mt5-startup", daemon=True)
+      self._startup.start()
+    # Unsubscribe and write out buffered deals on shutdown
+    atexit.register(self.disconnect_all)
+    return True
+
+  def _connect_in_background(self):
+    try:
+      results = self.connect_all()
+      logger.info(f"MT5 connection results: {results}")
+      # Sinks of unreachable servers are subscribed once they connect
+      self.setup_sinks()
+    except Exception as e:
+      logger.error(f"MT5 startup failed: {str(e)}")
+    finally:
+      self._started.set()
+    logger.info(f"MT5 startup finished: {self.state}")
+
+  @property
+  def state(self) -> str:
+    """Readiness of the MT5 connections"""
+    if not self._enabled:
+      return MT5_STATE_DISABLED
+    if self._startup is None:
+      return MT5_STATE_IDLE
+    if not self._started.is_set():
+      return MT5_STATE_CONNECTING
+    connected = [pool.connected for pool in self.pools.values()]
+    if connected and all(connected):
+      return MT5_STATE_READY
+    if any(connected):
+      return MT5_STATE_DEGRADED
+    return MT5_STATE_UNAVAILABLE
+
+  def wait_ready(self, timeout: float = MT5_READY_TIMEOUT) -> bool:
+    """Block until startup has finished, returning whether every server is connected"""
+    if not self._enabled or self._startup is None:
+      return False
+    self._started.wait(timeout)
+    return self.state == MT5_STATE_READY
+
+  async def await_ready(self, timeout: float = MT5_READY_TIMEOUT) -> bool:
+    return await sync_to_async(self.wait_ready, thread_sensitive=False)(timeout)
+
+  @property
+  def pools(self) -> Dict[str, MT5ConnectionPool]:
+    """Pools created so far, by server type"""
+    pools = {'demo': self._demo_pool, 'live': self._live_pool}
+    return {server_type: pool for server_type, pool in pools.items() if pool}
+
   def setup_sinks(self):
     """Setup sinks for all connections"""
-    if self._demo_pool:
-      self._demo_pool.setup_user_sink(self._user_sink)
-      self._demo_pool.setup_deal_sink(self._deal_sink)
-    if self._live_pool:
-      self._live_pool.setup_user_sink(self._user_sink)
-      self._live_pool.setup_deal_sink(self._deal_sink)
+    mt5_dispatcher.start()
+    for pool in (self._demo_pool, self._live_pool):
+      if not pool:
+        continue
+      server_id = pool.server_config.id
+      pool.setup_user_sink(self._user_sinks[server_id])
+      pool.setup_deal_sink(self._deal_sinks[server_id])
+      # Subscribe first so the backfill window overlaps the live stream
+      self._load_accounts(server_id, pool)
+      self._ingestor.backfill(server_id, pool)
+      pool.on_primary_reconnect(partial(self._primary_reconnected, server_id, pool))
+    for store in self.account_stores.values():
+      store.start()
+    self._ingestor.start()
+
+  def _primary_reconnected(self, server_id: int, pool: MT5ConnectionPool):
+    """Catch up on what the pump missed while its connection was down"""
+    self._load_accounts(server_id, pool)
+    self._ingestor.resume(server_id, pool)
+
+  def _load_accounts(self, server_id: int, pool: MT5ConnectionPool):
+    """Fill an account store with every account of a server, keeping newer pump updates"""
+    store = self.account_stores[server_id]
+    store.begin_load()
+    try:
+      # Checked out like any other request, never used alongside another caller
+      with pool.manager() as manager:
+        users = manager.UserGetByGroup(ACCOUNT_LOAD_GROUP)
+      if users is False or users is None:
+        store.cancel_load()
+        logger.error(f"Failed to load accounts of {pool.server_config.name}")
+        return
+      count = store.load(users)
+      logger.info(f"Loaded {count} accounts of {pool.server_config.name}")
+    except Exception as e:
+      store.cancel_load()
+      logger.error(f"Failed to load accounts of {pool.server_config.name}: {str(e)}")
+
+  @property
+  def account_stores(self) -> Dict[int, AccountStore]:
+    """Accounts kept current from the pump, per server id"""
+    return {server_id: sink.store for server_id, sink in self._user_sinks.items()}
+
+  def get_account_store(self, server_type: str) -> AccountStore:
+    """Account store of a server by type"""
+    config = next((server for server in MT5_SERVERS if server.type == server_type), None)
+    if not config:
+      raise ValueError(f"Invalid server type: {server_type}")
+    return self._user_sinks[config.id].store
   
+  @property
+  def deal_buffers(self) -> Dict[int, DealBuffer]:
+    """Deals received from the pump per server id, waiting to be drained in batches"""
+    return {server_id: sink.buffer for server_id, sink in self._deal_sinks.items()}
+
+  @property
+  def deal_ingestor(self) -> DealIngestor:
+    return self._ingestor
+
   def add_user_callback(self, event: str, callback: Callable):
     """Add callback for user events"""
-    self._user_sink.add_callback(event, callback)
+    for sink in self._user_sinks.values():
+      sink.add_callback(event, callback)
   
   def add_deal_callback(self, event: str, callback: Callable):
     """Add callback for deal events"""
     print(f"Adding deal callback for {event}")
-    self._deal_sink.add_callback(event, callback)
+    for sink in self._deal_sinks.values():
+      sink.add_callback(event, callback)
   
   @property
-  def demo(self) -> MT5ConnectionManager:
-    """Get demo server connection"""
+  def demo(self) -> MT5ConnectionPool:
+    """Get demo server connection pool"""
     if not self._demo_pool:
       config = next((server for server in MT5_SERVERS if server.type == 'demo'), None)
       if not config:
         raise MT5ConnectionError("No demo server configuration found")
-      self._demo_pool = MT5ConnectionManager(config)
+      self._demo_pool = self._create_pool(config)
     return self._demo_pool
   
   @property
-  def live(self) -> MT5ConnectionManager:
-    """Get live server connection"""
+  def live(self) -> MT5ConnectionPool:
+    """Get live server connection pool"""
     if not self._live_pool:
       config = next((server for server in MT5_SERVERS if server.type == 'live'), None)
       if not config:
         raise MT5ConnectionError("No live server configuration found")
-      self._live_pool = MT5ConnectionManager(config)
+      self._live_pool = self._create_pool(config)
     return self._live_pool
   
-  def get_by_type(self, server_type: str) -> MT5ConnectionManager:
+  @staticmethod
+  def _create_pool(config: MT5ServerConfig) -> MT5ConnectionPool:
+    return MT5ConnectionPool(config, size=getattr(settings, 'MT5_POOL_SIZE', MT5_POOL_SIZE))
+
+  def get_by_type(self, server_type: str) -> MT5ConnectionPool:
     """Get connection by server type"""
     if server_type == 'demo':
       return self.demo
@@ -80,7 +234,7 @@ class MT5ConnectionPools:
       return self.live
     raise ValueError(f"Invalid server type: {server_type}")
   
-  def get_by_id(self, server_id: int) -> MT5ConnectionManager:
+  def get_by_id(self, server_id: int) -> MT5ConnectionPool:
     """Get connection by server ID"""
     config = next((server for server in MT5_SERVERS if server.id == server_id), None)
     if not config:
@@ -95,19 +249,29 @@ class MT5ConnectionPools:
     results = {}
     for server in MT5_SERVERS:
       try:
-        connection = self.get_by_type(server.type)
-        connection.connect()
+        self.get_by_type(server.type).connect()
         results[server.name] = True
       except Exception as e:
+        logger.error(f"Failed to connect to {server.name}: {str(e)}")
         results[server.name] = False
     return results
   
+  def stats(self) -> Dict[str, Any]:
+    """Pool statistics per configured server"""
+    return {
+      server.type: self.get_by_type(server.type).stats()
+      for server in MT5_SERVERS
+    }
+
   def disconnect_all(self):
     """Disconnect from all servers"""
-    if self._demo_pool:
-      self._demo_pool.disconnect()
-    if self._live_pool:
-      self._live_pool.disconnect() 
+    for pool in (self._demo_pool, self._live_pool):
+      if pool:
+        pool.disconnect()
+    self._ingestor.stop()
+    for store in self.account_stores.values():
+      store.stop()
+    mt5_dispatcher.stop()
 
 # Global instance
 mt5_pools = MT5ConnectionPools() 
\ No newline at end of file
@@ -1,12 +1,25 @@
 from typing import Callable, Dict, Any, Optional
 import logging
+from .constants import EVENT_CHANNEL_USER, EVENT_CHANNEL_DEAL
+from .dispatcher import EventDispatcher
+from .deals import DealBuffer, DealRecord
+from .accounts import AccountStore, MT5Account
 
 logger = logging.getLogger(__name__)
 
 class BaseMT5Sink:
   """Base class for MT5 event sinks"""
-  def __init__(self):
+  CHANNEL: Optional[str] = None
+
+  def __init__(self, dispatcher: Optional[EventDispatcher] = None):
+    """
+    Initialize sink
+
+    Args:
+      dispatcher: Runs callbacks off the pump thread; without one they run inline
+    """
     self._callbacks: Dict[str, list[Callable]] = {}
+    self._dispatcher = dispatcher
   
   def add_callback(self, event: str, callback: Callable):
     """Add callback for specific event"""
@@ -15,6 +28,13 @@ class BaseMT5Sink:
     self._callbacks[event].append(callback)
   
   def _trigger_callbacks(self, event: str, data: Any):
+    """Hand an event to the dispatcher, called on the MT5Manager pump thread"""
+    if self._dispatcher is not None:
+      self._dispatcher.submit(self.CHANNEL, self._run_callbacks, event, data)
+    else:
+      self._run_callbacks(event, data)
+
+  def _run_callbacks(self, event: str, data: Any):
     """Trigger all callbacks for an event"""
     for callback in self._callbacks.get(event, []):
       try:
@@ -24,13 +44,53 @@ class BaseMT5Sink:
 
 class MT5UserSink(BaseMT5Sink):
   """Sink for user-related events"""
+  CHANNEL = EVENT_CHANNEL_USER
+
+  def __init__(self, dispatcher: Optional[EventDispatcher] = None, store: Optional[AccountStore] = None):
+    """
+    Initialize user sink
+
+    Args:
+      dispatcher: Runs callbacks off the pump thread; without one they run inline
+      store: Kept current with every updated and deleted account
+    """
+    super().__init__(dispatcher)
+    self.store = store
+
   def OnUserDelete(self, user) -> None:
-    self._trigger_callbacks('user_delete', user)
+    account = MT5Account.from_user(user)
+    if self.store is not None:
+      self.store.delete(account.login)
+    self._trigger_callbacks('user_delete', account)
       
   def OnUserUpdate(self, user) -> None:
-    self._trigger_callbacks('user_update', user)
+    # Copy the fields now; MT5Manager objects shouldn't outlive the callback
+    if self.store is not None:
+      account = self.store.update(user)
+    elif self._callbacks.get('user_update'):
+      account = MT5Account.from_user(user)
+    else:
+      return
+    self._trigger_callbacks('user_update', account)
 
 class MT5DealSink(BaseMT5Sink):
   """Sink for deal-related events"""
+  CHANNEL = EVENT_CHANNEL_DEAL
+
+  def __init__(self, dispatcher: Optional[EventDispatcher] = None, buffer: Optional[DealBuffer] = None):
+    """
+    Initialize deal sink
+
+    Args:
+      dispatcher: Runs callbacks off the pump thread; without one they run inline
+      buffer: Receives a copy of every deal for batch consumers
+    """
+    super().__init__(dispatcher)
+    self.buffer = buffer
+
   def OnDealAdd(self, deal) -> None:
-    self._trigger_callbacks('deal_add', deal) 
\ No newline at end of file
+    # Copy the fields now; MT5Manager objects shouldn't outlive the callback
+    if self.buffer is not None:
+      self.buffer.append(deal)
+    if self._callbacks.get('deal_add'):
+      self._trigger_callbacks('deal_add', DealRecord.from_deal(deal))
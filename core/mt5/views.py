@@ -7,14 +7,13 @@ from .constants import MT5_SERVERS
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def check_mt5_connections(request):
-  status = {
-    'demo': {
-      'connected': mt5_pools.demo._connected,
-      'server_name': next(s.name for s in MT5_SERVERS if s.type == 'demo')
-    },
-    'live': {
-      'connected': mt5_pools.live._connected,
-      'server_name': next(s.name for s in MT5_SERVERS if s.type == 'live')
+  pools = mt5_pools.pools
+  status = {'state': mt5_pools.state}
+  for server in MT5_SERVERS:
+    pool = pools.get(server.type)
+    status[server.type] = {
+      'connected': bool(pool and pool.connected),
+      'server_name': server.name,
+      'pool': pool.stats() if pool else None
     }
-  }
   return Response(status)
@@ -1,5 +1,7 @@
 """Redis module initialization."""
 from .client import RedisClient
+from .serializers import Serializer
+from .local_cache import LocalCache
 from .exceptions import RedisError, RedisConnectionError, RedisOperationError
 from .constants import (
   USER_PREFIX,
@@ -14,6 +16,8 @@ redis_client = RedisClient()
 __all__ = [
   "RedisClient",
   "redis_client",
+  "Serializer",
+  "LocalCache",
   "RedisError",
   "RedisConnectionError",
   "RedisOperationError",
@@ -1,25 +1,74 @@
 """Redis client implementation."""
+import os
+import threading
+import uuid
 from typing import Optional, Any, Union, List, Tuple
-import json
+import redis as sync_redis
 from redis import asyncio as aioredis
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from shared.utils.logger import logger
+from core.metrics.timing import timed
+from core.metrics.constants import BACKEND_REDIS
 from .exceptions import RedisConnectionError, RedisOperationError
+from .serializers import Serializer, DEFAULT_SERIALIZER
+from .local_cache import LocalCache, MISSING
 from .constants import (
   DEFAULT_EXPIRE,
   MAX_CONNECTIONS,
   SOCKET_TIMEOUT,
-  SCAN_COUNT
+  SCAN_COUNT,
+  DEFAULT_COMPRESS_THRESHOLD,
+  NEAR_CACHE_SIZE,
+  NEAR_CACHE_TTL,
+  INVALIDATION_CHANNEL,
+  INVALIDATION_RETRY_DELAY,
+  INVALIDATION_POLL_TIMEOUT
 )
 
 class RedisClient:
-  def __init__(self):
-    """Initialize Redis client."""
+  def __init__(self, serializer: Optional[Serializer] = None, near_cache: Optional[bool] = None):
+    """
+    Initialize Redis client.
+
+    Args:
+      serializer: Value serializer, defaults to one built from settings
+      near_cache: Keep hot values in process memory; None follows REDIS_NEAR_CACHE.
+        Cached values are shared between callers and must not be mutated.
+    """
     self.connection: Optional[aioredis.Redis] = None
     self._initialized = False
+    self._serializer = serializer
+    if near_cache is None:
+      near_cache = getattr(settings, 'REDIS_NEAR_CACHE', False)
+    self.near_cache: Optional[LocalCache] = LocalCache(
+      max_size=getattr(settings, 'REDIS_NEAR_CACHE_SIZE', NEAR_CACHE_SIZE),
+      ttl=getattr(settings, 'REDIS_NEAR_CACHE_TTL', NEAR_CACHE_TTL)
+    ) if near_cache else None
+    # Lets the listener skip invalidations this client already applied
+    self._origin = uuid.uuid4().hex
+    self._listener: Optional[threading.Thread] = None
+    self._listener_stop = threading.Event()
+    self._listener_pid: Optional[int] = None
+    # Script source -> registered script for the current connection
+    self._scripts: dict = {}
     self.LOG_TAG = "Redis"
 
+  @property
+  def serializer(self) -> Serializer:
+    """Serializer configured by the REDIS_SERIALIZER/REDIS_COMPRESSION settings."""
+    if self._serializer is None:
+      self._serializer = Serializer(
+        codec=getattr(settings, 'REDIS_SERIALIZER', DEFAULT_SERIALIZER),
+        compression=getattr(settings, 'REDIS_COMPRESSION', None),
+        compress_threshold=getattr(
+          settings,
+          'REDIS_COMPRESS_THRESHOLD',
+          DEFAULT_COMPRESS_THRESHOLD
+        )
+      )
+    return self._serializer
+
   async def initialize(self) -> None:
     """Initialize Redis connection if not already initialized."""
     if self._initialized:
@@ -42,11 +91,13 @@ class RedisClient:
     """Establish connection to Redis."""
     try:
       logger.info(f"Connecting to Redis at {settings.REDIS_HOST}")
-      
+      self._scripts = {}
+
       self.connection = await aioredis.from_url(
         f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
         password=settings.REDIS_PASSWORD,
-        decode_responses=True,
+        # Values carry a binary header, see serializers.py
+        decode_responses=False,
         max_connections=MAX_CONNECTIONS,
         socket_timeout=SOCKET_TIMEOUT,
         retry_on_timeout=True
@@ -55,27 +106,120 @@ class RedisClient:
       # Test connection
       await self.connection.ping()
       logger.info("Redis connection established successfully")
+
+      if self.near_cache is not None:
+        self._start_listener()
         
     except Exception as e:
       logger.error(f"Failed to connect to Redis: {str(e)}")
       raise RedisConnectionError(f"Redis connection failed: {str(e)}")
 
+  def _start_listener(self) -> None:
+    """
+    Receive invalidations on a thread of its own.
+
+    Not a task: under WSGI every async_to_sync call runs on a new event loop
+    that is discarded afterwards, and a task on it would stop receiving.
+    """
+    if (
+      self._listener is not None and self._listener.is_alive()
+      and self._listener_pid == os.getpid()
+    ):
+      return
+    # Threads don't survive a fork, the child starts its own
+    self._listener_pid = os.getpid()
+    self._listener_stop = threading.Event()
+    self._listener = threading.Thread(
+      target=self._listen_invalidations,
+      args=(self._listener_stop,),
+      name="redis-near-cache",
+      daemon=True
+    )
+    self._listener.start()
+
+  def _listen_invalidations(self, stop: threading.Event) -> None:
+    """Evict near cache entries changed by other processes."""
+    while not stop.is_set():
+      connection = sync_redis.Redis(
+        host=settings.REDIS_HOST,
+        port=int(settings.REDIS_PORT),
+        password=settings.REDIS_PASSWORD,
+        socket_connect_timeout=SOCKET_TIMEOUT
+      )
+      pubsub = connection.pubsub(ignore_subscribe_messages=True)
+      try:
+        pubsub.subscribe(INVALIDATION_CHANNEL)
+        # Anything cached while unsubscribed may have missed an invalidation
+        self.near_cache.clear()
+        while not stop.is_set():
+          message = pubsub.get_message(timeout=INVALIDATION_POLL_TIMEOUT)
+          if message is not None and message['type'] == 'message':
+            self._apply_invalidation(message['data'])
+      except Exception as e:
+        logger.error(f"Redis invalidation listener failed: {str(e)}")
+        self.near_cache.clear()
+        stop.wait(INVALIDATION_RETRY_DELAY)
+      finally:
+        pubsub.close()
+        connection.close()
+
+  def _apply_invalidation(self, data: bytes) -> None:
+    try:
+      message = self.serializer.loads(data)
+      if message['origin'] == self._origin:
+        return
+      self.near_cache.delete_many(message.get('keys', ()))
+      for pattern in message.get('patterns', ()):
+        self.near_cache.delete_pattern(pattern)
+    except Exception as e:
+      logger.error(f"Invalid near cache invalidation: {str(e)}")
+      self.near_cache.clear()
+
+  def _invalidate(self, pipe, keys: List[str] = (), patterns: List[str] = ()) -> None:
+    """Evict keys locally and queue the broadcast on a pipeline."""
+    if self.near_cache is None:
+      return
+    self.near_cache.delete_many(keys)
+    for pattern in patterns:
+      self.near_cache.delete_pattern(pattern)
+    pipe.publish(INVALIDATION_CHANNEL, self.serializer.dumps({
+      'origin': self._origin,
+      'keys': list(keys),
+      'patterns': list(patterns)
+    }))
+
+  def _remember(self, key: str, value: Any, pttl: int, generation: int) -> None:
+    """Keep a value read from Redis locally, never past the key's own expiry."""
+    ttl = self.near_cache.ttl
+    if pttl > 0:
+      ttl = pttl / 1000 if ttl is None else min(ttl, pttl / 1000)
+    self.near_cache.set_if_generation(key, value, generation, ttl)
+
+  @timed(BACKEND_REDIS)
   async def get(self, key: str) -> Any:
-    """Get value from Redis with automatic JSON deserialization."""
+    """Get value from Redis with automatic deserialization."""
     try:
-      value = await self.connection.get(key)
-      if value is None:
-        return None
-      
-      try:
-        return json.loads(value)
-      except json.JSONDecodeError:
+      if self.near_cache is None:
+        return self.serializer.loads(await self.connection.get(key))
+
+      value = self.near_cache.get(key)
+      if value is not MISSING:
         return value
-            
+      generation = self.near_cache.generation
+      pipe = self.connection.pipeline(transaction=False)
+      pipe.get(key)
+      pipe.pttl(key)
+      data, pttl = await pipe.execute()
+      value = self.serializer.loads(data)
+      if value is not None:
+        self._remember(key, value, pttl, generation)
+      return value
+
     except Exception as e:
       logger.error(f"Error getting key {key}: {str(e)}")
       raise RedisOperationError(f"Failed to get key: {str(e)}")
 
+  @timed(BACKEND_REDIS)
   async def set(
     self, 
     key: str, 
@@ -83,31 +227,46 @@ class RedisClient:
     expire: Optional[int] = DEFAULT_EXPIRE,
     nx: bool = False
   ) -> bool:
-    """Set value in Redis with automatic JSON serialization."""
+    """Set value in Redis with automatic serialization."""
     try:
-      if isinstance(value, (dict, list)):
-        value = json.dumps(value)
+      value = self.serializer.dumps(value)
           
       options = {}
       if nx:
         options['nx'] = True
       if expire:
         options['ex'] = expire
-          
-      return await self.connection.set(key, value, **options)
+
+      if self.near_cache is None:
+        return await self.connection.set(key, value, **options)
+
+      pipe = self.connection.pipeline(transaction=False)
+      pipe.set(key, value, **options)
+      self._invalidate(pipe, keys=[key])
+      results = await pipe.execute()
+      return results[0]
         
     except Exception as e:
       logger.error(f"Error setting key {key}: {str(e)}")
       raise RedisOperationError(f"Failed to set key: {str(e)}")
 
+  @timed(BACKEND_REDIS)
   async def delete(self, key: str) -> bool:
     """Delete a key from Redis."""
     try:
-      return bool(await self.connection.delete(key))
+      if self.near_cache is None:
+        return bool(await self.connection.delete(key))
+
+      pipe = self.connection.pipeline(transaction=False)
+      pipe.delete(key)
+      self._invalidate(pipe, keys=[key])
+      results = await pipe.execute()
+      return bool(results[0])
     except Exception as e:
       logger.error(f"Error deleting key {key}: {str(e)}")
       raise RedisOperationError(f"Failed to delete key: {str(e)}")
 
+  @timed(BACKEND_REDIS)
   async def delete_pattern(self, pattern: str) -> int:
     """Delete all keys matching pattern."""
     try:
@@ -126,7 +285,12 @@ class RedisClient:
         
         if cursor == 0:
           break
-              
+
+      if self.near_cache is not None:
+        pipe = self.connection.pipeline(transaction=False)
+        self._invalidate(pipe, patterns=[pattern])
+        await pipe.execute()
+
       logger.info(f"Deleted {deleted_count} keys matching pattern: {pattern}")
       return deleted_count
         
@@ -134,6 +298,7 @@ class RedisClient:
       logger.error(f"Error deleting pattern {pattern}: {str(e)}")
       raise RedisOperationError(f"Failed to delete pattern: {str(e)}")
 
+  @timed(BACKEND_REDIS)
   async def increment(
     self, 
     key: str, 
@@ -145,7 +310,8 @@ class RedisClient:
       pipe.incr(key)
       if expire:
         pipe.expire(key, expire)
-      
+      self._invalidate(pipe, keys=[key])
+
       results = await pipe.execute()
       return results[0]  # Return the increment result
         
@@ -153,6 +319,24 @@ class RedisClient:
       logger.error(f"Error incrementing key {key}: {str(e)}")
       raise RedisOperationError(f"Failed to increment key: {str(e)}")
 
+  @timed(BACKEND_REDIS)
+  async def run_script(
+    self,
+    script: str,
+    keys: List[str] = (),
+    args: List[Any] = ()
+  ) -> Any:
+    """Run a Lua script by SHA, loading it on the first call."""
+    try:
+      command = self._scripts.get(script)
+      if command is None:
+        command = self._scripts[script] = self.connection.register_script(script)
+      return await command(keys=list(keys), args=list(args))
+
+    except Exception as e:
+      logger.error(f"Error running script on {keys}: {str(e)}")
+      raise RedisOperationError(f"Failed to run script: {str(e)}")
+
   async def health_check(self) -> dict:
     """Check Redis connection health."""
     try:
@@ -170,6 +354,10 @@ class RedisClient:
 
   async def close(self) -> None:
     """Close Redis connection."""
+    if self._listener is not None:
+      # Exits within INVALIDATION_POLL_TIMEOUT; not joined to keep the loop free
+      self._listener_stop.set()
+      self._listener = None
     if self.connection:
       await self.connection.close()
       self.connection = None
@@ -181,18 +369,40 @@ class RedisClient:
   async def __aexit__(self, exc_type, exc_val, exc_tb):
     await self.close()
 
+  @timed(BACKEND_REDIS)
   async def get_many(self, keys: List[str]) -> dict:
     """Get multiple values at once."""
     try:
-      pipe = self.connection.pipeline()
-      for key in keys:
-        pipe.get(key)
-      values = await pipe.execute()
-      return {k: v for k, v in zip(keys, values) if v is not None}
+      result = {}
+      if self.near_cache is not None:
+        for key in keys:
+          value = self.near_cache.get(key)
+          if value is not MISSING:
+            result[key] = value
+        keys = [key for key in keys if key not in result]
+        generation = self.near_cache.generation
+
+      if keys:
+        pipe = self.connection.pipeline()
+        for key in keys:
+          pipe.get(key)
+          if self.near_cache is not None:
+            pipe.pttl(key)
+        values = await pipe.execute()
+        step = 1 if self.near_cache is None else 2
+        for i, key in enumerate(keys):
+          value = values[i * step]
+          if value is None:
+            continue
+          result[key] = self.serializer.loads(value)
+          if self.near_cache is not None:
+            self._remember(key, result[key], values[i * step + 1], generation)
+      return result
     except Exception as e:
       logger.error(f"Error getting multiple keys: {str(e)}")
       raise RedisOperationError(f"Failed to get multiple keys: {str(e)}")
 
+  @timed(BACKEND_REDIS)
   async def set_many(
     self,
     mapping: dict,
@@ -202,11 +412,81 @@ class RedisClient:
     try:
       pipe = self.connection.pipeline()
       for key, value in mapping.items():
-        if isinstance(value, (dict, list)):
-          value = json.dumps(value)
-        pipe.set(key, value, ex=expire)
+        pipe.set(key, self.serializer.dumps(value), ex=expire)
+      self._invalidate(pipe, keys=list(mapping))
       results = await pipe.execute()
+      if self.near_cache is not None:
+        results = results[:-1]
       return all(results)
     except Exception as e:
       logger.error(f"Error setting multiple keys: {str(e)}")
-      raise RedisOperationError(f"Failed to set multiple keys: {str(e)}")
\ No newline at end of file
+      raise RedisOperationError(f"Failed to set multiple keys: {str(e)}")
+
+  @timed(BACKEND_REDIS)
+  async def hash_get(self, key: str, fields: List[str]) -> dict:
+    """Get fields of a hash, leaving out missing ones. Hashes bypass the near cache."""
+    try:
+      fields = [str(field) for field in fields]
+      if not fields:
+        return {}
+      values = await self.connection.hmget(key, fields)
+      return {
+        field: self.serializer.loads(value)
+        for field, value in zip(fields, values)
+        if value is not None
+      }
+    except Exception as e:
+      logger.error(f"Error getting fields of hash {key}: {str(e)}")
+      raise RedisOperationError(f"Failed to get hash fields: {str(e)}")
+
+  @timed(BACKEND_REDIS)
+  async def hash_get_all(self, key: str) -> dict:
+    """Get every field of a hash."""
+    try:
+      values = await self.connection.hgetall(key)
+      return {
+        field.decode(): self.serializer.loads(value)
+        for field, value in values.items()
+      }
+    except Exception as e:
+      logger.error(f"Error getting hash {key}: {str(e)}")
+      raise RedisOperationError(f"Failed to get hash: {str(e)}")
+
+  @timed(BACKEND_REDIS)
+  async def hash_update(self, key: str, mapping: dict, delete: List[str] = ()) -> None:
+    """Set and remove fields of a hash in one round trip."""
+    try:
+      pipe = self.connection.pipeline()
+      if mapping:
+        pipe.hset(key, mapping={
+          str(field): self.serializer.dumps(value)
+          for field, value in mapping.items()
+        })
+      if delete:
+        pipe.hdel(key, *[str(field) for field in delete])
+      await pipe.execute()
+    except Exception as e:
+      logger.error(f"Error updating hash {key}: {str(e)}")
+      raise RedisOperationError(f"Failed to update hash: {str(e)}")
+
+  @timed(BACKEND_REDIS)
+  async def hash_replace(self, key: str, mapping: dict) -> None:
+    """Replace a whole hash; readers see either the old or the new one."""
+    try:
+      if not mapping:
+        await self.connection.delete(key)
+        return
+      staging = f"{key}:staging:{self._origin}"
+      pipe = self.connection.pipeline()
+      pipe.delete(staging)
+      items = [
+        (str(field), self.serializer.dumps(value))
+        for field, value in mapping.items()
+      ]
+      for start in range(0, len(items), SCAN_COUNT):
+        pipe.hset(staging, mapping=dict(items[start:start + SCAN_COUNT]))
+      pipe.rename(staging, key)
+      await pipe.execute()
+    except Exception as e:
+      logger.error(f"Error replacing hash {key}: {str(e)}")
+      raise RedisOperationError(f"Failed to replace hash: {str(e)}")
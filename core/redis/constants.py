@@ -4,6 +4,9 @@
 USER_PREFIX = "user:"
 CUSTOMER_PREFIX = "customer:"
 SESSION_PREFIX = "session:"
+LOGIN_ATTEMPT_PREFIX = "login_attempts:"
+PRINCIPAL_PREFIX = "principal:"
+MT5_ACCOUNT_PREFIX = "mt5:accounts:"
 
 # Default values
 DEFAULT_EXPIRE = 3600  # 1 hour
@@ -11,6 +14,27 @@ MAX_CONNECTIONS = 10
 SOCKET_TIMEOUT = 5
 SCAN_COUNT = 1000
 
+# Serialization settings
+DEFAULT_COMPRESS_THRESHOLD = 1024  # bytes
+
+# Near cache settings
+NEAR_CACHE_SIZE = 10000  # entries per process
+NEAR_CACHE_TTL = 60  # seconds, bounds staleness if an invalidation is missed
+INVALIDATION_CHANNEL = "cache:invalidate"
+INVALIDATION_RETRY_DELAY = 1  # seconds
+INVALIDATION_POLL_TIMEOUT = 1  # seconds the listener waits for a message before checking for close
+
+# Principal cache settings
+PRINCIPAL_CACHE_TTL = 300  # seconds in Redis
+PRINCIPAL_LOCAL_TTL = 5  # seconds in process, bounds staleness across processes
+PRINCIPAL_LOCAL_SIZE = 10000
+
+# Rate limit settings
+RATE_LIMIT_PREFIX = "ratelimit:"
+RATE_LIMIT_TIMEOUT = 0.05  # seconds before falling back to the local bucket
+RATE_LIMIT_BACKOFF = 5  # seconds to skip Redis after a failure
+RATE_LIMIT_FALLBACK_SIZE = 10000  # local buckets per process
+
 # Login attempt settings
 MAX_LOGIN_ATTEMPTS = 5
 LOGIN_ATTEMPT_EXPIRE = 3600  # 1 hour
\ No newline at end of file
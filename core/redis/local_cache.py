@@ -0,0 +1,100 @@
+"""In-process LRU cache with per-entry expiry."""
+import threading
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Hashable, Iterable, Optional, Tuple
+
+MISSING = object()
+
+class LocalCache:
+  def __init__(self, max_size: int, ttl: Optional[float] = None):
+    """
+    Initialize local cache
+
+    Args:
+      max_size: Maximum number of entries; the least recently used is evicted
+      ttl: Default seconds an entry stays valid, None for no expiry
+    """
+    self.max_size = max_size
+    self.ttl = ttl
+    self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = OrderedDict()
+    self._lock = threading.Lock()
+    # Bumped on every invalidation so readers can detect a racing one
+    self.generation = 0
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def get(self, key: Hashable, default: Any = MISSING) -> Any:
+    with self._lock:
+      entry = self._data.get(key)
+      if entry is None:
+        self.misses += 1
+        return default
+      value, expires_at = entry
+      if expires_at is not None and expires_at <= time.monotonic():
+        del self._data[key]
+        self.misses += 1
+        return default
+      self._data.move_to_end(key)
+      self.hits += 1
+      return value
+
+  def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+    with self._lock:
+      self._set_locked(key, value, ttl)
+
+  def set_if_generation(self, key: Hashable, value: Any, generation: int, ttl: Optional[float] = None) -> bool:
+    """Store a value only if nothing was invalidated since generation was read."""
+    with self._lock:
+      # Checked and stored together, so no invalidation can land in between
+      if self.generation != generation:
+        return False
+      self._set_locked(key, value, ttl)
+    return True
+
+  def _set_locked(self, key: Hashable, value: Any, ttl: Optional[float]) -> None:
+    ttl = self.ttl if ttl is None else ttl
+    expires_at = time.monotonic() + ttl if ttl is not None else None
+    self._data[key] = (value, expires_at)
+    self._data.move_to_end(key)
+    while len(self._data) > self.max_size:
+      self._data.popitem(last=False)
+      self.evictions += 1
+
+  def delete(self, key: Hashable) -> None:
+    self.delete_many((key,))
+
+  def delete_many(self, keys: Iterable[Hashable]) -> None:
+    with self._lock:
+      self.generation += 1
+      for key in keys:
+        self._data.pop(key, None)
+
+  def delete_pattern(self, pattern: str) -> None:
+    """Delete string keys matching a glob pattern."""
+    self.delete_matching(lambda key: isinstance(key, str) and fnmatchcase(key, pattern))
+
+  def delete_matching(self, predicate: Callable[[Hashable], bool]) -> None:
+    with self._lock:
+      self.generation += 1
+      for key in [key for key in self._data if predicate(key)]:
+        del self._data[key]
+
+  def clear(self) -> None:
+    with self._lock:
+      self.generation += 1
+      self._data.clear()
+
+  def stats(self) -> dict:
+    with self._lock:
+      return {
+        "size": len(self._data),
+        "hits": self.hits,
+        "misses": self.misses,
+        "evictions": self.evictions
+      }
+
+  def __len__(self) -> int:
+    return len(self._data)
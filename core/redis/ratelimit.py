@@ -0,0 +1,227 @@
+"""
+Rate limiting on Redis with the generic cell rate algorithm (GCRA).
+
+Each key stores a single timestamp, the theoretical arrival time of the next
+request, and one Lua script checks and advances it atomically, so a hit is
+one round trip and concurrent requests can't overshoot the limit. When Redis
+is slow or down, hits fall back to an in-process token bucket per key.
+
+Synchronous callers (the WSGI request path) use hit_sync, which runs the
+script on a thread-safe blocking client; hit is for code on a long-lived
+event loop.
+"""
+import asyncio
+import threading
+import time
+from typing import NamedTuple, Optional
+
+import redis as sync_redis
+from django.conf import settings
+
+from shared.utils.logger import logger
+from core.metrics.timing import timed
+from core.metrics.constants import BACKEND_REDIS
+from .client import RedisClient
+from .local_cache import LocalCache
+from .constants import (
+  RATE_LIMIT_PREFIX,
+  RATE_LIMIT_TIMEOUT,
+  RATE_LIMIT_BACKOFF,
+  RATE_LIMIT_FALLBACK_SIZE
+)
+
+# KEYS[1]: bucket key; ARGV: limit, period in seconds, cost.
+# Returns allowed, remaining, retry after and reset (seconds, as strings
+# because Lua numbers are truncated to integers on the way out).
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local interval = period / limit
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+  tat = now
+end
+
+local new_tat = tat + interval * cost
+local allow_at = new_tat - period
+if allow_at > now then
+  return {0, 0, tostring(allow_at - now), tostring(tat - now)}
+end
+
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+local remaining = math.floor((period - (new_tat - now)) / interval)
+return {1, remaining, '0', tostring(new_tat - now)}
+"""
+
+class RateLimit(NamedTuple):
+  allowed: bool
+  limit: int
+  remaining: int
+  # Seconds until the limit is fully available again
+  reset: float
+  # Seconds until the next request would be allowed
+  retry_after: float
+
+class TokenBucket:
+  """Thread-safe in-process token bucket."""
+
+  def __init__(self, limit: int, period: float):
+    self.limit = limit
+    self.rate = limit / period
+    self.tokens = float(limit)
+    self.updated = time.monotonic()
+    self._lock = threading.Lock()
+
+  def consume(self, cost: int = 1) -> RateLimit:
+    with self._lock:
+      now = time.monotonic()
+      self.tokens = min(self.limit, self.tokens + (now - self.updated) * self.rate)
+      self.updated = now
+
+      if self.tokens < cost:
+        return RateLimit(
+          allowed=False,
+          limit=self.limit,
+          remaining=0,
+          reset=(self.limit - self.tokens) / self.rate,
+          retry_after=(cost - self.tokens) / self.rate
+        )
+
+      self.tokens -= cost
+      return RateLimit(
+        allowed=True,
+        limit=self.limit,
+        remaining=int(self.tokens),
+        reset=(self.limit - self.tokens) / self.rate,
+        retry_after=0.0
+      )
+
+class RateLimiter:
+  def __init__(
+    self,
+    client: Optional[RedisClient] = None,
+    timeout: float = RATE_LIMIT_TIMEOUT,
+    fallback_size: int = RATE_LIMIT_FALLBACK_SIZE,
+    sync_client: Optional[sync_redis.Redis] = None
+  ):
+    """
+    Initialize rate limiter
+
+    Args:
+      client: Redis client for hit; by default one is created per event loop
+      timeout: Seconds to wait for Redis before using the local bucket
+      fallback_size: Maximum number of local buckets kept
+      sync_client: Blocking Redis client for hit_sync, shared by all threads;
+        by default one is created on first use
+    """
+    self._client = client
+    self._owns_client = client is None
+    self._loop: Optional[asyncio.AbstractEventLoop] = None
+    self._sync_client = sync_client
+    self._sync_script = None
+    self._sync_lock = threading.Lock()
+    self.timeout = timeout
+    self._buckets = LocalCache(max_size=fallback_size)
+    self._skip_until = 0.0
+
+  async def _redis(self) -> RedisClient:
+    # Async Redis connections are bound to the loop that created them
+    loop = asyncio.get_running_loop()
+    if self._owns_client and self._loop is not loop:
+      self._close_client()
+      self._client = RedisClient(near_cache=False)
+      self._loop = loop
+    await self._client.ensure_connection()
+    return self._client
+
+  def _close_client(self) -> None:
+    """Close the client of the previous event loop, it can't be used on this one."""
+    client, loop = self._client, self._loop
+    self._client = self._loop = None
+    if client is None or loop is None:
+      return
+    if loop.is_running():
+      asyncio.run_coroutine_threadsafe(client.close(), loop)
+    else:
+      # Nothing can run on a stopped loop; its sockets close when collected
+      logger.warning("Rate limiter event loop changed, dropping its Redis client")
+
+  def _script(self):
+    if self._sync_script is None:
+      with self._sync_lock:
+        if self._sync_script is None:
+          if self._sync_client is None:
+            self._sync_client = sync_redis.Redis(
+              host=settings.REDIS_HOST,
+              port=int(settings.REDIS_PORT),
+              password=settings.REDIS_PASSWORD,
+              socket_timeout=self.timeout,
+              socket_connect_timeout=self.timeout
+            )
+          # Runs by SHA, the source is only sent if Redis doesn't have it yet
+          self._sync_script = self._sync_client.register_script(GCRA_SCRIPT)
+    return self._sync_script
+
+  async def hit(self, key: str, limit: int, period: float, cost: int = 1) -> RateLimit:
+    """Count a request against key, allowing limit requests per period seconds."""
+    if time.monotonic() >= self._skip_until:
+      try:
+        reply = await asyncio.wait_for(
+          self._run(key, limit, period, cost),
+          timeout=self.timeout
+        )
+        return self._result(reply, limit)
+      except Exception as e:
+        self._redis_failed(e)
+
+    return self._local_hit(key, limit, period, cost)
+
+  def hit_sync(self, key: str, limit: int, period: float, cost: int = 1) -> RateLimit:
+    """hit for synchronous callers; the socket timeout bounds the wait for Redis."""
+    if time.monotonic() >= self._skip_until:
+      try:
+        return self._result(self._run_sync(key, limit, period, cost), limit)
+      except Exception as e:
+        self._redis_failed(e)
+
+    return self._local_hit(key, limit, period, cost)
+
+  @staticmethod
+  def _result(reply: list, limit: int) -> RateLimit:
+    allowed, remaining, retry_after, reset = reply
+    return RateLimit(
+      allowed=bool(allowed),
+      limit=limit,
+      remaining=int(remaining),
+      reset=float(reset),
+      retry_after=float(retry_after)
+    )
+
+  def _redis_failed(self, error: Exception) -> None:
+    logger.warning(f"Rate limiting on Redis failed, using local buckets: {error!r}")
+    self._skip_until = time.monotonic() + RATE_LIMIT_BACKOFF
+
+  async def _run(self, key: str, limit: int, period: float, cost: int) -> list:
+    redis = await self._redis()
+    return await redis.run_script(
+      GCRA_SCRIPT,
+      keys=[f"{RATE_LIMIT_PREFIX}{key}"],
+      args=[limit, period, cost]
+    )
+
+  @timed(BACKEND_REDIS, 'run_script')
+  def _run_sync(self, key: str, limit: int, period: float, cost: int) -> list:
+    return self._script()(keys=[f"{RATE_LIMIT_PREFIX}{key}"], args=[limit, period, cost])
+
+  def _local_hit(self, key: str, limit: int, period: float, cost: int) -> RateLimit:
+    bucket_key = (key, limit, period)
+    bucket = self._buckets.get(bucket_key, None)
+    if bucket is None:
+      bucket = TokenBucket(limit, period)
+      self._buckets.set(bucket_key, bucket)
+    return bucket.consume(cost)
@@ -0,0 +1,175 @@
+"""Value serialization for RedisClient."""
+import json
+import zlib
+from typing import Any, Optional
+
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+try:
+  import msgpack
+except ImportError:
+  msgpack = None
+
+try:
+  import lz4.frame as lz4
+except ImportError:
+  lz4 = None
+
+from .constants import DEFAULT_COMPRESS_THRESHOLD
+from .exceptions import RedisOperationError
+
+# Every encoded value starts with one header byte: the codec in the low bits
+# and the compression in bits 3-4. Headers are control characters other than
+# whitespace, so they never collide with values written before the header
+# existed (plain strings and JSON), which are still decoded as before.
+CODEC_STR = 0x01
+CODEC_BYTES = 0x02
+CODEC_JSON = 0x03
+CODEC_MSGPACK = 0x04
+CODEC_MASK = 0x07
+
+COMPRESS_NONE = 0x00
+COMPRESS_ZLIB = 0x10
+COMPRESS_LZ4 = 0x18
+COMPRESS_MASK = 0x18
+
+CODECS = {
+  'json': CODEC_JSON,
+  'orjson': CODEC_JSON,
+  'msgpack': CODEC_MSGPACK,
+}
+
+COMPRESSIONS = {
+  None: COMPRESS_NONE,
+  'zlib': COMPRESS_ZLIB,
+  'lz4': COMPRESS_LZ4,
+}
+
+HEADERS = frozenset(
+  codec | compression
+  for codec in (CODEC_STR, CODEC_BYTES, CODEC_JSON, CODEC_MSGPACK)
+  for compression in COMPRESSIONS.values()
+)
+
+DEFAULT_SERIALIZER = 'orjson' if orjson else 'json'
+
+def _json_dumps(value: Any) -> bytes:
+  if orjson:
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+  return json.dumps(value, default=str, separators=(',', ':')).encode()
+
+def _json_loads(payload: bytes) -> Any:
+  return orjson.loads(payload) if orjson else json.loads(payload)
+
+class Serializer:
+  def __init__(
+    self,
+    codec: str = DEFAULT_SERIALIZER,
+    compression: Optional[str] = None,
+    compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD
+  ):
+    """
+    Initialize serializer
+
+    Args:
+      codec: Codec for structured values: "orjson", "json" or "msgpack"
+      compression: None, "zlib" or "lz4"
+      compress_threshold: Minimum payload size in bytes to compress
+    """
+    if codec not in CODECS:
+      raise ImproperlyConfigured(f"Unknown Redis serializer: {codec}")
+    if codec == 'orjson' and orjson is None:
+      raise ImproperlyConfigured("Redis serializer 'orjson' requires the orjson package")
+    if codec == 'msgpack' and msgpack is None:
+      raise ImproperlyConfigured("Redis serializer 'msgpack' requires the msgpack package")
+    if compression not in COMPRESSIONS:
+      raise ImproperlyConfigured(f"Unknown Redis compression: {compression}")
+    if compression == 'lz4' and lz4 is None:
+      raise ImproperlyConfigured("Redis compression 'lz4' requires the lz4 package")
+
+    self.codec = CODECS[codec]
+    self.compression = COMPRESSIONS[compression]
+    self.compress_threshold = compress_threshold
+
+  def dumps(self, value: Any) -> bytes:
+    """Encode a value with its header byte."""
+    # Numbers stay plain so INCR/INCRBYFLOAT keep working on them
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+      return repr(value).encode()
+
+    if isinstance(value, str):
+      codec, payload = CODEC_STR, value.encode()
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+      codec, payload = CODEC_BYTES, bytes(value)
+    elif self.codec == CODEC_MSGPACK:
+      codec, payload = CODEC_MSGPACK, msgpack.packb(value, default=str, use_bin_type=True)
+    else:
+      codec, payload = CODEC_JSON, _json_dumps(value)
+
+    compression = COMPRESS_NONE
+    if self.compression and len(payload) >= self.compress_threshold:
+      compressed = self._compress(payload)
+      # Incompressible payloads are stored as they are
+      if len(compressed) < len(payload):
+        compression, payload = self.compression, compressed
+
+    return bytes((codec | compression,)) + payload
+
+  def loads(self, data: Optional[bytes]) -> Any:
+    """Decode a value written by dumps() or by an older client."""
+    if data is None:
+      return None
+    if isinstance(data, str):
+      data = data.encode()
+    if not data:
+      return ''
+
+    header = data[0]
+    codec = header & CODEC_MASK
+    compression = header & COMPRESS_MASK
+    if header not in HEADERS:
+      return self._loads_legacy(data)
+
+    payload = data[1:]
+    if compression:
+      payload = self._decompress(payload, compression)
+
+    if codec == CODEC_STR:
+      return payload.decode()
+    if codec == CODEC_BYTES:
+      return payload
+    if codec == CODEC_JSON:
+      return _json_loads(payload)
+    if msgpack is None:
+      raise RedisOperationError("Value was written with msgpack, which is not installed")
+    return msgpack.unpackb(payload, raw=False)
+
+  def _compress(self, payload: bytes) -> bytes:
+    if self.compression == COMPRESS_LZ4:
+      return lz4.compress(payload)
+    return zlib.compress(payload)
+
+  @staticmethod
+  def _decompress(payload: bytes, compression: int) -> bytes:
+    if compression == COMPRESS_ZLIB:
+      return zlib.decompress(payload)
+    if lz4 is None:
+      raise RedisOperationError("Value was compressed with lz4, which is not installed")
+    return lz4.decompress(payload)
+
+  @staticmethod
+  def _loads_legacy(data: bytes) -> Any:
+    """Decode untagged values: plain numbers, JSON or strings."""
+    try:
+      text = data.decode()
+    except UnicodeDecodeError:
+      return data
+    try:
+      return json.loads(text)
+    except ValueError:
+      return text
@@ -25,7 +25,9 @@ INSTALLED_APPS = [
   # Local apps
   # 'core.mt5',
   'core.mt5.apps.MT5Config',
+  'core.metrics.apps.MetricsConfig',
   'shared',
+  'apps.core.apps.CoreConfig',
   'apps.cp.authentication.apps.AuthConfig',
   # 'apps.cp.profiles',
   # 'apps.cp.transactions',
@@ -37,6 +39,10 @@ INSTALLED_APPS = [
 
 AUTH_USER_MODEL = 'models.Customer'
 
+AUTHENTICATION_BACKENDS = [
+  'apps.cp.authentication.backends.PooledPasswordBackend',
+]
+
 REST_FRAMEWORK = {
   'DEFAULT_AUTHENTICATION_CLASSES': [
     'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -64,9 +70,20 @@ DATABASES = {
 # Redis settings
 REDIS_HOST = env('REDIS_HOST')
 REDIS_PORT = env('REDIS_PORT', default='6379')
+REDIS_PASSWORD = env('REDIS_PASSWORD', default=None)
 SOCKET_TIMEOUT = 5
 MAX_CONNECTIONS = 20
 
+# RedisClient value encoding: orjson, json or msgpack; compression: zlib or lz4
+REDIS_SERIALIZER = env('REDIS_SERIALIZER', default='orjson')
+REDIS_COMPRESSION = env('REDIS_COMPRESSION', default=None)
+REDIS_COMPRESS_THRESHOLD = env.int('REDIS_COMPRESS_THRESHOLD', default=1024)
+
+# Per-process LRU in front of RedisClient, kept coherent over pub/sub
+REDIS_NEAR_CACHE = env.bool('REDIS_NEAR_CACHE', default=False)
+REDIS_NEAR_CACHE_SIZE = env.int('REDIS_NEAR_CACHE_SIZE', default=10000)
+REDIS_NEAR_CACHE_TTL = env.int('REDIS_NEAR_CACHE_TTL', default=60)
+
 # Elasticsearch settings
 ELASTICSEARCH_HOST = env('ELASTICSEARCH_HOST')
 ELASTICSEARCH_PORT = env('ELASTICSEARCH_PORT', default='9200')
@@ -176,3 +193,39 @@ APPEND_SLASH = False
 
 # Add after DATABASES config
 ELASTICSEARCH_INDEX_PREFIX = env('ELASTICSEARCH_INDEX_PREFIX', default='dev')
+
+# Elasticsearch search result cache (stored in Redis)
+ELASTICSEARCH_SEARCH_CACHE = env.bool('ELASTICSEARCH_SEARCH_CACHE', default=False)
+ELASTICSEARCH_SEARCH_CACHE_TTL = env.int('ELASTICSEARCH_SEARCH_CACHE_TTL', default=30)
+# Seconds after a write without refresh during which responses aren't cached
+ELASTICSEARCH_SEARCH_CACHE_WRITE_HOLD = env.int('ELASTICSEARCH_SEARCH_CACHE_WRITE_HOLD', default=2)
+
+# MT5 manager connections, established in the background once apps are ready.
+# Disable for processes that don't serve requests (migrations, shells, workers).
+MT5_ENABLED = env.bool('MT5_ENABLED', default=True)
+MT5_POOL_SIZE = env.int('MT5_POOL_SIZE', default=4)
+# Unix time the first deal backfill starts from while no deals are stored;
+# defaults to a day before startup
+MT5_DEAL_BACKFILL_START = env.int('MT5_DEAL_BACKFILL_START', default=None)
+
+# Async SQLAlchemy engine (core.db) used by read-heavy async code paths
+DB_POOL_SIZE = env.int('DB_POOL_SIZE', default=20)
+DB_MAX_OVERFLOW = env.int('DB_MAX_OVERFLOW', default=10)
+DB_POOL_TIMEOUT = env.int('DB_POOL_TIMEOUT', default=5)
+DB_POOL_RECYCLE = env.int('DB_POOL_RECYCLE', default=1800)
+DB_POOL_PRE_PING = env.bool('DB_POOL_PRE_PING', default=True)
+# Set to 0 when connecting through pgbouncer in transaction pooling mode
+DB_STATEMENT_CACHE_SIZE = env.int('DB_STATEMENT_CACHE_SIZE', default=100)
+DB_ECHO = env.bool('DB_ECHO', default=False)
+
+# Log shipping to Elasticsearch (shared.utils.logger.ESHandler)
+LOG_SHIPPING_ENABLED = env.bool('LOG_SHIPPING_ENABLED', default=True)
+# Batches are kept here while Elasticsearch is unreachable
+LOG_SPOOL_DIR = env('LOG_SPOOL_DIR', default=str(BASE_DIR / 'var' / 'log-spool'))
+
+# Request metrics (core.metrics): Server-Timing response header and the
+# Prometheus /metrics endpoint. Both expose routes and backend latencies:
+# the header is only sent when DEBUG is on unless set here, and /metrics
+# answers 404 until METRICS_TOKEN is set, then requires it as a bearer token.
+METRICS_SERVER_TIMING = env.bool('METRICS_SERVER_TIMING', default=None)
+METRICS_TOKEN = env('METRICS_TOKEN', default=None)
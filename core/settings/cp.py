@@ -1,9 +1,11 @@
+from datetime import timedelta
 from .base import *
 
 # CP-specific settings
 ALLOWED_HOSTS = env.list('CP_ALLOWED_HOSTS', default=['*'])
 
 MIDDLEWARE = [
+  'core.metrics.middleware.MetricsMiddleware',
   'django.middleware.security.SecurityMiddleware',
   'django.contrib.sessions.middleware.SessionMiddleware',
   'corsheaders.middleware.CorsMiddleware',
@@ -15,6 +17,19 @@ MIDDLEWARE = [
   'apps.cp.authentication.middleware.RateLimitMiddleware',
 ]
 
+# Rate limit policies; the first matching path prefix applies. KEY is "ip"
+# or "user" (anonymous requests are limited by ip). Override with a JSON
+# list in the CP_RATE_LIMITS environment variable.
+CP_RATE_LIMITS = env.json('CP_RATE_LIMITS', default=[
+  {'PATH': '/api/v1/cp/auth/', 'LIMIT': 20, 'PERIOD': 60, 'KEY': 'ip'},
+  {'PATH': '/api/v1/cp/', 'LIMIT': 100, 'PERIOD': 60, 'KEY': 'user'},
+])
+
+# Resolve tokens to cached principals instead of loading the Customer
+REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] = [
+  'apps.cp.authentication.authentication.CPJWTAuthentication',
+]
+
 # CP-specific JWT settings
 SIMPLE_JWT = {
   'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
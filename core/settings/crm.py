@@ -4,6 +4,7 @@ from .base import *
 ALLOWED_HOSTS = env.list('CRM_ALLOWED_HOSTS', default=['*'])
 
 MIDDLEWARE = [
+  'core.metrics.middleware.MetricsMiddleware',
   'django.middleware.security.SecurityMiddleware',
   'django.contrib.sessions.middleware.SessionMiddleware',
   'corsheaders.middleware.CorsMiddleware',
@@ -18,4 +19,6 @@ MIDDLEWARE = [
 # CRM-specific permissions
 REST_FRAMEWORK['DEFAULT_PERMISSION_CLASSES'] = [
   'apps.crm.core.permissions.IsStaffUser',
-]
\ No newline at end of file
+]
+# Lists report the planner's row estimate instead of COUNT(*) above this many rows
+CRM_COUNT_ESTIMATE_THRESHOLD = env.int('CRM_COUNT_ESTIMATE_THRESHOLD', default=10000)
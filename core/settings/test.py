@@ -5,6 +5,12 @@ DEBUG = False
 ELASTICSEARCH_INDEX_PREFIX = 'test'
 SECRET_KEY = 'django-insecure-test-key-do-not-use-in-production'
 
+# Never connect to MT5 servers from tests
+MT5_ENABLED = False
+
+# Don't ship application logs to Elasticsearch from tests
+LOG_SHIPPING_ENABLED = False
+
 # Test Database
 DATABASES = {
   'default': {
@@ -1,8 +1,9 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
 @api_view(['GET'])
+@authentication_classes([])
 @permission_classes([AllowAny])
 def api_root(request):
     return Response({
@@ -10,5 +10,6 @@ class ModelsConfig(AppConfig):
     try:
       import models.customers.models
       import models.customers.signals
+      import models.deals.models
     except ImportError:
       pass
\ No newline at end of file
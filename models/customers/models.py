@@ -40,4 +40,9 @@ class Customer(AbstractUser, BaseModel):
 
   class Meta:
     app_label = 'models'
-    db_table = 'customers'
\ No newline at end of file
+    db_table = 'customers'
+    indexes = [
+      # Keyset pagination of the CRM list, newest first
+      models.Index(fields=['created_at', 'id'], name='customers_created_id_idx'),
+      models.Index(fields=['status', 'created_at', 'id'], name='customers_status_created_idx')
+    ]
@@ -0,0 +1,3 @@
+from .models import Deal
+
+__all__ = ['Deal']
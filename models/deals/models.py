@@ -0,0 +1,38 @@
+import uuid
+from django.db import models
+from models.base import BaseModel
+
+# Namespace for deal primary keys derived from (server_id, ticket)
+DEAL_NAMESPACE = uuid.UUID('6f1c2d8e-4b7a-5e93-9a0d-3c5f8e2b1a47')
+
+class Deal(BaseModel):
+  server_id = models.PositiveSmallIntegerField()
+  ticket = models.BigIntegerField()
+  order = models.BigIntegerField()
+  login = models.BigIntegerField()
+  time = models.DateTimeField()
+  symbol = models.CharField(max_length=32, blank=True)
+  action = models.PositiveSmallIntegerField()
+  entry = models.PositiveSmallIntegerField()
+  volume = models.BigIntegerField()
+  price = models.DecimalField(max_digits=20, decimal_places=8)
+  commission = models.DecimalField(max_digits=20, decimal_places=8)
+  profit = models.DecimalField(max_digits=20, decimal_places=8)
+  comment = models.CharField(max_length=64, blank=True)
+  dealer = models.BigIntegerField()
+
+  @staticmethod
+  def make_id(server_id: int, ticket: int) -> uuid.UUID:
+    """Stable primary key, so a deal written twice maps to the same row and document."""
+    return uuid.uuid5(DEAL_NAMESPACE, f"{server_id}:{ticket}")
+
+  class Meta:
+    app_label = 'models'
+    db_table = 'deals'
+    constraints = [
+      models.UniqueConstraint(fields=['server_id', 'ticket'], name='deals_server_ticket_uniq')
+    ]
+    indexes = [
+      models.Index(fields=['login', 'time'], name='deals_login_time_idx'),
+      models.Index(fields=['server_id', 'time'], name='deals_server_time_idx')
+    ]
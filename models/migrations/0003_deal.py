@@ -0,0 +1,47 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:31
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0002_alter_customer_managers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Deal',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.UUIDField(blank=True, null=True)),
+                ('updated_by', models.UUIDField(blank=True, null=True)),
+                ('server_id', models.PositiveSmallIntegerField()),
+                ('ticket', models.BigIntegerField()),
+                ('order', models.BigIntegerField()),
+                ('login', models.BigIntegerField()),
+                ('time', models.DateTimeField()),
+                ('symbol', models.CharField(blank=True, max_length=32)),
+                ('action', models.PositiveSmallIntegerField()),
+                ('entry', models.PositiveSmallIntegerField()),
+                ('volume', models.BigIntegerField()),
+                ('price', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('commission', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('profit', models.DecimalField(decimal_places=8, max_digits=20)),
+                ('comment', models.CharField(blank=True, max_length=64)),
+                ('dealer', models.BigIntegerField()),
+            ],
+            options={
+                'db_table': 'deals',
+                'indexes': [models.Index(fields=['login', 'time'], name='deals_login_time_idx'), models.Index(fields=['server_id', 'time'], name='deals_server_time_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='deal',
+            constraint=models.UniqueConstraint(fields=('server_id', 'ticket'), name='deals_server_ticket_uniq'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+from models.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('models', '0003_deal'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='customer',
+            index=models.Index(fields=['created_at', 'id'], name='customers_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='customer',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='customers_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,10 @@
+"""Log shipping constants."""
+
+LOG_BUFFER_SIZE = 10000  # records held in memory before new ones are dropped
+LOG_BATCH_SIZE = 500  # records per bulk request
+LOG_FLUSH_INTERVAL = 1.0  # seconds a record waits before being shipped
+LOG_RETRY_DELAY = 5.0  # seconds batches go straight to the spool after a failure
+LOG_REQUEST_TIMEOUT = 5  # seconds per bulk request
+LOG_SPOOL_MAX_BYTES = 100 * 1024 * 1024  # spool size per process before batches are dropped
+LOG_STOP_TIMEOUT = 5  # seconds to ship what is buffered on shutdown
+LOG_INDEX_NAME = 'audit_logs'  # shipped to <prefix>_audit_logs-YYYY.MM.DD
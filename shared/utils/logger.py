@@ -1,18 +1,133 @@
+"""
+Application logger.
+
+Records of the "app" logger go to the console and to Elasticsearch through
+ESHandler. emit only copies the record into a bounded in-memory buffer; a
+background thread ships the buffer with the bulk API, in batches, to one
+index per day. While Elasticsearch is unreachable, batches are appended to
+a spool file on disk and replayed once it answers again. When the buffer
+or the spool is full, records are dropped and counted rather than making
+callers wait.
+"""
+import glob
+import itertools
+import json
 import logging
-from datetime import datetime
-from typing import Any, Dict
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from shared.utils.constants import (
+    LOG_BUFFER_SIZE,
+    LOG_BATCH_SIZE,
+    LOG_FLUSH_INTERVAL,
+    LOG_RETRY_DELAY,
+    LOG_REQUEST_TIMEOUT,
+    LOG_SPOOL_MAX_BYTES,
+    LOG_STOP_TIMEOUT,
+    LOG_INDEX_NAME
+)
+
+# Attributes every LogRecord has; anything else was passed with extra=
+RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord('', 0, '', 0, '', (), None).__dict__
+) | {'message', 'asctime'}
+
+SPOOL_PATTERN = 'es-log-spool-*'
+
+_formatter = logging.Formatter()
 
 class ESHandler(logging.Handler):
+    def __init__(
+        self,
+        capacity: int = LOG_BUFFER_SIZE,
+        batch_size: int = LOG_BATCH_SIZE,
+        flush_interval: float = LOG_FLUSH_INTERVAL,
+        spool_dir: Optional[str] = None,
+        client: Any = None,
+        level: int = logging.NOTSET
+    ):
+        """
+        Initialize Elasticsearch log handler
+
+        Args:
+            capacity: Records buffered in memory before new ones are dropped
+            batch_size: Records per bulk request
+            flush_interval: Maximum seconds a record waits before being shipped
+            spool_dir: Where batches are kept while Elasticsearch is down,
+                defaults to the LOG_SPOOL_DIR setting
+            client: Elasticsearch client, defaults to one built from settings
+                by the shipper thread
+        """
+        super().__init__(level)
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._spool_dir = spool_dir
+        self._buffer: deque = deque()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._client = client
+        self._retry_at = 0.0
+        # None until Django settings can be read
+        self._enabled: Optional[bool] = None
+
+        # Only changed under the handler lock (emit) or by the shipper thread
+        self.stats = {
+            "emitted": 0,
+            "dropped": 0,
+            "shipped": 0,
+            "rejected": 0,
+            "failed_requests": 0,
+            "spooled": 0,
+            "spool_dropped": 0,
+            "replayed": 0
+        }
+
     def emit(self, record: logging.LogRecord) -> None:
+        """Buffer a record; never blocks on Elasticsearch."""
+        if self._enabled is None:
+            self._enabled = self._is_enabled()
+        if not self._enabled or record.name.startswith('elastic'):
+            # The client's own transport logs would feed back into the handler
+            return
+
         try:
-            log_entry = self.format_log_entry(record)
-            print(f"ES Log: {log_entry}")
-        except Exception as e:
-            print(f"Failed to log to Elasticsearch: {str(e)}")
+            entry = self.format_log_entry(record)
+        except Exception:
+            self.handleError(record)
+            return
+
+        if len(self._buffer) >= self.capacity:
+            self.stats["dropped"] += 1
+            return
+        self._buffer.append(entry)
+        self.stats["emitted"] += 1
+
+        if self._pid != os.getpid():
+            # First record, or first one after a fork: the thread didn't survive it
+            self._start()
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    @staticmethod
+    def _is_enabled() -> Optional[bool]:
+        from django.conf import settings
+        if not settings.configured:
+            return None
+        return getattr(settings, 'LOG_SHIPPING_ENABLED', True)
 
     def format_log_entry(self, record: logging.LogRecord) -> Dict[str, Any]:
-        return {
-            'timestamp': datetime.utcnow().isoformat(),
+        entry = {
+            # Kept as a float until shipped, converting it is not free
+            '@timestamp': record.created,
             'level': record.levelname,
             'message': record.getMessage(),
             'module': record.module,
@@ -20,6 +135,204 @@ class ESHandler(logging.Handler):
             'line': record.lineno,
             'logger': record.name
         }
+        extra = {
+            key: value for key, value in record.__dict__.items()
+            if key not in RECORD_ATTRIBUTES
+        }
+        if extra:
+            entry['extra'] = extra
+        if record.exc_info:
+            entry['exception'] = _formatter.formatException(record.exc_info)
+        return entry
+
+    def _start(self) -> None:
+        if self._pid is not None:
+            # Forked: don't share the parent's connections
+            self._client = None
+        self._pid = os.getpid()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="es-log-shipper", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._ship_buffer()
+        self._ship_buffer()
+
+    def _ship_buffer(self) -> None:
+        while self._buffer:
+            batch = []
+            while self._buffer and len(batch) < self.batch_size:
+                batch.append(self._buffer.popleft())
+            self._ship(batch)
+
+    def _ship(self, batch: List[Dict[str, Any]]) -> None:
+        if time.monotonic() < self._retry_at:
+            self._spool(batch)
+            return
+        if self._send(batch):
+            self._replay_spool()
+        else:
+            self._retry_at = time.monotonic() + LOG_RETRY_DELAY
+            self._spool(batch)
+
+    def _get_client(self):
+        if self._client is None:
+            from django.conf import settings
+            from elasticsearch import Elasticsearch
+
+            config = {
+                "hosts": [f"http://{settings.ELASTICSEARCH_HOST}:{settings.ELASTICSEARCH_PORT}"],
+                "verify_certs": False,
+                "max_retries": 0,
+                "request_timeout": LOG_REQUEST_TIMEOUT
+            }
+            if hasattr(settings, 'ELASTICSEARCH_USER') and hasattr(settings, 'ELASTICSEARCH_PASSWORD'):
+                config["basic_auth"] = (settings.ELASTICSEARCH_USER, settings.ELASTICSEARCH_PASSWORD)
+            self._client = Elasticsearch(**config)
+        return self._client
+
+    @staticmethod
+    def get_index_name(created: float) -> str:
+        """Dated index a record created at a timestamp is shipped to."""
+        from django.conf import settings
+        day = time.strftime('%Y.%m.%d', time.gmtime(created))
+        return f"{settings.ELASTICSEARCH_INDEX_PREFIX}_{LOG_INDEX_NAME}-{day}"
+
+    def _send(self, entries: List[Dict[str, Any]]) -> bool:
+        """Ship entries in one bulk request; False if Elasticsearch couldn't be reached."""
+        if not entries:
+            return True
+        # Serialized here so values passed with extra= that JSON can't encode become strings
+        operations = []
+        for entry in entries:
+            created = entry['@timestamp']
+            operations.append(json.dumps({"create": {"_index": self.get_index_name(created)}}))
+            operations.append(json.dumps({
+                **entry,
+                '@timestamp': datetime.fromtimestamp(created, tz=timezone.utc).isoformat()
+            }, default=str))
+
+        try:
+            response = self._get_client().bulk(operations=operations)
+        except Exception as e:
+            self.stats["failed_requests"] += 1
+            self._report(f"Failed to ship {len(entries)} log records: {str(e)}")
+            return False
+
+        rejected = 0
+        if response.get("errors"):
+            # Rejected documents would be rejected again, so they are not retried
+            rejected = sum(
+                1 for item in response["items"]
+                if item.get("create", {}).get("error")
+            )
+        self.stats["rejected"] += rejected
+        self.stats["shipped"] += len(entries) - rejected
+        return True
+
+    def get_spool_dir(self) -> str:
+        if self._spool_dir is None:
+            from django.conf import settings
+            self._spool_dir = getattr(
+                settings,
+                'LOG_SPOOL_DIR',
+                os.path.join(tempfile.gettempdir(), 'log-spool')
+            )
+        return self._spool_dir
+
+    def _spool_path(self) -> str:
+        return os.path.join(self.get_spool_dir(), f"es-log-spool-{os.getpid()}.ndjson")
+
+    def _spool(self, entries: List[Dict[str, Any]]) -> None:
+        self._spool_lines([json.dumps(entry, default=str) + '\n' for entry in entries])
+
+    def _spool_lines(self, lines: List[str]) -> None:
+        path = self._spool_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) >= LOG_SPOOL_MAX_BYTES:
+                self.stats["spool_dropped"] += len(lines)
+                return
+            with open(path, 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+            self.stats["spooled"] += len(lines)
+        except OSError as e:
+            self.stats["spool_dropped"] += len(lines)
+            self._report(f"Failed to spool log records: {str(e)}")
+
+    def _replay_spool(self) -> None:
+        """Ship spooled records, including those left by earlier processes."""
+        spool_dir = self.get_spool_dir()
+        if not os.path.isdir(spool_dir):
+            return
+        claimed = f"{self._spool_path()}.replay"
+        for path in glob.glob(os.path.join(spool_dir, SPOOL_PATTERN)):
+            if path.endswith('.replay') and self._is_running(path):
+                continue
+            # Claim the file so its writer appends to a new one meanwhile
+            try:
+                os.replace(path, claimed)
+            except OSError:
+                continue
+            if not self._replay_file(claimed):
+                return
+
+    @staticmethod
+    def _is_running(path: str) -> bool:
+        """Whether the process that claimed a spool file for replay is alive."""
+        try:
+            pid = int(os.path.basename(path).split('-')[3].split('.')[0])
+            os.kill(pid, 0)
+        except (IndexError, ValueError, ProcessLookupError):
+            return False
+        except OSError:
+            return True
+        return pid != os.getpid()
+
+    def _replay_file(self, path: str) -> bool:
+        shipped = True
+        with open(path, encoding='utf-8') as f:
+            while shipped:
+                lines = list(itertools.islice(f, self.batch_size))
+                if not lines:
+                    break
+                entries = []
+                for line in lines:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+                shipped = self._send(entries)
+                if shipped:
+                    self.stats["replayed"] += len(entries)
+                else:
+                    # Keep what wasn't shipped, without what already was
+                    self._retry_at = time.monotonic() + LOG_RETRY_DELAY
+                    self._spool_lines(lines + f.readlines())
+        os.remove(path)
+        return shipped
+
+    @staticmethod
+    def _report(message: str) -> None:
+        # Not through a logger: the failure would be shipped, and fail, again
+        if sys.stderr:
+            sys.stderr.write(f"ESHandler: {message}\n")
+
+    def flush(self) -> None:
+        """Ask the shipper to send what is buffered now."""
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """Ship buffered records, then stop the shipper."""
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            self._stopping.set()
+            self._wakeup.set()
+            thread.join(LOG_STOP_TIMEOUT)
+        super().close()
 
 # Create default logger instance
 logger = logging.getLogger('app')
@@ -35,4 +348,4 @@ logger.addHandler(console_handler)
 
 # Elasticsearch handler
 es_handler = ESHandler()
-logger.addHandler(es_handler) 
\ No newline at end of file
+logger.addHandler(es_handler)
@@ -0,0 +1,31 @@
+import time
+from benchmarks.harness import Benchmark, Timer, compare, percentile, summarize
+
+class TestTimer:
+  def test_records_measured_steps_only(self):
+    timer = Timer(iterations=5, warmup=3)
+    steps = sum(1 for _ in timer)
+    assert steps == 8
+    assert len(timer.samples) == 5
+
+  def test_paused_time_is_excluded(self):
+    timer = Timer(iterations=3, warmup=0)
+    for _ in timer:
+      with timer.paused():
+        time.sleep(0.01)
+    assert max(timer.samples) < 0.005
+
+class TestReport:
+  def test_percentiles(self):
+    samples = [n / 1000 for n in range(1, 101)]
+    assert percentile(samples, 0.5) == 0.05
+    assert percentile(samples, 0.99) == 0.099
+    result = summarize(Benchmark('x', None, 10, ''), samples)
+    assert result['items_per_second'] == result['ops_per_second'] * 10
+
+  def test_compare_flags_slower_medians(self):
+    baseline = {'results': {'redis.get': {'p50_ms': 0.1}, 'es.search': {'p50_ms': 1.0}}}
+    report = {'results': {'redis.get': {'p50_ms': 0.15}, 'es.search': {'p50_ms': 1.1}, 'new': {'p50_ms': 1}}}
+    regressions = compare(report, baseline, tolerance=0.2)
+    assert len(regressions) == 1
+    assert regressions[0].startswith('redis.get')
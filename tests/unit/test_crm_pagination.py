@@ -0,0 +1,61 @@
+import pytest
+from datetime import timedelta
+from urllib.parse import urlparse, parse_qs
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from apps.crm.core.pagination import KeysetPagination, approximate_count
+from tests.factories.customer import CustomerFactory
+
+Customer = get_user_model()
+
+def paginate(params):
+  paginator = KeysetPagination()
+  request = Request(APIRequestFactory().get('/customers/', params))
+  page = paginator.paginate_queryset(Customer.objects.all(), request)
+  return paginator, page
+
+def cursor_of(link):
+  return parse_qs(urlparse(link).query)['cursor'][0]
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+  @pytest.fixture(autouse=True)
+  def setup(self):
+    now = timezone.now()
+    # Three customers share a timestamp, so pages split on id
+    created = [now, now, now, now - timedelta(seconds=1), now - timedelta(seconds=2),
+               now - timedelta(seconds=3), now - timedelta(seconds=4)]
+    for created_at in created:
+      CustomerFactory(created_at=created_at)
+    self.expected = list(
+      Customer.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+    )
+
+  def test_pages_forward_and_back(self):
+    seen, pages, params = [], [], {'page_size': 3}
+    while True:
+      paginator, page = paginate(params)
+      pages.append([customer.id for customer in page])
+      seen.extend(pages[-1])
+      link = paginator.get_next_link()
+      if link is None:
+        break
+      params = {'page_size': 3, 'cursor': cursor_of(link)}
+    assert seen == self.expected
+    assert [len(page) for page in pages] == [3, 3, 1]
+
+    paginator, page = paginate({'page_size': 3, 'cursor': cursor_of(paginator.get_previous_link())})
+    assert [customer.id for customer in page] == pages[1]
+    assert paginator.get_next_link() is not None
+
+  def test_counts_exactly_below_threshold(self):
+    paginator, _ = paginate({})
+    assert (paginator.count, paginator.count_estimated) == (7, False)
+    assert approximate_count(Customer.objects.filter(status='inactive')) == (0, False)
+
+  def test_invalid_cursor(self):
+    with pytest.raises(NotFound):
+      paginate({'cursor': 'not-a-cursor'})
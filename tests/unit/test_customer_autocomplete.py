@@ -0,0 +1,93 @@
+import pytest
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.crm.customers.views import CustomerViewSet
+from core.elasticsearch.client import es_client
+from core.elasticsearch.exceptions import ESOperationError
+from core.elasticsearch.indices.customer import CustomerIndex
+from tests.factories.customer import CustomerFactory
+
+class TestCustomerAutocompleteIndex:
+  def test_analyzers_are_defined(self):
+    analyzers = CustomerIndex.get_settings()["analysis"]["analyzer"]
+    properties = CustomerIndex.get_mapping()["properties"]
+    for field in ('first_name', 'last_name', 'email', 'phone'):
+      subfield = properties[field]["fields"]["autocomplete"]
+      assert subfield["analyzer"] in analyzers
+      assert subfield["search_analyzer"] in analyzers
+    assert "custom_analyzer" in analyzers
+
+  def test_no_substring_ngrams(self):
+    settings = CustomerIndex.get_settings()
+    assert "max_ngram_diff" not in settings
+    assert all(f["type"] != "ngram" for f in settings["analysis"]["filter"].values())
+
+class TestCustomerAutocompleteQuery:
+  def test_filters_do_not_score(self):
+    query = CustomerIndex.autocomplete_query("jo sm", status="active", country="cy")["bool"]
+    assert query["filter"] == [
+      {"term": {"status": "active"}},
+      {"term": {"country": "CY"}}
+    ]
+    assert query["minimum_should_match"] == 1
+    fields = [
+      clause.get("multi_match", {}).get("fields") or list(clause["match"])
+      for clause in query["should"]
+    ]
+    assert ["first_name.autocomplete", "last_name.autocomplete"] in fields
+    assert ["email.autocomplete"] in fields
+
+  def test_phone_only_for_digits(self):
+    without_digits = CustomerIndex.autocomplete_query("john")["bool"]
+    with_digits = CustomerIndex.autocomplete_query("+357 99")["bool"]
+    assert len(with_digits["should"]) == len(without_digits["should"]) + 1
+    assert with_digits["filter"] == []
+
+@pytest.mark.django_db
+class TestCustomerAutocompleteView:
+  @pytest.fixture
+  def get(self):
+    staff = CustomerFactory(is_staff=True)
+    view = CustomerViewSet.as_view({'get': 'autocomplete'})
+
+    def get(**params):
+      request = APIRequestFactory().get('/api/v1/crm/customers/autocomplete/', params)
+      force_authenticate(request, user=staff)
+      return view(request)
+    return get
+
+  def test_returns_elasticsearch_hits(self, get, monkeypatch):
+    searches = []
+
+    def search_sync(**kwargs):
+      searches.append(kwargs)
+      return {'hits': {'hits': [{'_source': {'id': '1', 'email': 'jo@example.com'}}]}}
+
+    monkeypatch.setattr(es_client, 'search_sync', search_sync)
+    response = get(q='jo', country='cy', size=5)
+
+    assert response.status_code == 200
+    assert response.data == {'results': [{'id': '1', 'email': 'jo@example.com'}]}
+    assert searches[0]['size'] == 5 and searches[0]['track_total_hits'] is False
+
+  def test_falls_back_to_the_database(self, get, monkeypatch):
+    def search_sync(**kwargs):
+      raise ESOperationError("cluster is down")
+
+    monkeypatch.setattr(es_client, 'search_sync', search_sync)
+    match = CustomerFactory(first_name='Joanna', country='CY')
+    CustomerFactory(first_name='Joanna', country='GB')
+    CustomerFactory(first_name='Maria', country='CY')
+    # Wildcards in the text are matched literally
+    CustomerFactory(first_name='Jo%_', country='CY')
+
+    response = get(q='joan', country='cy')
+    assert response.status_code == 200
+    assert [row['id'] for row in response.data['results']] == [str(match.id)]
+    assert set(response.data['results'][0]) == set(CustomerIndex.AUTOCOMPLETE_SOURCE)
+    assert [row['first_name'] for row in get(q='%_').data['results']] == ['Jo%_']
+
+  def test_requires_staff(self, monkeypatch):
+    request = APIRequestFactory().get('/api/v1/crm/customers/autocomplete/', {'q': 'jo'})
+    force_authenticate(request, user=CustomerFactory())
+    response = CustomerViewSet.as_view({'get': 'autocomplete'})(request)
+    assert response.status_code == 403
@@ -0,0 +1,95 @@
+import asyncio
+import uuid
+from sqlalchemy.dialects import postgresql
+from core.db import repositories
+from core.db.repositories import CustomerRepository
+
+def compile(statement):
+  return statement.compile(dialect=postgresql.dialect())
+
+class FakeResult:
+  def __init__(self, rows):
+    self.rows = rows
+
+  def mappings(self):
+    return self
+
+  def first(self):
+    return self.rows[0] if self.rows else None
+
+  def scalar_one(self):
+    return self.rows[0]
+
+  def __iter__(self):
+    return iter(self.rows)
+
+class FakeSession:
+  def __init__(self, database):
+    self.database = database
+
+  async def __aenter__(self):
+    return self
+
+  async def __aexit__(self, *exc_info):
+    return False
+
+  async def execute(self, statement):
+    self.database.statements.append(statement)
+    return FakeResult(self.database.results.pop(0) if self.database.results else [])
+
+class FakeDatabase:
+  def __init__(self, *results):
+    self.results = list(results)
+    self.statements = []
+
+  def __call__(self):
+    return FakeSession(self)
+
+def customer(**fields):
+  data = {'id': uuid.uuid4(), 'email': 'trader@example.com', 'status': 'active'}
+  data.update(fields)
+  return data
+
+class TestCustomerRepository:
+  def test_invalid_id_skips_the_database(self):
+    database = FakeDatabase()
+    repository = CustomerRepository(session_factory=database)
+    assert asyncio.run(repository.get_profile('not-a-uuid')) is None
+    assert asyncio.run(repository.get_many(['not-a-uuid'])) == {}
+    assert database.statements == []
+
+  def test_profile_id_is_a_string(self):
+    row = customer()
+    repository = CustomerRepository(session_factory=FakeDatabase([row]))
+    profile = asyncio.run(repository.get_profile(row['id']))
+    assert profile['id'] == str(row['id'])
+
+  def test_get_many_is_chunked(self, monkeypatch):
+    monkeypatch.setattr(repositories, 'IN_CHUNK_SIZE', 2)
+    rows = [customer() for _ in range(3)]
+    database = FakeDatabase(rows[:2], rows[2:])
+    repository = CustomerRepository(session_factory=database)
+
+    customers = asyncio.run(repository.get_many([row['id'] for row in rows]))
+    assert set(customers) == {str(row['id']) for row in rows}
+    assert len(database.statements) == 2
+
+  def test_search_wildcards_are_literal(self):
+    database = FakeDatabase()
+    repository = CustomerRepository(session_factory=database)
+    asyncio.run(repository.search('50%_off\\', status='active', country='gb'))
+
+    compiled = compile(database.statements[0])
+    sql = str(compiled)
+    assert sql.count("ESCAPE '\\'") == 4
+    params = compiled.params
+    assert params['email_1'] == '%50\\%\\_off\\\\%'
+    assert 'GB' in params.values() and 'active' in params.values()
+
+  def test_count_applies_filters(self):
+    database = FakeDatabase([7])
+    repository = CustomerRepository(session_factory=database)
+    assert asyncio.run(repository.count('smith', status='blocked')) == 7
+
+    params = compile(database.statements[0]).params
+    assert params['email_1'] == '%smith%' and 'blocked' in params.values()
@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from core.elasticsearch.client import ESClient
+from core.elasticsearch.exceptions import ESOperationError
+
+class FakeConnection:
+  """Serves numbered documents from a point in time, page by page."""
+
+  def __init__(self, count, fail_after=None):
+    self.docs = [{'_id': str(i), '_source': {'n': i}, 'sort': [i]} for i in range(count)]
+    self.fail_after = fail_after
+    self.searches = []
+    self.opened = []
+    self.closed = []
+
+  async def open_point_in_time(self, index, keep_alive):
+    self.opened.append(index)
+    return {'id': 'pit-0'}
+
+  async def close_point_in_time(self, id):
+    self.closed.append(id)
+
+  async def search(self, pit, size, sort, search_after=None, slice=None, **params):
+    if self.fail_after is not None and len(self.searches) >= self.fail_after:
+      raise RuntimeError('search_phase_execution_exception')
+    self.searches.append({'pit': pit['id'], 'search_after': search_after, 'slice': slice})
+    docs = self.docs
+    if slice:
+      docs = [doc for doc in docs if int(doc['_id']) % slice['max'] == slice['id']]
+    if search_after:
+      docs = [doc for doc in docs if doc['sort'] > search_after]
+    # The point in time id changes between requests
+    return {'pit_id': f"pit-{len(self.searches)}", 'hits': {'hits': docs[:size]}}
+
+class TestIterSearch:
+  def client(self, connection):
+    client = ESClient()
+    client._initialized = True
+    client.connection = connection
+    return client
+
+  @pytest.mark.asyncio
+  async def test_pages_with_search_after(self):
+    connection = FakeConnection(7)
+    hits = [hit async for hit in self.client(connection).iter_search('test_customers', page_size=3)]
+    assert [hit['_id'] for hit in hits] == [str(i) for i in range(7)]
+    assert [search['search_after'] for search in connection.searches] == [None, [2], [5]]
+    # Each page is read from the latest point in time id
+    assert [search['pit'] for search in connection.searches] == ['pit-0', 'pit-1', 'pit-2']
+    # The latest id is closed, not the one the point in time was opened with
+    assert connection.closed == ['pit-3']
+
+  @pytest.mark.asyncio
+  async def test_full_last_page_needs_one_more_request(self):
+    connection = FakeConnection(6)
+    hits = [hit async for hit in self.client(connection).iter_search('test_customers', page_size=3)]
+    assert len(hits) == 6
+    assert len(connection.searches) == 3
+
+  @pytest.mark.asyncio
+  async def test_slices_cover_every_hit_once(self):
+    connection = FakeConnection(20)
+    hits = [
+      hit async for hit in self.client(connection).iter_search('test_customers', page_size=3, slices=4)
+    ]
+    assert sorted(int(hit['_id']) for hit in hits) == list(range(20))
+    assert {search['slice']['id'] for search in connection.searches} == {0, 1, 2, 3}
+    assert connection.closed == [f"pit-{len(connection.searches)}"]
+
+  @pytest.mark.asyncio
+  async def test_point_in_time_is_closed_on_early_exit(self):
+    connection = FakeConnection(20)
+    hits = self.client(connection).iter_search('test_customers', page_size=3, slices=2)
+    async for hit in hits:
+      break
+    await hits.aclose()
+    assert connection.closed == [f"pit-{len(connection.searches)}"]
+    # Slice readers were stopped, not left running against the closed point in time
+    searches = len(connection.searches)
+    await asyncio.sleep(0.01)
+    assert len(connection.searches) == searches
+
+  @pytest.mark.asyncio
+  async def test_point_in_time_is_closed_on_error(self):
+    connection = FakeConnection(20, fail_after=2)
+    with pytest.raises(ESOperationError):
+      async for _ in self.client(connection).iter_search('test_customers', page_size=3):
+        pass
+    assert connection.closed == ['pit-2']
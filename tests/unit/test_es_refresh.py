@@ -0,0 +1,90 @@
+import pytest
+from core.elasticsearch.client import ESClient
+from core.elasticsearch.constants import BULK_LOAD_SETTINGS
+from core.elasticsearch.indices import CustomerIndex
+
+class FakeIndices:
+  def __init__(self, settings):
+    self.settings = dict(settings)
+    self.put = []
+    self.refreshed = []
+
+  async def get_settings(self, index, flat_settings=False):
+    return {index: {'settings': dict(self.settings)}}
+
+  async def put_settings(self, index, settings):
+    self.put.append(settings['index'])
+    for name, value in settings['index'].items():
+      if value is None:
+        self.settings.pop(f'index.{name}', None)
+      else:
+        self.settings[f'index.{name}'] = value
+
+  async def refresh(self, index):
+    self.refreshed.append(index)
+
+class FakeConnection:
+  def __init__(self, settings=None):
+    self.indices = FakeIndices(settings or {})
+
+class TestRefreshPolicy:
+  @pytest.fixture(autouse=True)
+  def setup(self, settings):
+    settings.ELASTICSEARCH_REFRESH_POLICY = 'false'
+    self.client = ESClient()
+    self.index = CustomerIndex.get_index_name()
+
+  def test_explicit_policy_wins(self):
+    self.client._bulk_loading.add(self.index)
+    assert self.client.get_refresh_policy(self.index, 'wait_for') == 'wait_for'
+
+  def test_booleans_are_converted(self):
+    assert self.client.get_refresh_policy(self.index, True) == 'true'
+    assert self.client.get_refresh_policy(self.index, False) == 'false'
+
+  def test_falls_back_to_index_then_setting(self, settings, monkeypatch):
+    assert self.client.get_refresh_policy(self.index) == 'false'
+    settings.ELASTICSEARCH_REFRESH_POLICY = 'wait_for'
+    assert self.client.get_refresh_policy('unknown') == 'wait_for'
+    monkeypatch.setattr(CustomerIndex, 'REFRESH_POLICY', 'true')
+    assert self.client.get_refresh_policy(self.index) == 'true'
+
+  def test_bulk_loading_index_never_refreshes(self, monkeypatch):
+    monkeypatch.setattr(CustomerIndex, 'REFRESH_POLICY', 'true')
+    self.client._bulk_loading.add(self.index)
+    assert self.client.get_refresh_policy(self.index) == 'false'
+
+  def test_invalid_policy_is_rejected(self, settings):
+    with pytest.raises(ValueError):
+      self.client.get_refresh_policy(self.index, 'sometimes')
+    settings.ELASTICSEARCH_REFRESH_POLICY = 'always'
+    with pytest.raises(ValueError):
+      self.client.get_refresh_policy(self.index)
+
+class TestBulkLoad:
+  @pytest.fixture(autouse=True)
+  def setup(self):
+    self.client = ESClient()
+    self.client._initialized = True
+    self.client.connection = FakeConnection({'index.refresh_interval': '5s'})
+    self.indices = self.client.connection.indices
+
+  @pytest.mark.asyncio
+  async def test_settings_are_restored(self):
+    async with self.client.bulk_load('test_customers'):
+      assert self.indices.put[-1] == BULK_LOAD_SETTINGS
+      assert 'test_customers' in self.client._bulk_loading
+    assert self.indices.settings == {'index.refresh_interval': '5s'}
+    assert self.indices.refreshed == ['test_customers']
+    assert 'test_customers' not in self.client._bulk_loading
+
+  @pytest.mark.asyncio
+  async def test_settings_are_restored_on_error(self):
+    with pytest.raises(RuntimeError):
+      async with self.client.bulk_load('test_customers'):
+        raise RuntimeError('load failed')
+    # Replicas were unset before, so they go back to the cluster default
+    assert self.indices.put[-1] == {'refresh_interval': '5s', 'number_of_replicas': None}
+    assert self.indices.settings == {'index.refresh_interval': '5s'}
+    assert self.indices.refreshed == ['test_customers']
+    assert not self.client._bulk_loading
@@ -0,0 +1,194 @@
+import fnmatch
+import pytest
+from core.elasticsearch.client import ESClient
+from core.elasticsearch.indices import CustomerIndex
+
+class FakeIndices:
+  def __init__(self, cluster):
+    self.cluster = cluster
+
+  async def exists(self, index):
+    return index in self.cluster.indices
+
+  async def exists_alias(self, name):
+    return bool(self.cluster.targets(name))
+
+  async def get_alias(self, name):
+    return {index: {'aliases': {name: {}}} for index in self.cluster.targets(name)}
+
+  async def get_mapping(self, index):
+    return {index: {'mappings': self.cluster.indices[index]['mappings']}}
+
+  async def get(self, index, **kwargs):
+    return {name: {} for name in self.cluster.indices if fnmatch.fnmatch(name, index)}
+
+  async def create(self, index, body):
+    if index in self.cluster.indices:
+      raise RuntimeError('resource_already_exists_exception')
+    self.cluster.indices[index] = {'mappings': dict(body['mappings']), 'docs': {}}
+
+  async def delete(self, index):
+    del self.cluster.indices[index]
+
+  async def put_settings(self, index, settings):
+    pass
+
+  async def refresh(self, index):
+    pass
+
+  async def put_mapping(self, index, meta):
+    self.cluster.indices[index]['mappings']['_meta'] = meta
+
+  async def update_aliases(self, actions):
+    for action in actions:
+      (kind, params), = action.items()
+      if kind == 'remove_index':
+        del self.cluster.indices[params['index']]
+      elif kind == 'remove':
+        self.cluster.aliases[params['alias']].discard(params['index'])
+      else:
+        self.cluster.aliases.setdefault(params['alias'], set()).add(params['index'])
+
+class FakeTasks:
+  def __init__(self, cluster):
+    self.cluster = cluster
+
+  async def get(self, task_id):
+    return {'completed': True, 'task': {'status': self.cluster.tasks[task_id]}}
+
+class FakeCluster:
+  """Indices, aliases and reindex tasks held in memory."""
+
+  def __init__(self):
+    self.indices = {}
+    self.aliases = {}
+    self.tasks = {}
+    self.reindexed = []
+    # Called after each reindex copy, to write while the copy "runs"
+    self.during_reindex = []
+    self.indices_api = FakeIndices(self)
+    self.tasks_api = FakeTasks(self)
+
+  def targets(self, alias):
+    return sorted(self.aliases.get(alias, ()))
+
+  def add_index(self, name, docs=None, alias=None, meta=None):
+    self.indices[name] = {'mappings': {'_meta': meta or {}}, 'docs': dict(docs or {})}
+    if alias:
+      self.aliases.setdefault(alias, set()).add(name)
+
+  async def reindex(self, source, dest, **kwargs):
+    query = source.get('query')
+    dest = dest['index']
+    copied = 0
+    for name in source['index']:
+      for id, doc in self.indices[name]['docs'].items():
+        if query:
+          (field, bounds), = query['range'].items()
+          if doc[field] < bounds['gte']:
+            continue
+        self.indices[dest]['docs'][id] = dict(doc)
+        copied += 1
+    self.reindexed.append((list(source['index']), dest, query))
+    if self.during_reindex:
+      self.during_reindex.pop(0)()
+    task_id = f'task-{len(self.reindexed)}'
+    self.tasks[task_id] = {'created': copied, 'total': copied}
+    return {'task': task_id}
+
+class Connection:
+  def __init__(self, cluster):
+    self.indices = cluster.indices_api
+    self.tasks = cluster.tasks_api
+    self.reindex = cluster.reindex
+
+class TestIndexVersions:
+  @pytest.fixture(autouse=True)
+  def setup(self, monkeypatch):
+    monkeypatch.setattr(CustomerIndex, 'VERSION', 2)
+    self.cluster = FakeCluster()
+    self.client = ESClient()
+    self.client._initialized = True
+    self.client.connection = Connection(self.cluster)
+    self.alias = CustomerIndex.get_index_name()
+
+  def docs(self, index):
+    return self.cluster.indices[index]['docs']
+
+  @pytest.mark.asyncio
+  async def test_missing_index_is_created_empty(self):
+    assert await self.client.ensure_index_version(CustomerIndex)
+    assert self.cluster.targets(self.alias) == [f'{self.alias}_v2']
+    assert self.cluster.indices[f'{self.alias}_v2']['mappings']['_meta']['complete']
+    assert self.cluster.reindexed == []
+
+  @pytest.mark.asyncio
+  async def test_outdated_index_is_not_rebuilt_on_startup(self):
+    self.cluster.add_index(f'{self.alias}_v1', {'1': {'updated_at': '2026'}}, alias=self.alias)
+    assert not await self.client.ensure_index_version(CustomerIndex)
+    assert self.cluster.targets(self.alias) == [f'{self.alias}_v1']
+    assert f'{self.alias}_v2' not in self.cluster.indices
+
+  @pytest.mark.asyncio
+  async def test_finished_version_is_swapped_in(self):
+    self.cluster.add_index(f'{self.alias}_v1', alias=self.alias)
+    self.cluster.add_index(f'{self.alias}_v2', meta={'version': 2, 'complete': True})
+    assert await self.client.ensure_index_version(CustomerIndex)
+    assert self.cluster.targets(self.alias) == [f'{self.alias}_v2']
+
+  @pytest.mark.asyncio
+  async def test_partial_version_is_never_swapped_in(self):
+    self.cluster.add_index(f'{self.alias}_v1', alias=self.alias)
+    self.cluster.add_index(f'{self.alias}_v2', meta={'version': 2, 'complete': False})
+    assert not await self.client.ensure_index_version(CustomerIndex, rebuild=True)
+    assert self.cluster.targets(self.alias) == [f'{self.alias}_v1']
+
+  @pytest.mark.asyncio
+  async def test_concrete_index_is_replaced_by_alias(self):
+    self.cluster.add_index(self.alias, {'1': {'updated_at': '2000-01-01'}})
+    assert await self.client.ensure_index_version(CustomerIndex, rebuild=True)
+    assert self.alias not in self.cluster.indices
+    assert self.cluster.targets(self.alias) == [f'{self.alias}_v2']
+    assert self.docs(f'{self.alias}_v2') == {'1': {'updated_at': '2000-01-01'}}
+
+  @pytest.mark.asyncio
+  async def test_writes_during_rebuild_are_caught_up(self):
+    old = f'{self.alias}_v1'
+    self.cluster.add_index(old, {'1': {'updated_at': '2000-01-01'}}, alias=self.alias)
+
+    def write():
+      # Goes to the old index through the alias while the copy runs
+      self.docs(old)['2'] = {'updated_at': '9999-01-01'}
+      self.docs(old)['1'] = {'updated_at': '9999-01-01', 'status': 'suspended'}
+    self.cluster.during_reindex = [write]
+
+    assert await self.client.ensure_index_version(CustomerIndex, rebuild=True)
+    new = self.docs(f'{self.alias}_v2')
+    assert new['2'] == {'updated_at': '9999-01-01'}
+    assert new['1']['status'] == 'suspended'
+    # A full copy, then catch-up passes on updated_at
+    queries = [query for _, _, query in self.cluster.reindexed]
+    assert queries[0] is None
+    assert len(queries) > 1
+    assert all(query['range']['updated_at']['gte'] for query in queries[1:])
+
+  @pytest.mark.asyncio
+  async def test_catch_up_stops_when_nothing_changed(self):
+    self.cluster.add_index(f'{self.alias}_v1', {'1': {'updated_at': '2000-01-01'}}, alias=self.alias)
+    assert await self.client.ensure_index_version(CustomerIndex, rebuild=True)
+    assert len(self.cluster.reindexed) == 2
+
+  @pytest.mark.asyncio
+  async def test_migrate_deletes_only_older_versions(self):
+    self.cluster.add_index(f'{self.alias}_v1', alias=self.alias)
+    self.cluster.add_index(f'{self.alias}_v3', meta={'version': 3, 'complete': False})
+    migrated = await self.client.migrate_indices([CustomerIndex])
+    assert migrated == {self.alias: True}
+    assert sorted(self.cluster.indices) == [f'{self.alias}_v2', f'{self.alias}_v3']
+
+  @pytest.mark.asyncio
+  async def test_migrate_can_keep_old_versions(self):
+    self.cluster.add_index(f'{self.alias}_v1', alias=self.alias)
+    await self.client.migrate_indices([CustomerIndex], keep_old=True)
+    assert f'{self.alias}_v1' in self.cluster.indices
+    assert self.cluster.targets(self.alias) == [f'{self.alias}_v2']
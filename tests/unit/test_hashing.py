@@ -0,0 +1,90 @@
+import pytest
+from unittest import mock
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, make_password
+from rest_framework.exceptions import Throttled
+from apps.cp.authentication.attempts import login_attempts
+from apps.cp.authentication.hashing import PasswordHashPool, password_pool
+from apps.cp.authentication.serializers import LoginSerializer
+from core.redis.constants import MAX_LOGIN_ATTEMPTS
+from tests.factories.customer import CustomerFactory
+
+class FastPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+  iterations = 1000
+
+@pytest.fixture(autouse=True)
+def fast_hasher(settings):
+  settings.PASSWORD_HASHERS = ['tests.unit.test_hashing.FastPBKDF2PasswordHasher']
+
+class TestPasswordHashPool:
+  @pytest.fixture(autouse=True)
+  def setup(self):
+    self.pool = PasswordHashPool(workers=1)
+    yield
+    self.pool.shutdown()
+
+  def test_matches_django_hashers(self):
+    encoded = self.pool.hash('secret-password')
+    assert check_password('secret-password', encoded)
+    assert self.pool.verify('secret-password', make_password('secret-password')) == (True, False)
+    assert self.pool.verify('wrong', encoded) == (False, False)
+
+  def test_throttles_when_full(self):
+    pool = PasswordHashPool(workers=1, max_pending=1, timeout=0.01)
+    pool._slots.acquire()
+    with pytest.raises(Throttled):
+      pool.hash('secret-password')
+    assert pool.stats()['rejected'] == 1
+
+@pytest.mark.django_db
+class TestLoginAttempts:
+  def test_blocked_email_is_not_hashed(self):
+    customer = CustomerFactory()
+    for _ in range(MAX_LOGIN_ATTEMPTS):
+      login_attempts.fail(customer.email.upper())
+    serializer = LoginSerializer(data={'email': customer.email, 'password': 'testpass123'})
+    with mock.patch.object(password_pool, '_run') as run:
+      with pytest.raises(Throttled):
+        serializer.is_valid()
+    run.assert_not_called()
+    login_attempts.reset(customer.email)
+
+@pytest.mark.django_db
+class TestPooledPasswordBackend:
+  def test_login_goes_through_authenticate(self):
+    customer = CustomerFactory()
+    customer.set_password('testpass123')
+    customer.save()
+    serializer = LoginSerializer(data={'email': customer.email, 'password': 'testpass123'})
+    with mock.patch.object(password_pool, 'verify', wraps=password_pool.verify) as verify:
+      assert serializer.is_valid(), serializer.errors
+    verify.assert_called_once()
+    assert serializer.validated_data['user'] == customer
+
+  def test_failed_login_sends_signal(self):
+    customer = CustomerFactory()
+    serializer = LoginSerializer(data={'email': customer.email, 'password': 'wrong-password'})
+    with mock.patch('django.contrib.auth.user_login_failed.send') as send:
+      assert not serializer.is_valid()
+    send.assert_called_once()
+    login_attempts.reset(customer.email)
+
+  def test_outdated_hash_is_upgraded(self, settings):
+    settings.PASSWORD_HASHERS = [
+      'tests.unit.test_hashing.FastPBKDF2PasswordHasher',
+      'django.contrib.auth.hashers.MD5PasswordHasher'
+    ]
+    customer = CustomerFactory()
+    customer.password = make_password('testpass123', hasher='md5')
+    customer.save()
+    serializer = LoginSerializer(data={'email': customer.email, 'password': 'testpass123'})
+    assert serializer.is_valid(), serializer.errors
+    customer.refresh_from_db()
+    assert customer.password.startswith(FastPBKDF2PasswordHasher.algorithm)
+
+  def test_inactive_customer_is_rejected(self):
+    customer = CustomerFactory(is_active=False)
+    customer.set_password('testpass123')
+    customer.save()
+    serializer = LoginSerializer(data={'email': customer.email, 'password': 'testpass123'})
+    assert not serializer.is_valid()
+    login_attempts.reset(customer.email)
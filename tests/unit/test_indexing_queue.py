@@ -0,0 +1,58 @@
+import time
+import pytest
+from core.elasticsearch.queue import IndexingQueue
+
+class FakeESClient:
+  def __init__(self):
+    self.updates = []
+    self.deletes = []
+
+  async def bulk_update(self, index, documents):
+    self.updates.append((index, documents))
+    return True
+
+  async def bulk_delete(self, index, ids):
+    self.deletes.append((index, ids))
+    return True
+
+  async def close(self):
+    pass
+
+class TestIndexingQueue:
+  @pytest.fixture(autouse=True)
+  def setup(self):
+    self.client = FakeESClient()
+    self.queue = IndexingQueue(client=self.client, flush_size=100, flush_interval=60)
+    yield
+    self.queue.stop()
+
+  def test_repeated_updates_are_coalesced(self):
+    for version in range(10):
+      self.queue.enqueue('test_customers', '1', {'id': '1', 'version': version})
+    self.queue.enqueue('test_customers', '2', {'id': '2', 'version': 0})
+    self.queue.stop()
+
+    assert self.queue.stats['coalesced'] == 9
+    assert len(self.client.updates) == 1
+    index, documents = self.client.updates[0]
+    assert index == 'test_customers'
+    assert documents == [{'id': '1', 'version': 9}, {'id': '2', 'version': 0}]
+
+  def test_delete_replaces_pending_update(self):
+    self.queue.enqueue('test_customers', '1', {'id': '1'})
+    self.queue.enqueue_delete('test_customers', '1')
+    self.queue.stop()
+
+    assert self.client.updates == []
+    assert self.client.deletes == [('test_customers', ['1'])]
+
+  def test_flush_size_triggers_flush(self):
+    queue = IndexingQueue(client=self.client, flush_size=5, flush_interval=60)
+    for i in range(5):
+      queue.enqueue('test_customers', str(i), {'id': str(i)})
+    deadline = time.monotonic() + 2
+    while queue.stats['flushed'] < 5 and time.monotonic() < deadline:
+      time.sleep(0.01)
+    assert queue.pending == 0
+    assert queue.stats['flushed'] == 5
+    queue.stop()
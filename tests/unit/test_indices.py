@@ -0,0 +1,33 @@
+import pytest
+from django.contrib.auth import get_user_model
+from core.elasticsearch.indices.customer import CustomerIndex
+from tests.factories.customer import CustomerFactory
+
+Customer = get_user_model()
+
+@pytest.mark.django_db
+class TestCustomerIndexDocuments:
+  @pytest.fixture(autouse=True)
+  def setup(self):
+    self.customers = CustomerFactory.create_batch(5)
+
+  def test_get_documents_uses_one_query(self, django_assert_num_queries):
+    with django_assert_num_queries(1):
+      documents = list(CustomerIndex.get_documents(Customer.objects.all()))
+    assert len(documents) == 5
+
+  def test_get_documents_matches_get_document(self):
+    documents = {
+      doc['id']: doc for doc in CustomerIndex.get_documents(Customer.objects.all())
+    }
+    for customer in Customer.objects.all():
+      assert documents[str(customer.id)] == CustomerIndex.get_document(customer)
+
+  def test_missing_fields_are_indexed_as_none(self):
+    document = CustomerIndex.get_document(self.customers[0])
+    assert document['kyc_status'] is None
+    assert document['profile'] == {
+      'date_of_birth': None,
+      'nationality': None,
+      'address': None
+    }
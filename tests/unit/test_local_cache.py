@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+import pytest
+from core.redis.local_cache import LocalCache, MISSING
+from core.redis.client import RedisClient
+
+class TestLocalCache:
+  def test_evicts_least_recently_used(self):
+    cache = LocalCache(max_size=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is MISSING
+    assert cache.get('a') == 1
+    assert cache.evictions == 1
+
+  def test_entries_expire(self):
+    cache = LocalCache(max_size=10, ttl=0.01)
+    cache.set('a', 1)
+    time.sleep(0.02)
+    assert cache.get('a', None) is None
+
+  def test_delete_pattern(self):
+    cache = LocalCache(max_size=10)
+    cache.set('customer:1', 1)
+    cache.set('customer:2', 2)
+    cache.set('user:1', 3)
+    cache.delete_pattern('customer:*')
+    assert len(cache) == 1
+    assert cache.get('user:1') == 3
+
+  def test_skips_store_after_racing_invalidation(self):
+    cache = LocalCache(max_size=10)
+    generation = cache.generation
+    cache.delete('a')
+    assert not cache.set_if_generation('a', 'stale', generation)
+    assert cache.get('a') is MISSING
+
+  def test_invalidation_during_store_is_not_lost(self, monkeypatch):
+    cache = LocalCache(max_size=10)
+    store = cache._set_locked
+    invalidation = threading.Thread(target=cache.delete, args=('a',))
+
+    def racing_store(key, value, ttl):
+      # The invalidation arrives after the generation check passed
+      invalidation.start()
+      invalidation.join(0.05)
+      store(key, value, ttl)
+
+    monkeypatch.setattr(cache, '_set_locked', racing_store)
+    assert cache.set_if_generation('a', 'stale', cache.generation)
+    invalidation.join()
+    assert cache.get('a') is MISSING
+
+class TestNearCacheInvalidation:
+  @pytest.fixture(autouse=True)
+  def setup(self):
+    self.client = RedisClient(near_cache=True)
+    self.other = RedisClient(near_cache=True)
+
+  def _message(self, client, keys=(), patterns=()):
+    published = []
+    class Pipe:
+      def publish(self, channel, payload):
+        published.append(payload)
+    client._invalidate(Pipe(), keys=list(keys), patterns=list(patterns))
+    return published[0]
+
+  def test_remote_invalidation_evicts_keys(self):
+    self.client.near_cache.set('customer:1', {'id': 1})
+    self.client._apply_invalidation(self._message(self.other, keys=['customer:1']))
+    assert self.client.near_cache.get('customer:1') is MISSING
+
+  def test_remote_invalidation_evicts_patterns(self):
+    self.client.near_cache.set('customer:1', {'id': 1})
+    self.client._apply_invalidation(self._message(self.other, patterns=['customer:*']))
+    assert len(self.client.near_cache) == 0
+
+  def test_own_invalidation_is_ignored(self):
+    message = self._message(self.client, keys=['customer:1'])
+    self.client.near_cache.set('customer:1', {'id': 2})
+    self.client._apply_invalidation(message)
+    assert self.client.near_cache.get('customer:1') == {'id': 2}
+
+class FakePubSub:
+  def __init__(self, messages):
+    self.messages = list(messages)
+    self.subscribed = []
+    self.closed = False
+
+  def subscribe(self, channel):
+    self.subscribed.append(channel)
+
+  def get_message(self, timeout=None):
+    if self.messages:
+      return {'type': 'message', 'data': self.messages.pop(0)}
+    time.sleep(0.001)
+    return None
+
+  def close(self):
+    self.closed = True
+
+class TestNearCacheListener:
+  def test_listener_runs_without_an_event_loop(self, monkeypatch):
+    client = RedisClient(near_cache=True)
+    other = RedisClient(near_cache=True)
+    published = []
+    class Pipe:
+      def publish(self, channel, payload):
+        published.append(payload)
+    other._invalidate(Pipe(), keys=['customer:1'])
+
+    pubsub = FakePubSub([])
+    class FakeRedis:
+      def __init__(self, **kwargs):
+        pass
+      def pubsub(self, **kwargs):
+        return pubsub
+      def close(self):
+        pass
+    monkeypatch.setattr('core.redis.client.sync_redis.Redis', FakeRedis)
+
+    generation = client.near_cache.generation
+    client._start_listener()
+    listener = client._listener
+    deadline = time.monotonic() + 2
+    # The listener clears the cache once subscribed
+    while client.near_cache.generation == generation and time.monotonic() < deadline:
+      time.sleep(0.001)
+    client.near_cache.set('customer:1', {'id': 1})
+    pubsub.messages.append(published[0])
+    while client.near_cache.get('customer:1') is not MISSING and time.monotonic() < deadline:
+      time.sleep(0.001)
+    assert client.near_cache.get('customer:1') is MISSING
+
+    asyncio.run(client.close())
+    listener.join(2)
+    assert not listener.is_alive()
+    assert pubsub.closed
@@ -0,0 +1,67 @@
+import json
+import logging
+import os
+import pytest
+from shared.utils.logger import ESHandler
+
+class FakeClient:
+  def __init__(self):
+    self.available = True
+    self.documents = []
+
+  def bulk(self, operations):
+    if not self.available:
+      raise ConnectionError("elasticsearch is down")
+    documents = [json.loads(operation) for operation in operations[1::2]]
+    self.documents.extend(documents)
+    return {"errors": False, "items": [{"create": {"status": 201}} for _ in documents]}
+
+def make_logger(handler):
+  logger = logging.getLogger(f'test.shipping.{id(handler)}')
+  logger.propagate = False
+  logger.setLevel(logging.INFO)
+  logger.addHandler(handler)
+  return logger
+
+class TestESHandler:
+  @pytest.fixture(autouse=True)
+  def enable_shipping(self, settings):
+    # Test settings keep shipping off for every other test
+    settings.LOG_SHIPPING_ENABLED = True
+
+  def test_ships_batches_with_extras(self, tmp_path):
+    client = FakeClient()
+    handler = ESHandler(batch_size=10, flush_interval=0.01, spool_dir=str(tmp_path), client=client)
+    logger = make_logger(handler)
+    for n in range(25):
+      logger.info('Staff action %s', n, extra={'path': '/api/v1/crm/customers/'})
+    handler.close()
+
+    assert len(client.documents) == 25
+    assert client.documents[0]['message'] == 'Staff action 0'
+    assert client.documents[0]['extra'] == {'path': '/api/v1/crm/customers/'}
+    assert handler.stats['shipped'] == 25
+
+  def test_full_buffer_drops_records(self, tmp_path):
+    handler = ESHandler(capacity=3, spool_dir=str(tmp_path), client=FakeClient())
+    handler._pid = os.getpid()  # no shipper, so nothing drains the buffer
+    logger = make_logger(handler)
+    for n in range(5):
+      logger.info('record %s', n)
+    assert handler.stats['dropped'] == 2 and len(handler._buffer) == 3
+
+  def test_spools_while_unavailable_and_replays(self, tmp_path):
+    client = FakeClient()
+    client.available = False
+    handler = ESHandler(batch_size=2, spool_dir=str(tmp_path), client=client)
+    entries = [handler.format_log_entry(logging.makeLogRecord({'msg': f'record {n}'})) for n in range(3)]
+    handler._ship(entries[:2])
+    handler._ship(entries[2:])
+    assert handler.stats['spooled'] == 3 and handler.stats['failed_requests'] == 1
+
+    client.available = True
+    handler._retry_at = 0
+    handler._ship([handler.format_log_entry(logging.makeLogRecord({'msg': 'record 3'}))])
+    assert [document['message'] for document in client.documents] == [f'record {n}' for n in (3, 0, 1, 2)]
+    assert handler.stats['replayed'] == 3
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory
+from core.metrics import Histogram, TimedProxy, current_timings, timed
+from core.metrics.middleware import MetricsMiddleware
+from core.metrics.views import metrics
+from core.metrics.timing import backend_call_duration
+
+class FakeManager:
+  EnPumpModes = object
+
+  def UserRequest(self, login):
+    return {'login': login}
+
+class TestHistogram:
+  def test_renders_cumulative_buckets(self):
+    histogram = Histogram('test_seconds', 'Test.', ('backend',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+      histogram.observe(value, 'redis')
+
+    lines = histogram.render()
+    assert 'test_seconds_bucket{backend="redis",le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{backend="redis",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{backend="redis",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{backend="redis"} 4' in lines
+    assert histogram.get('redis') == (4, 3.65)
+
+class TestRequestTimings:
+  @pytest.fixture(autouse=True)
+  def server_timing(self, settings):
+    settings.METRICS_SERVER_TIMING = True
+
+  def test_server_timing_follows_debug_by_default(self, settings):
+    settings.METRICS_SERVER_TIMING = None
+    settings.DEBUG = False
+    response = MetricsMiddleware(lambda request: HttpResponse('ok'))(RequestFactory().get('/'))
+    assert 'Server-Timing' not in response
+
+  def test_middleware_adds_server_timing(self):
+    @timed('redis', 'test_get')
+    async def get():
+      return 1
+
+    def view(request):
+      asyncio.run(get())
+      asyncio.run(get())
+      return HttpResponse('ok')
+
+    response = MetricsMiddleware(view)(RequestFactory().get('/'))
+
+    assert response['Server-Timing'].startswith('redis;')
+    assert 'desc="2 calls"' in response['Server-Timing']
+    assert 'total;dur=' in response['Server-Timing']
+    assert current_timings() is None
+
+  def test_async_middleware(self):
+    @timed('es', 'test_search')
+    async def search():
+      return {}
+
+    async def view(request):
+      await asyncio.gather(search(), search(), search())
+      return HttpResponse('ok')
+
+    middleware = MetricsMiddleware(view)
+    response = asyncio.run(middleware(RequestFactory().get('/')))
+    assert 'es;' in response['Server-Timing']
+    assert 'desc="3 calls"' in response['Server-Timing']
+
+  def test_proxy_times_method_calls(self):
+    before = backend_call_duration.get('mt5', 'UserRequest') or (0, 0.0)
+    manager = TimedProxy(FakeManager(), 'mt5')
+
+    assert manager.UserRequest(1) == {'login': 1}
+    assert manager.EnPumpModes is object
+    assert backend_call_duration.get('mt5', 'UserRequest')[0] == before[0] + 1
+
+class TestMetricsView:
+  def test_disabled_without_token(self, settings):
+    settings.METRICS_TOKEN = None
+    with pytest.raises(Http404):
+      metrics(RequestFactory().get('/metrics'))
+
+  def test_requires_token(self, settings):
+    settings.METRICS_TOKEN = 'scrape-secret'
+    factory = RequestFactory()
+    assert metrics(factory.get('/metrics')).status_code == 401
+    response = metrics(factory.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret'))
+    assert response.status_code == 200
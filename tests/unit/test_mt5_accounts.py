@@ -0,0 +1,95 @@
+import asyncio
+from core.mt5.accounts import ACCOUNT_FIELDS, AccountStore, MT5Account
+from core.mt5.sinks import MT5UserSink
+
+class User:
+  def __init__(self, login, group='real\\standard', email='trader@example.com'):
+    for attr, _ in ACCOUNT_FIELDS:
+      setattr(self, attr, 0)
+    self.Login = login
+    self.Group = group
+    self.EMail = email
+    self.Balance = 100.0
+
+class FakeSnapshot:
+  def __init__(self, fail=False):
+    self.accounts = {}
+    self.fail = fail
+
+  async def write(self, accounts, deleted=()):
+    if self.fail:
+      raise ConnectionError("redis is down")
+    self.accounts.update({account.login: account.as_dict() for account in accounts})
+    for login in deleted:
+      self.accounts.pop(login, None)
+
+  async def replace(self, accounts):
+    self.accounts = {account.login: account.as_dict() for account in accounts}
+
+class TestAccountStore:
+  def test_indexes_follow_updates(self):
+    store = AccountStore(2)
+    store.load([User(1), User(2, group='demo\\test'), User(3, email='Other@Example.com')])
+    assert {account.login for account in store.by_group('real\\standard')} == {1, 3}
+    assert store.by_email('other@example.com')[0].login == 3
+
+    store.update(User(1, group='demo\\test'))
+    assert store.groups() == {'real\\standard': 1, 'demo\\test': 2}
+    store.delete(2)
+    assert [account.login for account in store.by_group('demo\\test')] == [1]
+    assert set(store.get_many([1, 2, 3])) == {1, 3}
+
+  def test_sink_keeps_store_current(self):
+    store = AccountStore(2)
+    sink = MT5UserSink(store=store)
+    received = []
+    sink.add_callback('user_delete', received.append)
+
+    sink.OnUserUpdate(User(7))
+    assert store.get(7).balance == 100.0
+    sink.OnUserDelete(User(7))
+    assert 7 not in store
+    assert isinstance(received[0], MT5Account) and received[0].login == 7
+
+  def test_load_keeps_updates_received_meanwhile(self):
+    store = AccountStore(2)
+    store.update(User(4))
+    store.begin_load()
+    # The pump delivers changes while the full list is being fetched
+    updated = User(1)
+    updated.Balance = 250.0
+    store.update(updated)
+    store.delete(2)
+
+    assert store.load([User(1), User(2), User(3)]) == 2
+    assert store.get(1).balance == 250.0
+    assert 2 not in store and 4 not in store
+    assert {account.login for account in store.by_group('real\\standard')} == {1, 3}
+
+    # Without a pending load the list wins
+    store.load([User(1)])
+    assert store.get(1).balance == 100.0
+
+  def test_snapshot_writes_changes(self):
+    snapshot = FakeSnapshot()
+    store = AccountStore(2, snapshot=snapshot)
+    store.load([User(1), User(2)])
+    asyncio.run(store.write_snapshot())
+    assert set(snapshot.accounts) == {1, 2}
+
+    store.update(User(3))
+    store.delete(1)
+    asyncio.run(store.write_snapshot())
+    assert set(snapshot.accounts) == {2, 3}
+
+  def test_failed_snapshot_is_retried(self):
+    snapshot = FakeSnapshot(fail=True)
+    store = AccountStore(2, snapshot=snapshot)
+    store.update(User(1))
+    asyncio.run(store.write_snapshot())
+    assert store.stats()['pending'] == 1
+
+    snapshot.fail = False
+    asyncio.run(store.write_snapshot())
+    assert set(snapshot.accounts) == {1}
+    assert store.stats()['pending'] == 0
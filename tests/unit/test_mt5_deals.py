@@ -0,0 +1,51 @@
+from core.mt5.deals import DealBuffer, DealRecord
+from core.mt5.sinks import MT5DealSink
+
+class Deal:
+  def __init__(self, ticket):
+    self.Deal = ticket
+    self.Order = ticket + 1000
+    self.Time = 1700000000 + ticket
+    self.Login = 5001
+    self.Symbol = 'EURUSD'
+    self.Action = 0
+    self.Entry = 1
+    self.Volume = 10000
+    self.Price = 1.1
+    self.Commission = -0.5
+    self.Profit = 12.5
+    self.Comment = ''
+    self.Dealer = 0
+
+class TestDealBuffer:
+  def test_drains_columns_in_order(self):
+    buffer = DealBuffer(capacity=8)
+    for ticket in range(5):
+      buffer.append(Deal(ticket))
+
+    batch = buffer.drain(3)
+    assert len(batch) == 3
+    assert list(batch['ticket']) == [0, 1, 2]
+    assert list(batch['price']) == [1.1] * 3
+    assert batch['symbol'] == ['EURUSD'] * 3
+    assert [record.ticket for record in buffer.drain().records()] == [3, 4]
+    assert len(buffer) == 0
+
+  def test_overwrites_oldest_when_full(self):
+    buffer = DealBuffer(capacity=4)
+    for ticket in range(6):
+      buffer.append(Deal(ticket))
+    assert buffer.dropped == 2
+    assert list(buffer.drain()['ticket']) == [2, 3, 4, 5]
+
+class TestMT5DealSink:
+  def test_callbacks_get_detached_records(self):
+    buffer = DealBuffer(capacity=4)
+    sink = MT5DealSink(buffer=buffer)
+    received = []
+    sink.add_callback('deal_add', received.append)
+    sink.OnDealAdd(Deal(7))
+
+    assert isinstance(received[0], DealRecord)
+    assert received[0].ticket == 7 and received[0].login == 5001
+    assert len(buffer) == 1
@@ -0,0 +1,64 @@
+import threading
+import time
+from core.mt5.accounts import ACCOUNT_FIELDS
+from core.mt5.deals import DEAL_FIELDS
+from core.mt5.dispatcher import EventDispatcher
+from core.mt5.sinks import MT5DealSink, MT5UserSink
+
+class Deal:
+  def __init__(self, ticket):
+    for attr, _, typecode in DEAL_FIELDS:
+      setattr(self, attr, 0 if typecode else '')
+    self.Deal = ticket
+
+class User:
+  def __init__(self, login):
+    for attr, _ in ACCOUNT_FIELDS:
+      setattr(self, attr, '')
+    self.Login = login
+
+class TestEventDispatcher:
+  def test_callbacks_run_off_the_pump_thread_in_order(self):
+    dispatcher = EventDispatcher()
+    sink = MT5DealSink(dispatcher=dispatcher)
+    seen, threads = [], set()
+    sink.add_callback('deal_add', lambda deal: (seen.append(deal.ticket), threads.add(threading.current_thread())))
+
+    for ticket in range(100):
+      sink.OnDealAdd(Deal(ticket))
+    dispatcher.stop()
+
+    assert seen == list(range(100))
+    assert threading.current_thread() not in threads
+    assert dispatcher.stats('deal')['deal']['processed'] == 100
+
+  def test_slow_deal_handler_does_not_block_users(self):
+    dispatcher = EventDispatcher()
+    deals = MT5DealSink(dispatcher=dispatcher)
+    users = MT5UserSink(dispatcher=dispatcher)
+    release = threading.Event()
+    updated = threading.Event()
+    deals.add_callback('deal_add', lambda deal: release.wait(5))
+    users.add_callback('user_update', lambda user: updated.set())
+
+    started = time.monotonic()
+    deals.OnDealAdd(Deal(1))
+    users.OnUserUpdate(User(1))
+    assert time.monotonic() - started < 0.5
+    assert updated.wait(1)
+    release.set()
+    dispatcher.stop()
+
+  def test_drop_newest_when_full(self):
+    dispatcher = EventDispatcher(capacity=2, overflow='drop_newest')
+    release = threading.Event()
+    handler = lambda event, data: release.wait(5)
+    dispatcher.submit('deal', handler, 'deal_add', 0)
+    while dispatcher.stats('deal')['deal']['depth']:
+      time.sleep(0.001)
+
+    results = [dispatcher.submit('deal', handler, 'deal_add', n) for n in range(1, 4)]
+    release.set()
+    dispatcher.stop()
+    assert results == [True, True, False]
+    assert dispatcher.stats('deal')['deal']['dropped'] == 1
@@ -0,0 +1,184 @@
+import pytest
+from contextlib import contextmanager
+from core.mt5.constants import DEAL_BACKFILL_OVERLAP, DEAL_RETRY_LIMIT
+from core.mt5.deals import DealBuffer
+from core.mt5.exceptions import MT5ConnectionError
+from core.mt5.ingest import DealIngestor
+from models.deals import Deal
+
+class MT5Deal:
+  def __init__(self, ticket, time=1700000000):
+    self.Deal = ticket
+    self.Order = ticket + 1000
+    self.Time = time + ticket
+    self.Login = 5001
+    self.Symbol = 'EURUSD'
+    self.Action = 0
+    self.Entry = 1
+    self.Volume = 10000
+    self.Price = 1.1
+    self.Commission = -0.5
+    self.Profit = 12.5
+    self.Comment = ''
+    self.Dealer = 0
+
+class FakeQueue:
+  def __init__(self):
+    self.documents = {}
+
+  def enqueue(self, index, id, document):
+    self.documents[(index, id)] = document
+
+class FakeManager:
+  def __init__(self, deals):
+    self.deals = deals
+    self.requests = []
+
+  def DealRequestByGroup(self, group, since, until):
+    self.requests.append(since)
+    return [deal for deal in self.deals if deal.Time >= since]
+
+class FakePool:
+  def __init__(self, manager, failures=0):
+    self._manager = manager
+    self.failures = failures
+
+  @contextmanager
+  def manager(self):
+    if self.failures:
+      self.failures -= 1
+      raise MT5ConnectionError("Not connected to MT5 server")
+    yield self._manager
+
+@pytest.mark.django_db
+class TestDealIngestor:
+  def make_ingestor(self, flush_size=100):
+    buffer = DealBuffer(capacity=1000)
+    queue = FakeQueue()
+    return DealIngestor({2: buffer}, flush_size=flush_size, queue=queue), buffer, queue
+
+  def test_writes_batches_once(self):
+    ingestor, buffer, queue = self.make_ingestor(flush_size=4)
+    for ticket in range(10):
+      buffer.append(MT5Deal(ticket))
+    while ingestor._flush(2, buffer):
+      pass
+
+    assert Deal.objects.filter(server_id=2).count() == 10
+    assert len(queue.documents) == 10
+    assert ingestor.stats["batches"] == 3
+
+    # The same deals again, e.g. after a restart, change nothing
+    for ticket in range(10):
+      buffer.append(MT5Deal(ticket))
+    ingestor._flush(2, buffer)
+    assert Deal.objects.count() == 10
+    assert len(queue.documents) == 10
+
+  def test_failed_batch_is_retried(self, monkeypatch):
+    ingestor, buffer, queue = self.make_ingestor()
+    buffer.append(MT5Deal(1))
+    calls = []
+    write = ingestor.write
+
+    def flaky_write(server_id, batch):
+      calls.append(len(batch))
+      if len(calls) == 1:
+        raise RuntimeError("database is down")
+      write(server_id, batch)
+
+    monkeypatch.setattr(ingestor, 'write', flaky_write)
+    assert not ingestor._flush(2, buffer)
+    assert ingestor.stats["failed"] == 1
+    assert ingestor._flush(2, buffer)
+    assert calls == [1, 1]
+    assert Deal.objects.get(server_id=2, ticket=1).id == Deal.make_id(2, 1)
+
+  def test_backfill_starts_before_last_stored_deal(self):
+    ingestor, buffer, queue = self.make_ingestor()
+    buffer.append(MT5Deal(1))
+    ingestor._flush(2, buffer)
+
+    manager = FakeManager([MT5Deal(ticket) for ticket in range(1, 6)])
+    ingestor._backfill(2, FakePool(manager))
+    assert manager.requests[0] < 1700000001
+    assert Deal.objects.count() == 5
+    assert ingestor.stats["backfilled"] == 5
+
+
+  def test_retries_are_bounded(self, monkeypatch):
+    ingestor, buffer, queue = self.make_ingestor()
+    manager = FakeManager([MT5Deal(1)])
+    ingestor.backfill(2, FakePool(manager))
+    ingestor._backfills.clear()
+    buffer.append(MT5Deal(1))
+
+    def failing_write(server_id, batch):
+      raise RuntimeError("database is down")
+
+    monkeypatch.setattr(ingestor, 'write', failing_write)
+    for _ in range(DEAL_RETRY_LIMIT):
+      assert not ingestor._flush(2, buffer)
+    assert 2 not in ingestor._retries
+    assert ingestor.stats["abandoned"] == 1
+
+    # The abandoned deals are requested again from their first deal on
+    assert ingestor._backfills[2].starts == {1700000001}
+
+  def test_overwritten_deals_are_requested_again(self):
+    ingestor, buffer, queue = self.make_ingestor()
+    small = DealBuffer(capacity=2)
+    ingestor.buffers[2] = small
+    ingestor.backfill(2, FakePool(FakeManager([])))
+    ingestor._backfills.clear()
+
+    small.append(MT5Deal(1))
+    ingestor._flush(2, small)
+    for ticket in range(2, 6):
+      small.append(MT5Deal(ticket))
+    ingestor._check_overwritten(2, small)
+
+    assert ingestor.stats["overwritten"] == 2
+    assert ingestor._backfills[2].starts == {1700000001}
+    ingestor._check_overwritten(2, small)
+    assert len(ingestor._backfills) == 1 and ingestor._backfills[2].starts == {1700000001}
+
+  def test_backfill_starts_from_setting_when_nothing_is_stored(self, settings):
+    settings.MT5_DEAL_BACKFILL_START = 1700000003
+    ingestor, buffer, queue = self.make_ingestor()
+    manager = FakeManager([MT5Deal(ticket) for ticket in range(1, 6)])
+    ingestor._backfill(2, FakePool(manager))
+    assert manager.requests == [1700000003]
+    assert Deal.objects.count() == 3
+
+  def test_failed_backfill_is_retried(self):
+    ingestor, buffer, queue = self.make_ingestor()
+    manager = FakeManager([MT5Deal(ticket) for ticket in range(1, 4)])
+    # Unreachable at startup, back by the second attempt
+    ingestor.backfill(2, FakePool(manager, failures=1), since=1700000000)
+
+    ingestor._run_backfills()
+    assert Deal.objects.count() == 0
+    pending = ingestor._backfills[2]
+    assert pending.attempts == 1 and pending.retry_at > 0
+
+    ingestor._run_backfills()
+    assert manager.requests == []  # still backing off
+    pending.retry_at = 0
+    ingestor._run_backfills()
+    assert manager.requests == [1700000000]
+    assert Deal.objects.count() == 3 and not ingestor._backfills
+
+  def test_resume_requests_deals_since_the_last_drained(self):
+    ingestor, buffer, queue = self.make_ingestor()
+    buffer.append(MT5Deal(5))
+    ingestor._flush(2, buffer)
+    pool = FakePool(FakeManager([]))
+    ingestor.resume(2, pool)
+    assert ingestor._backfills[2].starts == {1700000005 - DEAL_BACKFILL_OVERLAP}
+
+    # Merged with what was already pending for the server
+    ingestor._recover(2, 1699999000)
+    assert ingestor._backfills[2].starts == {1700000005 - DEAL_BACKFILL_OVERLAP, 1699999000}
+    ingestor._run_backfills()
+    assert pool._manager.requests == [1699999000]
@@ -0,0 +1,217 @@
+import threading
+import pytest
+from core.mt5.connection.pool import MT5ConnectionPool
+from core.mt5.constants import MT5ServerConfig, MT5_SERVERS, MT5_STATE_READY, MT5_STATE_UNAVAILABLE
+from core.mt5.pool import MT5ConnectionPools
+from core.mt5.exceptions import MT5ConnectionError, MT5PoolExhausted
+from tests.unit.test_mt5_accounts import User
+
+SERVER = MT5ServerConfig('TEST', ['10.0.0.1', '10.0.0.2'], 1, 'x', 'x', 'live', 9)
+
+class FakeConnection:
+  def __init__(self, server_config, data_folder=None, pump=True):
+    self.pump = pump
+    self.connected = False
+    self.connected_ip = None
+    self.last_error = None
+    self.healthy = True
+    self.connects = 0
+
+  def connect(self):
+    self.connects += 1
+    if not self.healthy:
+      raise MT5ConnectionError("unreachable")
+    self.connected = True
+    self.connected_ip = SERVER.ips[0]
+    return True
+
+  def reconnect(self):
+    self.connected = False
+    return self.connect()
+
+  def disconnect(self):
+    self.connected = False
+
+  def setup_user_sink(self, sink):
+    return self.connected
+
+  def setup_deal_sink(self, sink):
+    return self.connected
+
+  def ping(self):
+    return self.connected and self.healthy
+
+  def UserGetByGroup(self, group):
+    self.loads = getattr(self, 'loads', 0) + 1
+    return [User(login) for login in (1, 2)]
+
+  @property
+  def manager(self):
+    if not self.connected:
+      raise MT5ConnectionError("Not connected to MT5 server")
+    return self
+
+def make_pool(size=3, **kwargs):
+  pool = MT5ConnectionPool(SERVER, size=size, heartbeat_interval=60, connection_factory=FakeConnection, **kwargs)
+  pool.connect()
+  return pool
+
+class TestMT5ConnectionPool:
+  def test_only_primary_pumps(self):
+    pool = make_pool()
+    assert [slot.connection.pump for slot in pool._slots] == [True, False, False]
+    pool.disconnect()
+
+  def test_connections_are_exclusive(self):
+    pool = make_pool(size=2, checkout_timeout=0.05)
+    with pool.connection() as first, pool.connection() as second:
+      assert first is not second
+      with pytest.raises(MT5PoolExhausted):
+        with pool.connection():
+          pass
+    stats = pool.stats()
+    assert stats['idle'] == 2 and stats['timeouts'] == 1
+    pool.disconnect()
+
+  def test_concurrent_checkouts_scale_with_size(self):
+    pool = make_pool(size=4, checkout_timeout=5)
+    barrier = threading.Barrier(4)
+    used = set()
+
+    def work():
+      with pool.connection() as connection:
+        used.add(id(connection))
+        barrier.wait(2)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    assert len(used) == 4
+    pool.disconnect()
+
+  def test_broken_connection_is_reconnected(self):
+    pool = make_pool(size=1)
+    connection = pool.primary
+    connection.healthy = False
+    with pytest.raises(MT5ConnectionError):
+      with pool.connection():
+        raise MT5ConnectionError("lost")
+    assert pool.stats()['reconnecting'] == 1
+
+    # Down: reconnect fails and the retry is pushed back
+    pool._slots[0].retry_at = 1
+    pool.check()
+    assert pool._slots[0].failures == 2
+
+    connection.healthy = True
+    pool._slots[0].retry_at = 1
+    pool.check()
+    assert pool.stats()['idle'] == 1 and pool.reconnects == 1
+    with pool.manager() as manager:
+      assert manager is connection
+    pool.disconnect()
+
+  def test_failed_heartbeat_reconnects(self):
+    pool = make_pool(size=2)
+    pool._slots[1].connection.connected = False
+    pool.check()
+    assert pool._slots[1].retry_at and pool.stats()['idle'] == 1
+
+    pool._slots[1].retry_at = 1
+    pool.check()
+    assert pool.reconnects == 1
+    assert pool._slots[1].connection.connects == 2
+    assert pool.stats()['idle'] == 2
+    pool.disconnect()
+
+  def test_primary_reconnect_calls_back(self):
+    pool = make_pool(size=2)
+    calls = []
+    pool.on_primary_reconnect(lambda: calls.append(pool.stats()['idle']))
+    for slot in pool._slots:
+      slot.connection.connected = False
+    pool.check()
+    for slot in pool._slots:
+      slot.retry_at = 1
+    pool.check()
+    # Only for the pump connection, once it is back in the pool
+    assert calls == [1]
+    pool.disconnect()
+
+  def test_heartbeat_holds_one_connection_at_a_time(self):
+    pool = make_pool(size=3)
+    idle = []
+    for slot in pool._slots:
+      connection = slot.connection
+
+      def ping(connection=connection):
+        idle.append(pool.stats()['idle'])
+        return connection.connected and connection.healthy
+
+      connection.ping = ping
+    pool._slots[0].connection.healthy = False
+    pool.check()
+
+    # Only the slot being pinged is out, besides the broken one
+    assert idle == [2, 1, 1]
+    assert pool.stats()['idle'] == 2 and pool.reconnects == 0
+    pool.disconnect()
+
+class TestMT5Startup:
+  @pytest.fixture
+  def pools(self, monkeypatch, settings):
+    # Test settings keep MT5 off for everything else
+    settings.MT5_ENABLED = True
+    monkeypatch.setattr(MT5ConnectionPools, '_instance', None)
+    pools = MT5ConnectionPools()
+    yield pools
+    pools.disconnect_all()
+
+  def test_start_returns_before_connecting(self, pools, monkeypatch):
+    connecting = threading.Event()
+
+    def create_pool(config):
+      connecting.wait(5)
+      return MT5ConnectionPool(config, size=2, heartbeat_interval=60, connection_factory=FakeConnection)
+
+    monkeypatch.setattr(pools, '_create_pool', create_pool)
+    assert pools.start()
+    assert pools.state == 'connecting'
+    assert not pools.wait_ready(timeout=0.01)
+
+    connecting.set()
+    assert pools.wait_ready(timeout=5)
+    assert pools.state == MT5_STATE_READY
+    assert not pools.start()
+
+  def test_unreachable_servers_are_reported(self, pools, monkeypatch):
+    def create_pool(config):
+      pool = MT5ConnectionPool(config, size=1, heartbeat_interval=60, connection_factory=FakeConnection)
+      pool.primary.healthy = False
+      return pool
+
+    monkeypatch.setattr(pools, '_create_pool', create_pool)
+    pools.start()
+    assert not pools.wait_ready(timeout=5)
+    assert pools.state == MT5_STATE_UNAVAILABLE
+
+  def test_accounts_are_loaded_once_the_primary_reconnects(self, pools):
+    config = MT5_SERVERS[0]
+    pool = MT5ConnectionPool(config, size=1, heartbeat_interval=60, connection_factory=FakeConnection)
+    store = pools.account_stores[config.id]
+
+    # Down at startup: nothing is loaded, and pump updates aren't tracked forever
+    pools._load_accounts(config.id, pool)
+    assert len(store) == 0 and store._loading is None
+
+    pool.on_primary_reconnect(lambda: pools._primary_reconnected(config.id, pool))
+    pool._schedule_reconnect(pool._slots[0])
+    pool._slots[0].retry_at = 1
+    pool.check()
+    assert set(store.get_many([1, 2])) == {1, 2}
+    assert pool.primary.loads == 1
+    # Loaded through a checked out connection, returned afterwards
+    assert pool.stats()['idle'] == 1 and pool.checkouts == 1
+    pool.disconnect()
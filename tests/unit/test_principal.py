@@ -0,0 +1,36 @@
+import pytest
+from django.core.cache import cache
+from apps.cp.authentication.principal import CustomerPrincipal, PrincipalCache, principal_cache
+from tests.factories.customer import CustomerFactory
+
+@pytest.mark.django_db
+class TestPrincipalCache:
+  @pytest.fixture(autouse=True)
+  def setup(self):
+    cache.clear()
+    self.principals = PrincipalCache()
+    self.customer = CustomerFactory()
+
+  def test_loads_customer_once(self, django_assert_num_queries):
+    with django_assert_num_queries(1):
+      principal = self.principals.get(self.customer.pk, 'jti-1')
+      assert self.principals.get(self.customer.pk, 'jti-1') is principal
+    assert principal == CustomerPrincipal.from_customer(self.customer)
+    assert principal.is_authenticated
+
+  def test_other_tokens_are_served_from_redis(self, django_assert_num_queries):
+    self.principals.get(self.customer.pk, 'jti-1')
+    with django_assert_num_queries(0):
+      assert self.principals.get(self.customer.pk, 'jti-2').email == self.customer.email
+
+  def test_save_invalidates(self, django_capture_on_commit_callbacks):
+    principal_cache.get(self.customer.pk, 'jti-1')
+    self.customer.status = 'suspended'
+    with django_capture_on_commit_callbacks(execute=True):
+      self.customer.save()
+    assert principal_cache.get(self.customer.pk, 'jti-1').status == 'suspended'
+
+  def test_missing_customer(self):
+    customer_id = self.customer.pk
+    self.customer.delete()
+    assert self.principals.get(customer_id) is None
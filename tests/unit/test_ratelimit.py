@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+import pytest
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from apps.cp.authentication.middleware import RateLimitMiddleware
+from core.redis.ratelimit import RateLimiter, TokenBucket
+
+class FailingRedis:
+  def __init__(self):
+    self.calls = 0
+
+  async def ensure_connection(self):
+    pass
+
+  async def run_script(self, script, keys=(), args=()):
+    self.calls += 1
+    raise ConnectionError('redis is down')
+
+class TestTokenBucket:
+  def test_allows_up_to_limit(self):
+    bucket = TokenBucket(limit=3, period=60)
+    results = [bucket.consume() for _ in range(4)]
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert results[2].remaining == 0
+    assert results[3].retry_after == pytest.approx(20, rel=0.01)
+
+  def test_refills_over_time(self):
+    bucket = TokenBucket(limit=2, period=60)
+    bucket.consume()
+    bucket.consume()
+    bucket.updated -= 30
+    assert bucket.consume().allowed
+
+class TestRateLimiter:
+  @pytest.mark.asyncio
+  async def test_falls_back_to_local_bucket(self):
+    redis = FailingRedis()
+    limiter = RateLimiter(client=redis)
+    results = [await limiter.hit('ip:1', limit=2, period=60) for _ in range(3)]
+    assert [r.allowed for r in results] == [True, True, False]
+    # Redis is skipped for a while after a failure
+    assert redis.calls == 1
+
+class FakeSyncRedis:
+  """Blocking client whose script allows the first limit hits of each key."""
+  def __init__(self, fail=False):
+    self.fail = fail
+    self.calls = 0
+    self.hits = {}
+
+  def register_script(self, source):
+    def script(keys=(), args=()):
+      self.calls += 1
+      if self.fail:
+        raise ConnectionError('redis is down')
+      limit = args[0]
+      self.hits[keys[0]] = self.hits.get(keys[0], 0) + 1
+      allowed = self.hits[keys[0]] <= limit
+      return [int(allowed), max(limit - self.hits[keys[0]], 0), '0' if allowed else '30', '60']
+    return script
+
+class ClosingRedis(FailingRedis):
+  closed = 0
+
+  async def run_script(self, script, keys=(), args=()):
+    return [1, 1, '0', '1']
+
+  async def close(self):
+    ClosingRedis.closed += 1
+
+class TestSyncRateLimiter:
+  def test_runs_script_on_blocking_client(self):
+    limiter = RateLimiter(sync_client=FakeSyncRedis())
+    results = [limiter.hit_sync('ip:1', limit=2, period=60) for _ in range(3)]
+    assert [r.allowed for r in results] == [True, True, False]
+    assert results[2].retry_after == 30
+
+  def test_falls_back_to_local_bucket(self):
+    redis = FakeSyncRedis(fail=True)
+    limiter = RateLimiter(sync_client=redis)
+    results = [limiter.hit_sync('ip:1', limit=2, period=60) for _ in range(3)]
+    assert [r.allowed for r in results] == [True, True, False]
+    assert redis.calls == 1
+
+  def test_old_loop_client_is_closed(self, monkeypatch):
+    monkeypatch.setattr('core.redis.ratelimit.RedisClient', lambda near_cache: ClosingRedis())
+    ClosingRedis.closed = 0
+    limiter = RateLimiter()
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+      asyncio.run_coroutine_threadsafe(limiter.hit('ip:1', 2, 60), loop).result(1)
+      asyncio.run(limiter.hit('ip:1', 2, 60))
+      deadline = time.monotonic() + 1
+      while not ClosingRedis.closed and time.monotonic() < deadline:
+        time.sleep(0.001)
+      assert ClosingRedis.closed == 1
+    finally:
+      loop.call_soon_threadsafe(loop.stop)
+      thread.join(1)
+      loop.close()
+
+class TestRateLimitMiddleware:
+  @pytest.fixture(autouse=True)
+  def setup(self, settings):
+    settings.CP_RATE_LIMITS = [{'PATH': '/api/v1/cp/auth/login', 'LIMIT': 1, 'PERIOD': 60}]
+    self.middleware = RateLimitMiddleware(lambda request: HttpResponse('ok'))
+    self.middleware.limiter = RateLimiter(sync_client=FakeSyncRedis())
+
+  def test_runs_synchronously(self):
+    assert not iscoroutinefunction(self.middleware)
+    request = RequestFactory().post('/api/v1/cp/auth/login')
+    first = self.middleware(request)
+    second = self.middleware(request)
+    assert first.status_code == 200
+    assert first['X-RateLimit-Remaining'] == '0'
+    assert second.status_code == 429
+    assert second['Retry-After'] == '30'
+
+  def test_other_paths_are_not_limited(self):
+    response = self.middleware(RequestFactory().get('/api/v1/cp/profile'))
+    assert 'X-RateLimit-Limit' not in response
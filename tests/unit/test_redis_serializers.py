@@ -0,0 +1,52 @@
+import json
+import zlib
+import pytest
+from core.redis.serializers import Serializer, CODEC_JSON, CODEC_STR, COMPRESS_ZLIB
+
+class TestSerializer:
+  @pytest.fixture(autouse=True)
+  def setup(self):
+    self.serializer = Serializer(codec='json')
+
+  @pytest.mark.parametrize('value', [
+    'plain string',
+    '123',
+    '',
+    b'\x00\x01binary',
+    {'id': '1', 'nested': {'items': [1, 2, 3]}},
+    [1, 'two', None],
+    True,
+    None,
+  ])
+  def test_round_trip(self, value):
+    assert self.serializer.loads(self.serializer.dumps(value)) == value
+
+  def test_strings_are_not_parsed_as_json(self):
+    assert self.serializer.loads(self.serializer.dumps('{"a": 1}')) == '{"a": 1}'
+
+  def test_numbers_are_stored_plain(self):
+    assert self.serializer.dumps(42) == b'42'
+    assert self.serializer.loads(b'42') == 42
+
+  def test_header_byte(self):
+    assert self.serializer.dumps('abc')[0] == CODEC_STR
+    assert self.serializer.dumps({'a': 1})[0] == CODEC_JSON
+
+  def test_reads_untagged_values(self):
+    assert self.serializer.loads(json.dumps({'a': 1}).encode()) == {'a': 1}
+    assert self.serializer.loads(b'legacy value') == 'legacy value'
+
+  def test_large_values_are_compressed(self):
+    serializer = Serializer(codec='json', compression='zlib', compress_threshold=100)
+    value = {'payload': 'x' * 1000}
+    data = serializer.dumps(value)
+    assert data[0] == CODEC_JSON | COMPRESS_ZLIB
+    assert len(data) < 200
+    assert zlib.decompress(data[1:])
+    assert serializer.loads(data) == value
+    # Readers don't need compression enabled to decode
+    assert self.serializer.loads(data) == value
+
+  def test_small_values_are_not_compressed(self):
+    serializer = Serializer(codec='json', compression='zlib', compress_threshold=100)
+    assert serializer.dumps({'a': 1})[0] == CODEC_JSON
@@ -0,0 +1,112 @@
+import pytest
+from core.elasticsearch.cache import SearchCache
+from core.elasticsearch.client import ESClient
+
+class FakeRedisClient:
+  def __init__(self):
+    self.data = {}
+
+  async def ensure_connection(self):
+    pass
+
+  async def get(self, key):
+    return self.data.get(key)
+
+  async def get_many(self, keys):
+    return {key: self.data[key] for key in keys if key in self.data}
+
+  async def set(self, key, value, expire=None):
+    self.data[key] = value
+    return True
+
+  async def increment(self, key, expire=None):
+    self.data[key] = self.data.get(key, 0) + 1
+    return self.data[key]
+
+  async def close(self):
+    pass
+
+class FakeResponse:
+  """Stands in for the client's ObjectApiResponse."""
+  def __init__(self, body):
+    self.body = body
+
+class FakeConnection:
+  def __init__(self):
+    self.searches = 0
+
+  async def search(self, index, **params):
+    self.searches += 1
+    return FakeResponse({'hits': {'hits': [], 'total': {'value': self.searches}}})
+
+  async def index(self, **kwargs):
+    pass
+
+class TestSearchCache:
+  @pytest.fixture(autouse=True)
+  def setup(self, settings):
+    settings.ELASTICSEARCH_SEARCH_CACHE = True
+    self.client = ESClient(search_cache=SearchCache(client=FakeRedisClient()))
+    self.client._initialized = True
+    self.client.connection = FakeConnection()
+
+  def test_key_ignores_dict_ordering(self):
+    first = SearchCache.make_key('customers', 1, {'query': {'a': 1, 'b': 2}, 'size': 10})
+    second = SearchCache.make_key('customers', 1, {'size': 10, 'query': {'b': 2, 'a': 1}})
+    assert first == second
+
+  @pytest.mark.asyncio
+  async def test_repeated_search_is_served_from_cache(self):
+    query = {'match': {'email': 'test@example.com'}}
+    first = await self.client.search('test_customers', query)
+    second = await self.client.search('test_customers', query)
+    assert first == second
+    assert self.client.connection.searches == 1
+
+  @pytest.mark.asyncio
+  async def test_hits_and_misses_return_the_same_type(self):
+    query = {'match_all': {}}
+    first = await self.client.search('test_customers', query)
+    second = await self.client.search('test_customers', query)
+    assert type(first) is type(second) is dict
+
+  @pytest.mark.asyncio
+  async def test_write_invalidates_index(self):
+    query = {'match_all': {}}
+    await self.client.search('test_customers', query)
+    await self.client.add_document('test_customers', '1', {'id': '1'}, refresh='wait_for')
+    await self.client.search('test_customers', query)
+    await self.client.search('test_customers', query)
+    assert self.client.connection.searches == 2
+
+  @pytest.mark.asyncio
+  async def test_unrefreshed_write_holds_caching(self):
+    query = {'match_all': {}}
+    await self.client.search('test_customers', query)
+    await self.client.add_document('test_customers', '1', {'id': '1'}, refresh=False)
+    # The write isn't searchable yet, so these responses may be stale
+    await self.client.search('test_customers', query)
+    await self.client.search('test_customers', query)
+    assert self.client.connection.searches == 3
+
+    # Once the hold expires responses are cached again
+    self.client.search_cache._client.data.pop(SearchCache._hold_key('test_customers'))
+    await self.client.search('test_customers', query)
+    await self.client.search('test_customers', query)
+    assert self.client.connection.searches == 4
+
+  @pytest.mark.asyncio
+  async def test_cache_can_be_bypassed(self):
+    query = {'match_all': {}}
+    await self.client.search('test_customers', query)
+    await self.client.search('test_customers', query, cache=False)
+    assert self.client.connection.searches == 2
+
+  @pytest.mark.asyncio
+  async def test_write_invalidates_opted_in_searches(self, settings):
+    settings.ELASTICSEARCH_SEARCH_CACHE = False
+    query = {'match_all': {}}
+    await self.client.search('test_customers', query, cache=True)
+    await self.client.add_document('test_customers', '1', {'id': '1'}, refresh='wait_for')
+    await self.client.search('test_customers', query, cache=True)
+    assert self.client.connection.searches == 2
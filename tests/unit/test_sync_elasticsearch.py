@@ -0,0 +1,95 @@
+import io
+import json
+import pytest
+from contextlib import asynccontextmanager
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from apps.core.management.commands import sync__elasticsearch as sync
+from tests.factories.customer import CustomerFactory
+
+Customer = get_user_model()
+
+class FakeESClient:
+  """Records bulk requests; chunks starting with an id in failing are rejected."""
+  failing = set()
+  chunks = []
+  bulk_loads = []
+
+  async def ensure_connection(self):
+    pass
+
+  async def close(self):
+    pass
+
+  async def bulk_update(self, index, documents):
+    ids = [document['id'] for document in documents]
+    if ids[0] in self.failing:
+      return False
+    self.chunks.append(ids)
+    return True
+
+  @asynccontextmanager
+  async def bulk_load(self, index):
+    self.bulk_loads.append(index)
+    yield self
+    self.bulk_loads.append(None)
+
+@pytest.mark.django_db(transaction=True)
+class TestSyncCommand:
+  @pytest.fixture(autouse=True)
+  def setup(self, monkeypatch, tmp_path):
+    FakeESClient.failing = set()
+    FakeESClient.chunks = []
+    FakeESClient.bulk_loads = []
+    monkeypatch.setattr(sync, 'ESClient', FakeESClient)
+    monkeypatch.setattr(sync, 'SYNC_CHUNK_RETRIES', 1)
+    CustomerFactory.create_batch(7)
+    self.ids = sorted(str(pk) for pk in Customer.objects.values_list('pk', flat=True))
+    self.checkpoint = str(tmp_path / 'customers.checkpoint')
+
+  def run(self, *args):
+    out = io.StringIO()
+    call_command(
+      'sync__elasticsearch', '--chunk-size', '3', '--workers', '3',
+      '--checkpoint', self.checkpoint, *args, stdout=out
+    )
+    return out.getvalue()
+
+  def test_indexes_every_row_in_keyset_chunks(self, tmp_path):
+    output = self.run()
+    assert sorted(FakeESClient.chunks) == [self.ids[0:3], self.ids[3:6], self.ids[6:]]
+    assert 'Indexed 7/7' in output
+    assert not (tmp_path / 'customers.checkpoint').exists()
+
+  def test_failed_chunk_keeps_checkpoint_for_resume(self):
+    FakeESClient.failing = {self.ids[3]}
+    with pytest.raises(CommandError):
+      self.run()
+    # The chunk after the failed one was indexed, but the checkpoint stays behind the gap
+    with open(self.checkpoint) as f:
+      assert json.load(f)['last_id'] == self.ids[2]
+
+    FakeESClient.failing = set()
+    FakeESClient.chunks = []
+    self.run('--resume')
+    assert sorted(FakeESClient.chunks) == [self.ids[3:6], self.ids[6:]]
+
+  def test_bulk_load_wraps_the_load(self):
+    self.run('--bulk-load')
+    assert FakeESClient.bulk_loads == ['test_customers', None]
+
+class TestSyncProgress:
+  def test_checkpoint_only_advances_over_contiguous_chunks(self, tmp_path):
+    checkpoint = str(tmp_path / 'checkpoint')
+    progress = sync.SyncProgress(sync.Command(stdout=io.StringIO()), 9, checkpoint)
+    progress.done(1, 'b', 3, True)
+    assert progress.last_id is None
+    progress.done(0, 'a', 3, True)
+    assert progress.last_id == 'b'
+    progress.done(3, 'd', 3, True)
+    progress.done(2, 'c', 3, False)
+    assert progress.last_id == 'b'
+    assert (progress.indexed, progress.failed) == (9, 3)
+    with open(checkpoint) as f:
+      assert json.load(f) == {'last_id': 'b', 'indexed': 6}
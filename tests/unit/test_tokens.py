@@ -0,0 +1,26 @@
+import pytest
+from unittest import mock
+from rest_framework_simplejwt.exceptions import InvalidToken
+from apps.cp.authentication.tokens import CPAccessToken, TokenService
+from tests.factories.customer import CustomerFactory
+
+@pytest.mark.django_db
+class TestTokenService:
+  @pytest.fixture(autouse=True)
+  def setup(self):
+    self.tokens = TokenService()
+    self.customer = CustomerFactory()
+
+  def test_issued_tokens_are_not_decoded_again(self):
+    access = self.tokens.issue(self.customer)['access']
+    with mock.patch.object(CPAccessToken, '__init__', side_effect=AssertionError):
+      assert self.tokens.validate(access)['user_id'] == str(self.customer.pk)
+
+  def test_validated_tokens_are_cached(self):
+    access = self.tokens.issue(self.customer)['access']
+    assert TokenService().validate(access) is not None
+    assert self.tokens.validate(access) is self.tokens.validate(access.encode())
+
+  def test_rejects_invalid_tokens(self):
+    with pytest.raises(InvalidToken):
+      self.tokens.validate('not-a-token')